@@ -8,6 +8,8 @@ from shoppinglist.constants import ItemCategory
 from shoppinglist.models import Item, ShoppingList
 from users.models import CustomUser
 
+pytest_plugins = ["kitchencompanion.testing"]
+
 
 @pytest.fixture
 def not_authenticated_api_client() -> APIClient:
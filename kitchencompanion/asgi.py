@@ -2,6 +2,8 @@
 ASGI config for kitchencompanion project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. uvicorn or daphne) to enable the
+long-lived event streams at /shoppinglist/<pk>/events/.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -12,5 +14,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kitchencompanion.settings')
+# Each ASGI request runs in a thread of its own, so persistent connections
+# would pile up instead of being reused; see DATABASES in the settings.
+os.environ.setdefault('DATABASE_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
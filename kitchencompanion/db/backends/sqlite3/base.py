@@ -0,0 +1,65 @@
+"""
+SQLite backend tuned for concurrent web workers.
+
+Two extra ``OPTIONS`` are understood on top of the stock backend:
+
+``pragmas``
+    A mapping of PRAGMA names to values run on every new connection, e.g.
+    WAL journaling, ``synchronous=NORMAL`` and a ``busy_timeout``.
+
+``transaction_mode``
+    ``DEFERRED`` (SQLite's default), ``IMMEDIATE`` or ``EXCLUSIVE``, used to
+    begin ``atomic()`` blocks. With ``IMMEDIATE`` a transaction takes the
+    write lock up front, where ``busy_timeout`` applies, instead of failing
+    with "database is locked" when it upgrades from reading to writing.
+"""
+
+import re
+from typing import Any, Dict
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+from django.db.backends.sqlite3.base import Database
+
+PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+PRAGMA_VALUE = re.compile(r"^-?\w+$")
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict["OPTIONS"]
+        self.pragmas: Dict[str, Any] = dict(options.get("pragmas", {}))
+        self.transaction_mode = options.get("transaction_mode", "DEFERRED").upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}."
+            )
+        for name, value in self.pragmas.items():
+            if not PRAGMA_NAME.match(name) or not PRAGMA_VALUE.match(str(value)):
+                raise ImproperlyConfigured(f"Invalid SQLite pragma: {name}={value}.")
+
+    def get_connection_params(self) -> Dict[str, Any]:
+        params = super().get_connection_params()
+        params.pop("pragmas", None)
+        params.pop("transaction_mode", None)
+        return params
+
+    def get_new_connection(self, conn_params: Dict[str, Any]):
+        conn = super().get_new_connection(conn_params)
+        # busy_timeout goes first so that switching the journal mode waits
+        # for other connections instead of failing.
+        for name in sorted(self.pragmas, key=lambda name: name != "busy_timeout"):
+            conn.execute(f"PRAGMA {name} = {self.pragmas[name]}")
+        return conn
+
+    def is_usable(self) -> bool:
+        try:
+            self.connection.execute("SELECT 1")
+        except Database.Error:
+            return False
+        return True
+
+    def _start_transaction_under_autocommit(self) -> None:
+        self.cursor().execute(f"BEGIN {self.transaction_mode}")
@@ -0,0 +1,95 @@
+"""
+Read replicas for the API.
+
+Reads are only sent to a replica where a view asks for it with
+``read_from``: the shopping list viewsets do so for GET requests, while
+authentication, writes, admin and management commands keep using the
+primary database. A replica lags behind the primary, so a user who has just
+written is pinned to the primary for ``STICKY_SECONDS`` afterwards and reads
+their own writes.
+
+With SQLite a replica is a snapshot of the primary database file that
+``manage.py refresh_replicas`` copies over periodically.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+_read_database: ContextVar[Optional[str]] = ContextVar("read_database", default=None)
+
+
+def get_replicas() -> List[str]:
+    return settings.DATABASE_REPLICATION["REPLICAS"]
+
+
+def get_read_database() -> Optional[str]:
+    return _read_database.get()
+
+
+def choose_replica() -> Optional[str]:
+    replicas = get_replicas()
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def read_from(alias: Optional[str]) -> Iterator[None]:
+    """Send the reads made inside the block to ``alias``, or to the primary."""
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def route_reads(alias: Optional[str]) -> None:
+    """Change where reads go until the enclosing ``read_from`` block ends."""
+    _read_database.set(alias)
+
+
+def sticky_key(user_id: Any) -> str:
+    return f"replicas:sticky:{user_id}"
+
+
+def stick_to_primary(user_id: Any) -> None:
+    cache.set(
+        sticky_key(user_id), True, settings.DATABASE_REPLICATION["STICKY_SECONDS"]
+    )
+
+
+def is_stuck_to_primary(user_id: Any) -> bool:
+    return bool(cache.get(sticky_key(user_id)))
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints: Any) -> str:
+        return get_read_database() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints: Any) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints: Any) -> bool:
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> bool:
+        # Replicas get their schema from the primary.
+        return db not in get_replicas()
+
+
+def refresh_sqlite_snapshot(
+    source: BaseDatabaseWrapper, target: BaseDatabaseWrapper
+) -> None:
+    """
+    Copy the primary SQLite database over a replica with the online backup
+    API. Readers of the replica keep seeing the previous snapshot until the
+    copy is complete.
+    """
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
@@ -14,7 +14,7 @@ from datetime import timedelta
 from pathlib import Path
 from typing import List
 
-from decouple import config
+from decouple import Csv, config
 
 DEVELOPMENT = config("DEVELOPMENT", default=True, cast=bool)
 TESTING = config("TESTING", default=False, cast=bool)
@@ -26,10 +26,18 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
+# Emails are queued in the outbox table and delivered by
+# `manage.py deliver_outbox` through OUTBOX_DELIVERY_BACKEND.
+EMAIL_BACKEND = "outbox.backends.OutboxEmailBackend"
 if DEVELOPMENT:
-    EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+    OUTBOX_DELIVERY_BACKEND = "django.core.mail.backends.console.EmailBackend"
 else:
-    EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    OUTBOX_DELIVERY_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+OUTBOX_BATCH_SIZE = config("OUTBOX_BATCH_SIZE", default=50, cast=int)
+OUTBOX_MAX_ATTEMPTS = config("OUTBOX_MAX_ATTEMPTS", default=5, cast=int)
+OUTBOX_RETRY_DELAY = config("OUTBOX_RETRY_DELAY", default=60, cast=int)
+# Seconds a claimed batch stays hidden from other workers while it is sent.
+OUTBOX_LEASE_TIMEOUT = config("OUTBOX_LEASE_TIMEOUT", default=300, cast=int)
 EMAIL_HOST = config("EMAIL_HOST")
 EMAIL_PORT = config("EMAIL_PORT", default=587, cast=int)
 EMAIL_USE_TLS = config("EMAIL_USE_TLS", default=True, cast=bool)
@@ -63,6 +71,7 @@ INSTALLED_APPS = [
     # my apps
     "users.apps.UsersConfig",
     "shoppinglist.apps.ShoppinglistConfig",
+    "outbox.apps.OutboxConfig",
 ]
 
 MIDDLEWARE = [
@@ -105,11 +114,47 @@ WSGI_APPLICATION = "kitchencompanion.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "kitchencompanion.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Persistent connections are reused per worker thread. ASGI servers
+        # run each request in a different thread, so asgi.py defaults this
+        # to 0.
+        "CONN_MAX_AGE": config("DATABASE_CONN_MAX_AGE", default=60, cast=int),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+            "pragmas": {
+                "busy_timeout": config("SQLITE_BUSY_TIMEOUT", default=5000, cast=int),
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                "cache_size": -config("SQLITE_CACHE_SIZE_KB", default=20000, cast=int),
+                "mmap_size": config("SQLITE_MMAP_SIZE", default=134217728, cast=int),
+                "temp_store": "MEMORY",
+            },
+        },
     }
 }
 
+# Read replicas get the API's GET traffic, see kitchencompanion/db/replicas.py.
+# For SQLite, list the paths of snapshot copies that `manage.py
+# refresh_replicas` keeps up to date; keep STICKY_SECONDS above the refresh
+# interval. The stickiness is stored in the cache, so processes that share
+# replicas need a shared cache.
+DATABASE_REPLICAS = config("DATABASE_REPLICAS", default="", cast=Csv())
+for index, name in enumerate(DATABASE_REPLICAS):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "NAME": name,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["kitchencompanion.db.replicas.ReplicaRouter"]
+
+DATABASE_REPLICATION = {
+    "REPLICAS": [f"replica_{index}" for index in range(len(DATABASE_REPLICAS))],
+    "STICKY_SECONDS": config("DATABASE_REPLICA_STICKY_SECONDS", default=60, cast=int),
+}
+
 AUTH_USER_MODEL = "users.CustomUser"
 
 
@@ -139,6 +184,7 @@ AUTHENTICATION_BACKENDS = [
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.SignedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_THROTTLE_CLASSES": [
@@ -147,6 +193,53 @@ REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_RATES": {"user": f"{RATE_LIMIT}/min"},
 }
 
+# Stateless "Bearer" tokens, see users/tokens.py. The first key signs new
+# tokens; keep retired keys after it until their tokens have expired.
+SIGNED_TOKEN = {
+    "KEYS": [
+        config("SIGNED_TOKEN_KEY", default=SECRET_KEY),
+        *config("SIGNED_TOKEN_FALLBACK_KEYS", default="", cast=Csv()),
+    ],
+    "LIFETIME": timedelta(
+        hours=config("SIGNED_TOKEN_LIFETIME_HOURS", default=12, cast=int)
+    ),
+    "ISSUE_ON_LOGIN": config("SIGNED_TOKEN_ON_LOGIN", default=False, cast=bool),
+    "DENY_LIST_REFRESH": 30,
+}
+
+# Deleted items are kept as tombstones for delta sync (GET
+# /shoppinglist/<pk>/changes/) until `manage.py purge_tombstones` drops them.
+SYNC_TOMBSTONE_RETENTION = timedelta(
+    days=config("SYNC_TOMBSTONE_RETENTION_DAYS", default=30, cast=int)
+)
+
+# Server-Sent Events of list changes, GET /shoppinglist/<pk>/events/ (ASGI
+# only). The in-process broker reaches listeners of the same process only.
+SHOPPING_LIST_EVENTS = {
+    "BROKER": config(
+        "SHOPPING_LIST_EVENTS_BROKER", default="shoppinglist.events.InProcessBroker"
+    ),
+    "HEARTBEAT": 15,
+    "QUEUE_SIZE": 100,
+}
+
+# Product suggestions, GET /shoppinglist/autocomplete/?q=. Each user's index
+# lives in the cache for TIMEOUT seconds; products count for half as much
+# after HALF_LIFE_DAYS without being used.
+AUTOCOMPLETE = {
+    "TIMEOUT": config("AUTOCOMPLETE_TIMEOUT", default=86400, cast=int),
+    "HALF_LIFE_DAYS": 30,
+}
+
+# Run the API's write paths on one writer thread per process that commits
+# them in groups, see shoppinglist/writer.py. Meant for SQLite, where
+# concurrent writers only wait on each other.
+WRITE_QUEUE = {
+    "ENABLED": config("WRITE_QUEUE_ENABLED", default=False, cast=bool),
+    "MAX_BATCH": config("WRITE_QUEUE_MAX_BATCH", default=32, cast=int),
+    "MAX_DELAY": config("WRITE_QUEUE_MAX_DELAY", default=0.002, cast=float),
+}
+
 DJOSER = {
     "VIEWS": {
         "token_create": "users.views.LoginView",
@@ -0,0 +1,131 @@
+"""
+Pytest plugin guarding against N+1 queries and unindexed lookups.
+
+The ``query_harness`` fixture runs an endpoint against datasets of growing
+size and fails when the number of queries grows with the data, showing the
+statements that were repeated. It also checks ``EXPLAIN QUERY PLAN`` of
+captured queries for the expected indexes.
+"""
+
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+Query = Dict[str, str]
+
+LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST_PATTERN = re.compile(r"IN \((?:\?, )*\?\)")
+TABLE_PATTERN = '(?:FROM|JOIN|UPDATE|INTO) "{table}"'
+
+
+def normalize_sql(sql: str) -> str:
+    """Replace literals so that statements differing only in values match."""
+    return IN_LIST_PATTERN.sub("IN (...)", LITERAL_PATTERN.sub("?", sql))
+
+
+def format_queries(queries: Sequence[Query]) -> str:
+    return "\n".join(
+        f"  {index}. {query['sql']}" for index, query in enumerate(queries, 1)
+    )
+
+
+class QueryHarness:
+    sizes: Tuple[int, ...] = (1, 4, 16)
+
+    def capture(self, request: Callable[[], Any]) -> Tuple[Any, List[Query]]:
+        # Throttle history lives in the cache; clear it so that the many
+        # requests of a run are not rate limited.
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = request()
+        status_code = getattr(response, "status_code", None)
+        assert status_code is None or status_code < 400, (
+            f"Request failed with {status_code}: "
+            f"{getattr(response, 'content', b'')[:500]!r}"
+        )
+        return response, context.captured_queries
+
+    def assert_flat(
+        self,
+        grow: Callable[[int], Any],
+        request: Callable[[Any], Any],
+        sizes: Optional[Sequence[int]] = None,
+    ) -> List[Query]:
+        """
+        Grow the dataset to every size in turn and check that ``request``
+        issues the same number of queries each time.
+
+        ``grow(size)`` prepares the data and returns what ``request`` needs,
+        e.g. a fresh item to delete. The first size is run twice and the
+        warm-up run discarded. Returns the queries of the largest run.
+        """
+        sizes = list(sizes or self.sizes)
+        runs = []
+        for size in [sizes[0], *sizes]:
+            grown = grow(size)
+            runs.append((size, self.capture(lambda: request(grown))[1]))
+        runs = runs[1:]
+
+        (smallest_size, smallest), (largest_size, largest) = runs[0], runs[-1]
+        counts = ", ".join(f"{size} rows: {len(queries)}" for size, queries in runs)
+        if any(len(queries) != len(smallest) for _, queries in runs):
+            grown = Counter(map(normalize_sql, (q["sql"] for q in largest)))
+            grown.subtract(map(normalize_sql, (q["sql"] for q in smallest)))
+            repeated = [
+                f"  +{count} x {sql}" for sql, count in grown.items() if count > 0
+            ]
+            pytest.fail(
+                f"Query count grows with the data ({counts}).\n"
+                f"Statements added between {smallest_size} and {largest_size} rows:\n"
+                + "\n".join(repeated)
+                + f"\nAll queries at {largest_size} rows:\n"
+                + format_queries(largest),
+                pytrace=False,
+            )
+        return largest
+
+    def query_plan(self, sql: str) -> List[str]:
+        if connection.vendor != "sqlite":
+            pytest.skip("Query plans are only checked on SQLite.")
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_uses_index(
+        self, queries: Sequence[Query], table: str, *indexes: str
+    ) -> None:
+        """
+        Check that every SELECT reading ``table`` looks it up through one of
+        ``indexes`` (or the primary key) rather than scanning it. Index
+        names may be given by prefix, e.g. for Django's generated names.
+        """
+        pattern = re.compile(TABLE_PATTERN.format(table=re.escape(table)))
+        selects = [
+            query
+            for query in queries
+            if query["sql"].startswith("SELECT") and pattern.search(query["sql"])
+        ]
+        assert selects, f'No SELECT reads "{table}":\n{format_queries(queries)}'
+
+        for query in selects:
+            plan = self.query_plan(query["sql"])
+            steps = [step for step in plan if re.search(rf"\b{table}\b", step)]
+            if not any(
+                "INTEGER PRIMARY KEY" in step or any(index in step for index in indexes)
+                for step in steps
+            ):
+                pytest.fail(
+                    f'"{table}" is not read through {" or ".join(indexes)}.\n'
+                    f"SQL: {query['sql']}\nPlan:\n  " + "\n  ".join(plan),
+                    pytrace=False,
+                )
+
+
+@pytest.fixture
+def query_harness(db) -> QueryHarness:
+    return QueryHarness()
@@ -0,0 +1,105 @@
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.db.utils import ConnectionHandler
+from django.test.utils import CaptureQueriesContext
+
+from shoppinglist.benchmark import run_write_contention
+
+ENGINE = "kitchencompanion.db.backends.sqlite3"
+
+
+def create_handler(path: Path, **options: Any) -> ConnectionHandler:
+    return ConnectionHandler(
+        {DEFAULT_DB_ALIAS: {"ENGINE": ENGINE, "NAME": str(path), "OPTIONS": options}}
+    )
+
+
+def fetch_pragma(handler: ConnectionHandler, name: str) -> Any:
+    with handler[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+# Connections are blocked outside of database tests, including ones to
+# databases the test creates itself.
+@pytest.mark.django_db
+class TestSQLiteBackend:
+    def test_applies_pragmas_to_new_connections(self, tmp_path: Path) -> None:
+        handler = create_handler(
+            tmp_path / "db.sqlite3",
+            pragmas={
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                "busy_timeout": 1234,
+            },
+        )
+
+        assert fetch_pragma(handler, "journal_mode") == "wal"
+        assert fetch_pragma(handler, "synchronous") == 1
+        assert fetch_pragma(handler, "busy_timeout") == 1234
+        assert fetch_pragma(handler, "foreign_keys") == 1
+        handler.close_all()
+
+    def test_begins_transactions_in_configured_mode(self, tmp_path: Path) -> None:
+        handler = create_handler(tmp_path / "db.sqlite3", transaction_mode="immediate")
+        database = handler[DEFAULT_DB_ALIAS]
+
+        with CaptureQueriesContext(database) as context:
+            database._start_transaction_under_autocommit()
+            database.commit()
+
+        assert context.captured_queries[0]["sql"] == "BEGIN IMMEDIATE"
+        handler.close_all()
+
+    def test_reports_closed_connection_as_unusable(self, tmp_path: Path) -> None:
+        database = create_handler(tmp_path / "db.sqlite3")[DEFAULT_DB_ALIAS]
+        database.ensure_connection()
+
+        assert database.is_usable()
+        database.connection.close()
+        assert not database.is_usable()
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"transaction_mode": "LAZY"},
+            {"pragmas": {"journal_mode; DROP TABLE x": "WAL"}},
+            {"pragmas": {"journal_mode": "WAL; DROP TABLE x"}},
+        ],
+    )
+    def test_rejects_invalid_options(
+        self, tmp_path: Path, options: Dict[str, Any]
+    ) -> None:
+        handler = create_handler(tmp_path / "db.sqlite3", **options)
+
+        with pytest.raises(ImproperlyConfigured):
+            handler[DEFAULT_DB_ALIAS]
+
+
+@pytest.mark.django_db
+class TestRunWriteContention:
+    def test_immediate_transactions_avoid_lock_errors(self, tmp_path: Path) -> None:
+        report = run_write_contention(
+            {
+                "configured": {
+                    "ENGINE": ENGINE,
+                    "OPTIONS": {
+                        "transaction_mode": "IMMEDIATE",
+                        "pragmas": {"busy_timeout": 5000, "journal_mode": "WAL"},
+                    },
+                }
+            },
+            str(tmp_path),
+            writers=4,
+            readers=2,
+            transactions=20,
+        )
+
+        profile = report["profiles"]["configured"]
+        assert profile["writes"]["requests"] == 80
+        assert profile["writes"]["errors"] == 0
+        assert profile["reads"]["requests"] == 40
@@ -0,0 +1,129 @@
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS
+from django.db.utils import ConnectionHandler
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from kitchencompanion.db import replicas
+from kitchencompanion.db.replicas import (
+    ReplicaRouter,
+    is_stuck_to_primary,
+    read_from,
+    refresh_sqlite_snapshot,
+)
+from shoppinglist.constants import ItemCategory
+from shoppinglist.models import ShoppingList
+from shoppinglist.tests.urls import URLS
+from users.models import CustomUser
+
+
+@pytest.fixture
+def replica_settings(settings) -> None:
+    # The primary stands in for the replica; the routing is what is tested.
+    settings.DATABASE_REPLICATION = {
+        **settings.DATABASE_REPLICATION,
+        "REPLICAS": [DEFAULT_DB_ALIAS],
+    }
+
+
+@pytest.fixture
+def routed_reads(monkeypatch) -> List[Optional[str]]:
+    """Database every ORM read asked the router for, ``None`` for unrouted."""
+    reads: List[Optional[str]] = []
+    get_read_database = replicas.get_read_database
+
+    def record() -> Optional[str]:
+        alias = get_read_database()
+        reads.append(alias)
+        return alias
+
+    monkeypatch.setattr(replicas, "get_read_database", record)
+    return reads
+
+
+class TestReplicaRouter:
+    def test_routes_reads_inside_read_from_only(self) -> None:
+        router = ReplicaRouter()
+
+        with read_from("replica_0"):
+            assert router.db_for_read(ShoppingList) == "replica_0"
+            assert router.db_for_write(ShoppingList) == DEFAULT_DB_ALIAS
+        assert router.db_for_read(ShoppingList) == DEFAULT_DB_ALIAS
+
+    def test_does_not_migrate_replicas(self, settings) -> None:
+        settings.DATABASE_REPLICATION = {
+            **settings.DATABASE_REPLICATION,
+            "REPLICAS": ["replica_0"],
+        }
+        router = ReplicaRouter()
+
+        assert router.allow_migrate(DEFAULT_DB_ALIAS, "shoppinglist")
+        assert not router.allow_migrate("replica_0", "shoppinglist")
+
+
+@pytest.mark.django_db
+class TestRefreshSQLiteSnapshot:
+    def test_copies_primary_into_replica(self, tmp_path: Path) -> None:
+        handler = ConnectionHandler(
+            {
+                alias: {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": str(tmp_path / f"{alias}.sqlite3"),
+                }
+                for alias in (DEFAULT_DB_ALIAS, "replica")
+            }
+        )
+        with handler[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute("CREATE TABLE fruit (name TEXT)")
+            cursor.execute("INSERT INTO fruit VALUES ('apple')")
+
+        refresh_sqlite_snapshot(handler[DEFAULT_DB_ALIAS], handler["replica"])
+
+        with handler["replica"].cursor() as cursor:
+            cursor.execute("SELECT name FROM fruit")
+            assert cursor.fetchall() == [("apple",)]
+        handler.close_all()
+
+
+@pytest.mark.django_db
+class TestReplicaReadMixin:
+    def test_safe_requests_read_from_replica(
+        self,
+        replica_settings: None,
+        routed_reads: List[Optional[str]],
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        response = authenticated_api_client.get(
+            URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk)
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        # Authentication reads the token from the primary.
+        assert routed_reads[0] is None
+        assert routed_reads[-1] == DEFAULT_DB_ALIAS
+
+    def test_writer_reads_own_writes_from_primary(
+        self,
+        replica_settings: None,
+        routed_reads: List[Optional[str]],
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        shopping_list: ShoppingList,
+    ) -> None:
+        create_response = authenticated_api_client.post(
+            URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk),
+            {"product": "Milk", "category": ItemCategory.DAIRY},
+        )
+        routed_reads.clear()
+        response = authenticated_api_client.get(
+            URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+        )
+
+        assert create_response.status_code == status.HTTP_201_CREATED
+        assert is_stuck_to_primary(authenticated_user.pk)
+        assert response.status_code == status.HTTP_200_OK
+        assert routed_reads and not any(routed_reads)
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import OutboxEmail
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "attempts", "next_attempt_at", "created")
+    list_filter = ("status",)
+    readonly_fields = ["created", "sent_at"]
+
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -0,0 +1,24 @@
+from typing import Sequence
+
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .models import OutboxEmail
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Email backend that queues messages in the outbox table instead of
+    talking to a mail server. Delivery happens in ``manage.py deliver_outbox``.
+    """
+
+    def send_messages(self, email_messages: Sequence[EmailMessage]) -> int:
+        messages = [message for message in email_messages if message.recipients()]
+        if messages:
+            for message in messages:
+                if message.attachments:
+                    raise ValueError("Outbox emails do not support attachments.")
+            OutboxEmail.objects.bulk_create(
+                [OutboxEmail.from_message(message) for message in messages]
+            )
+        return len(messages)
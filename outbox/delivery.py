@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+@dataclass
+class DeliveryResult:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+def get_delivery_connection():
+    backend = settings.OUTBOX_DELIVERY_BACKEND
+    if backend == "outbox.backends.OutboxEmailBackend":
+        raise ImproperlyConfigured(
+            "OUTBOX_DELIVERY_BACKEND must point to a real email backend."
+        )
+    return get_connection(backend=backend, fail_silently=False)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: the base delay doubled after every failure."""
+    return timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def claim_batch(batch_size: int) -> List[OutboxEmail]:
+    """
+    Lease up to ``batch_size`` due emails to this worker.
+
+    The rows are locked only while the claim commits, so the lease is
+    recorded in the rows themselves: ``next_attempt_at`` is pushed
+    ``OUTBOX_LEASE_TIMEOUT`` seconds ahead, which hides them from other
+    workers while they are being sent. If the worker dies before recording
+    the outcome, the lease expires and the emails are claimed again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+                status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now
+            )[:batch_size]
+        )
+        if emails:
+            lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_TIMEOUT)
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                next_attempt_at=lease_until
+            )
+            for email in emails:
+                email.next_attempt_at = lease_until
+    return emails
+
+
+def deliver_batch(batch_size: int | None = None) -> DeliveryResult:
+    """
+    Deliver one batch of due outbox emails over a single connection.
+
+    Every message is sent on its own so that one bad recipient only delays
+    that message. Failed messages are retried with exponential backoff until
+    ``OUTBOX_MAX_ATTEMPTS`` is reached.
+    """
+    result = DeliveryResult()
+    emails = claim_batch(batch_size or settings.OUTBOX_BATCH_SIZE)
+    if not emails:
+        return result
+
+    connection = get_delivery_connection()
+    try:
+        connection.open()
+    except Exception:
+        # Each send below retries opening and records the failure per email.
+        pass
+    try:
+        for email in emails:
+            try:
+                connection.send_messages([email.to_message(connection=connection)])
+            except Exception as error:
+                email.attempts += 1
+                email.last_error = repr(error)
+                if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    email.status = OutboxEmail.Status.FAILED
+                    result.failed += 1
+                else:
+                    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+                    result.retried += 1
+            else:
+                email.status = OutboxEmail.Status.SENT
+                email.sent_at = timezone.now()
+                result.sent += 1
+    finally:
+        connection.close()
+        OutboxEmail.objects.bulk_update(
+            emails,
+            ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+        )
+
+    return result
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from outbox.delivery import deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails in batches over a reused connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help="Number of emails sent per connection.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the outbox instead of exiting once it is drained.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep between polls when the outbox is empty.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = deliver_batch(options["batch_size"])
+            if result.sent or result.retried or result.failed:
+                self.stdout.write(
+                    f"Sent {result.sent}, retrying {result.retried}, "
+                    f"failed {result.failed}."
+                )
+                continue
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,92 @@
+from django.core.mail import EmailMultiAlternatives
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEmail(models.Model):
+    """
+    An email queued for delivery by the ``deliver_outbox`` worker.
+
+    Rows are written by ``OutboxEmailBackend`` inside the transaction of the
+    request that sends the email, so an email exists exactly when the change
+    that triggered it was committed.
+
+    Attributes:
+    - subject, body, from_email: Plain email fields.
+    - to, cc, bcc, reply_to: Lists of addresses.
+    - headers: Extra email headers.
+    - alternatives: List of ``[content, mimetype]`` pairs, e.g. an HTML body.
+    - status: Delivery state of the email.
+    - attempts: Number of failed delivery attempts so far.
+    - next_attempt_at: Earliest time of the next delivery attempt.
+    - last_error: Error raised by the last failed attempt.
+    - created: Timestamp when the email was queued.
+    - sent_at: Timestamp when the email was delivered.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        SENT = "sent"
+        FAILED = "failed"
+
+    subject = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict)
+    alternatives = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return self.subject
+
+    @classmethod
+    def from_message(cls, message: EmailMultiAlternatives) -> "OutboxEmail":
+        return cls(
+            subject=message.subject,
+            body=message.body,
+            from_email=message.from_email,
+            to=list(message.to),
+            cc=list(message.cc),
+            bcc=list(message.bcc),
+            reply_to=list(message.reply_to),
+            headers=dict(message.extra_headers),
+            alternatives=[
+                list(alternative)
+                for alternative in getattr(message, "alternatives", [])
+            ],
+        )
+
+    def to_message(self, connection=None) -> EmailMultiAlternatives:
+        return EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email,
+            to=self.to,
+            cc=self.cc,
+            bcc=self.bcc,
+            reply_to=self.reply_to,
+            headers=self.headers,
+            alternatives=[tuple(alternative) for alternative in self.alternatives],
+            connection=connection,
+        )
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="outbox_pending_idx"
+            ),
+        ]
+        verbose_name = "outbox email"
+        verbose_name_plural = "outbox emails"
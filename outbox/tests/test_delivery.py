@@ -0,0 +1,174 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives, send_mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from pytest_django.fixtures import SettingsWrapper
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from outbox.delivery import claim_batch, deliver_batch
+from outbox.models import OutboxEmail
+from shoppinglist.models import ShoppingList
+from users.models import CustomUser
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self) -> bool:
+        CountingBackend.opened += 1
+        return True
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError("SMTP server unavailable")
+
+
+@pytest.fixture
+def outbox_settings(settings: SettingsWrapper) -> SettingsWrapper:
+    settings.EMAIL_BACKEND = "outbox.backends.OutboxEmailBackend"
+    settings.OUTBOX_DELIVERY_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.OUTBOX_MAX_ATTEMPTS = 2
+    settings.OUTBOX_RETRY_DELAY = 60
+    return settings
+
+
+@pytest.mark.django_db
+class TestOutboxEmailBackend:
+    def test_send_mail_is_queued_instead_of_sent(
+        self, outbox_settings: SettingsWrapper
+    ) -> None:
+        send_mail("Subject", "Body", "from@example.com", ["to@example.com"])
+
+        assert len(mail.outbox) == 0
+        email = OutboxEmail.objects.get()
+        assert email.subject == "Subject"
+        assert email.to == ["to@example.com"]
+        assert email.status == OutboxEmail.Status.PENDING
+
+    def test_alternatives_are_kept(self, outbox_settings: SettingsWrapper) -> None:
+        message = EmailMultiAlternatives(
+            "Subject", "Body", "from@example.com", ["to@example.com"]
+        )
+        message.attach_alternative("<p>Body</p>", "text/html")
+        message.send()
+
+        deliver_batch()
+
+        assert mail.outbox[0].alternatives == [("<p>Body</p>", "text/html")]
+
+    def test_share_queues_email_in_outbox(
+        self,
+        outbox_settings: SettingsWrapper,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        external_user: CustomUser,
+    ) -> None:
+        response = authenticated_api_client.put(
+            f"/shoppinglist/{shopping_list.pk}/share/",
+            data={"email": external_user.email},
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert len(mail.outbox) == 0
+        assert OutboxEmail.objects.get().to == [external_user.email]
+
+    def test_registration_emails_are_queued(
+        self,
+        outbox_settings: SettingsWrapper,
+        not_authenticated_api_client: APIClient,
+    ) -> None:
+        response = not_authenticated_api_client.post(
+            "/auth/users/",
+            {"email": "newuser@example.com", "password": "asdqfgfregsfsafrfgwe"},
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED, response.content
+        assert len(mail.outbox) == 0
+        assert OutboxEmail.objects.get().to == ["newuser@example.com"]
+
+
+@pytest.mark.django_db
+class TestDeliverBatch:
+    def test_batch_is_sent_over_one_connection(
+        self, outbox_settings: SettingsWrapper
+    ) -> None:
+        outbox_settings.OUTBOX_DELIVERY_BACKEND = (
+            "outbox.tests.test_delivery.CountingBackend"
+        )
+        CountingBackend.opened = 0
+        for number in range(3):
+            send_mail(f"Subject {number}", "Body", None, ["to@example.com"])
+
+        result = deliver_batch()
+
+        assert result.sent == 3
+        assert CountingBackend.opened == 1
+        assert [email.subject for email in mail.outbox] == [
+            "Subject 0",
+            "Subject 1",
+            "Subject 2",
+        ]
+        assert not OutboxEmail.objects.filter(
+            status=OutboxEmail.Status.PENDING
+        ).exists()
+
+    def test_batch_size_limits_delivery(self, outbox_settings: SettingsWrapper) -> None:
+        for number in range(3):
+            send_mail(f"Subject {number}", "Body", None, ["to@example.com"])
+
+        assert deliver_batch(batch_size=2).sent == 2
+        assert deliver_batch(batch_size=2).sent == 1
+
+    def test_claimed_emails_are_leased_until_sent(
+        self, outbox_settings: SettingsWrapper
+    ) -> None:
+        send_mail("Subject", "Body", None, ["to@example.com"])
+
+        assert len(claim_batch(10)) == 1
+        # Another worker polling while the batch is sent gets nothing.
+        assert claim_batch(10) == []
+        assert deliver_batch().sent == 0
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        assert len(claim_batch(10)) == 1
+
+    def test_failed_delivery_is_retried_with_backoff(
+        self, outbox_settings: SettingsWrapper
+    ) -> None:
+        outbox_settings.OUTBOX_DELIVERY_BACKEND = (
+            "outbox.tests.test_delivery.FailingBackend"
+        )
+        send_mail("Subject", "Body", None, ["to@example.com"])
+
+        result = deliver_batch()
+
+        email = OutboxEmail.objects.get()
+        assert result.retried == 1
+        assert email.status == OutboxEmail.Status.PENDING
+        assert email.attempts == 1
+        assert "SMTP server unavailable" in email.last_error
+        assert email.next_attempt_at > timezone.now() + timedelta(seconds=50)
+        assert deliver_batch().retried == 0
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        result = deliver_batch()
+
+        email.refresh_from_db()
+        assert result.failed == 1
+        assert email.status == OutboxEmail.Status.FAILED
+
+    def test_deliver_outbox_command_drains_outbox(
+        self, outbox_settings: SettingsWrapper
+    ) -> None:
+        for number in range(5):
+            send_mail(f"Subject {number}", "Body", None, ["to@example.com"])
+
+        call_command("deliver_outbox", batch_size=2)
+
+        assert len(mail.outbox) == 5
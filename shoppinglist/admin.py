@@ -10,7 +10,7 @@ class ItemInline(admin.StackedInline):
 
 class ShoppingListAdmin(admin.ModelAdmin):
     inlines = [ItemInline]
-    readonly_fields = ["created", "updated"]
+    readonly_fields = ["created", "updated", "items_count", "completed_count"]
 
 
 admin.site.register(ShoppingList, ShoppingListAdmin)
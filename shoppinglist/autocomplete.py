@@ -0,0 +1,390 @@
+"""
+Product suggestions for quick-add, ranked by how often and how recently the
+user has put a product on their lists.
+
+Every user has a prefix index in the cache: one entry per product with its
+purchase count, last use and the category, unit and quantity it usually
+comes with, plus a sorted array of search terms (the whole name and each of
+its words) for prefix lookups with ``bisect``. The index is built from the
+items of the user's lists on a cache miss and kept up to date as items are
+created or edited, so answering a query does not touch the database.
+
+Once a write to a list commits, its product changes are applied to the
+cached index of every user with access to the list. Updates of one user's
+index take a lock in the cache, so concurrent writers cannot overwrite each
+other's changes, and an index built from the database is only cached if no
+write changed the index while it was being built. Access changes drop the
+indexes of the users concerned instead.
+"""
+
+import math
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .models import Item, ShoppingList
+
+INDEXED_FIELDS = ("product", "category", "unit", "quantity")
+# Seconds the lock on an index is held at most, and waited for.
+LOCK_TIMEOUT = 5
+LOCK_WAIT = 0.05
+
+
+def normalize(product: str) -> str:
+    return " ".join(product.casefold().split())
+
+
+@dataclass
+class ProductEntry:
+    product: str
+    count: int = 0
+    last_used: float = 0.0
+    categories: Counter = field(default_factory=Counter)
+    units: Counter = field(default_factory=Counter)
+    quantities: Counter = field(default_factory=Counter)
+
+    def add(
+        self,
+        category: str,
+        unit: Optional[str],
+        quantity: Optional[int],
+        used: float,
+        count: int = 1,
+    ) -> None:
+        self.count += count
+        self.last_used = max(self.last_used, used)
+        self.categories[category] += count
+        self.units[unit] += count
+        self.quantities[quantity] += count
+
+    def score(self, now: float) -> float:
+        """Purchase count decayed by the time since the last use."""
+        half_life = settings.AUTOCOMPLETE["HALF_LIFE_DAYS"] * 86400
+        return self.count * math.pow(0.5, max(now - self.last_used, 0) / half_life)
+
+    def as_suggestion(self) -> Dict[str, Any]:
+        return {
+            "product": self.product,
+            "category": self.categories.most_common(1)[0][0],
+            "unit": self.units.most_common(1)[0][0],
+            "quantity": self.quantities.most_common(1)[0][0],
+            "count": self.count,
+            "last_used": datetime.fromtimestamp(self.last_used, tz=timezone.utc),
+        }
+
+
+@dataclass
+class ProductIndex:
+    entries: Dict[str, ProductEntry] = field(default_factory=dict)
+    terms: List[Tuple[str, str]] = field(default_factory=list)
+
+    def add(
+        self,
+        product: str,
+        category: str,
+        unit: Optional[str],
+        quantity: Optional[int],
+        used: float,
+        count: int = 1,
+    ) -> None:
+        key = normalize(product)
+        if not key:
+            return
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = ProductEntry(product.strip())
+            for term in {key, *key.split()}:
+                position = bisect_left(self.terms, (term, key))
+                self.terms.insert(position, (term, key))
+        elif used >= entry.last_used:
+            # The latest spelling is the one shown.
+            entry.product = product.strip()
+        entry.add(category, unit, quantity, used, count)
+
+    def remove(
+        self,
+        product: str,
+        category: str,
+        unit: Optional[str],
+        quantity: Optional[int],
+        count: int = 1,
+    ) -> None:
+        """Take back uses recorded with ``add``, e.g. when an item is edited."""
+        key = normalize(product)
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        entry.count -= count
+        if entry.count <= 0:
+            del self.entries[key]
+            for term in {key, *key.split()}:
+                position = bisect_left(self.terms, (term, key))
+                if self.terms[position : position + 1] == [(term, key)]:
+                    del self.terms[position]
+            return
+        # Subtracting counters drops the values that are no longer used.
+        entry.categories -= Counter({category: count})
+        entry.units -= Counter({unit: count})
+        entry.quantities -= Counter({quantity: count})
+
+    def search(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        keys = set()
+        start = bisect_left(self.terms, (prefix, ""))
+        for term, key in islice(self.terms, start, None):
+            if not term.startswith(prefix):
+                break
+            keys.add(key)
+
+        now = time.time()
+        matches = sorted(
+            (self.entries[key] for key in keys),
+            key=lambda entry: (-entry.score(now), entry.product),
+        )
+        return [entry.as_suggestion() for entry in matches[:limit]]
+
+
+def index_key(user_id: int) -> str:
+    return f"autocomplete:{user_id}"
+
+
+def revision_key(user_id: int) -> str:
+    return f"autocomplete:{user_id}:revision"
+
+
+def lock_key(user_id: int) -> str:
+    return f"autocomplete:{user_id}:lock"
+
+
+@contextmanager
+def index_lock(user_id: int) -> Iterator[bool]:
+    """
+    Hold the lock on the user's cached index, telling whether it was
+    acquired within ``LOCK_WAIT`` seconds. ``cache.add`` only sets a key
+    that is missing, which makes it a lock across processes.
+    """
+    key, token = lock_key(user_id), uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(key, token, LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            yield False
+            return
+        time.sleep(0.005)
+    try:
+        yield True
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+class LocalIndexes:
+    """
+    Unpickled indexes of the most recently active users of this process,
+    each with the revision it was loaded at.
+
+    Loading an index from the cache means unpickling all of it, which takes
+    far longer than searching it. A query only fetches the revision from the
+    cache and reuses the local copy when it is current.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._lock = threading.Lock()
+        self._indexes: "OrderedDict[int, Tuple[str, ProductIndex]]" = OrderedDict()
+
+    def get(self, user_id: int, revision: str) -> Optional[ProductIndex]:
+        with self._lock:
+            local = self._indexes.get(user_id)
+            if local is None or local[0] != revision:
+                return None
+            self._indexes.move_to_end(user_id)
+            return local[1]
+
+    def put(self, user_id: int, revision: str, index: ProductIndex) -> None:
+        with self._lock:
+            self._indexes[user_id] = (revision, index)
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.size:
+                self._indexes.popitem(last=False)
+
+
+local_indexes = LocalIndexes(size=1000)
+
+
+def store_index(user_id: int, index: ProductIndex) -> str:
+    revision = uuid.uuid4().hex
+    cache.set_many(
+        {index_key(user_id): index, revision_key(user_id): revision},
+        settings.AUTOCOMPLETE["TIMEOUT"],
+    )
+    return revision
+
+
+def build_index(user) -> ProductIndex:
+    """Index every item on the lists ``user`` owns or has been shared."""
+    index = ProductIndex()
+    history = (
+        Item.objects.filter(shopping_list__in=ShoppingList.objects.accessible_to(user))
+        .values("product", "category", "unit", "quantity")
+        .annotate(count=Count("id"), last_used=Max("created"))
+        .order_by()
+    )
+    for row in history:
+        index.add(
+            row["product"],
+            row["category"],
+            row["unit"],
+            row["quantity"],
+            row["last_used"].timestamp(),
+            count=row["count"],
+        )
+    return index
+
+
+def get_index(user) -> ProductIndex:
+    revision = cache.get(revision_key(user.pk))
+    if revision is not None:
+        index = local_indexes.get(user.pk, revision)
+        if index is None:
+            index = cache.get(index_key(user.pk))
+        if index is not None:
+            local_indexes.put(user.pk, revision, index)
+            return index
+
+    index = build_index(user)
+    with index_lock(user.pk) as locked:
+        # A write that committed while the index was being built changed the
+        # revision, and its items may be missing from this index.
+        if locked and cache.get(revision_key(user.pk)) == revision:
+            revision = store_index(user.pk, index)
+            local_indexes.put(user.pk, revision, index)
+    return index
+
+
+def suggest(user, prefix: str, limit: int) -> List[Dict[str, Any]]:
+    return get_index(user).search(prefix, limit)
+
+
+def forget_indexes(user_ids: Iterable[int]) -> None:
+    """Drop the users' indexes, to be rebuilt on their next query."""
+    keys = []
+    for user_id in set(user_ids):
+        keys.extend([index_key(user_id), revision_key(user_id)])
+    if keys:
+        cache.delete_many(keys)
+
+
+def forget_index(user_id: int) -> None:
+    """Drop the user's index, e.g. after a bulk import, to rebuild it lazily."""
+    forget_indexes([user_id])
+
+
+@dataclass(frozen=True)
+class ProductUse:
+    product: str
+    category: str
+    unit: Optional[str]
+    quantity: Optional[int]
+    used: float
+
+    @classmethod
+    def of(cls, item: Item) -> "ProductUse":
+        return cls(
+            item.product,
+            item.category,
+            item.unit,
+            item.quantity,
+            item.created.timestamp(),
+        )
+
+
+def update_index(
+    user_id: int, added: Iterable[ProductUse], removed: Iterable[ProductUse]
+) -> None:
+    """
+    Apply product changes to the user's cached index, on a fresh copy from
+    the cache, never on the local copy that concurrent queries may be
+    searching. Without an index only the revision changes, so that an index
+    being built from data read before the change is not cached.
+    """
+    with index_lock(user_id) as locked:
+        if not locked:
+            forget_index(user_id)
+            return
+        index = cache.get(index_key(user_id))
+        if index is None:
+            cache.set(
+                revision_key(user_id),
+                uuid.uuid4().hex,
+                settings.AUTOCOMPLETE["TIMEOUT"],
+            )
+            return
+        for use in removed:
+            index.remove(use.product, use.category, use.unit, use.quantity)
+        for use in added:
+            index.add(use.product, use.category, use.unit, use.quantity, use.used)
+        store_index(user_id, index)
+
+
+def update_list_indexes(
+    shopping_list_id: int, added: List[ProductUse], removed: List[ProductUse]
+) -> None:
+    """Apply product changes to the indexes of every user with access."""
+    if not added and not removed:
+        return
+    users = ShoppingList.objects.filter(pk=shopping_list_id).values_list(
+        "user_id", "shared_with"
+    )
+    for user_id in {user_id for row in users for user_id in row if user_id}:
+        update_index(user_id, added, removed)
+
+
+@dataclass
+class ProductChanges:
+    """
+    Product changes of a write to one list, applied to the indexes once the
+    write commits. Items are read then, when created ones have their
+    creation time. Deleting an item leaves its uses in the indexes.
+    """
+
+    items: Dict[int, Item] = field(default_factory=dict)
+    removed: Dict[int, ProductUse] = field(default_factory=dict)
+
+    def created(self, item: Item) -> None:
+        self.items[id(item)] = item
+
+    def changing(self, item: Item, fields: Iterable[str]) -> None:
+        """Call before setting ``fields`` on an existing item."""
+        if item.pk is None or id(item) in self.items:
+            return
+        if not set(INDEXED_FIELDS).intersection(fields):
+            return
+        self.removed[id(item)] = ProductUse.of(item)
+        self.items[id(item)] = item
+
+    def deleted(self, item: Item) -> None:
+        self.items.pop(id(item), None)
+        self.removed.pop(id(item), None)
+
+    def apply(self, shopping_list_id: int) -> None:
+        added = [ProductUse.of(item) for item in self.items.values()]
+        update_list_indexes(shopping_list_id, added, list(self.removed.values()))
+
+    def apply_on_commit(self, shopping_list_id: int) -> None:
+        if self.items:
+            transaction.on_commit(partial(self.apply, shopping_list_id))
@@ -0,0 +1,369 @@
+import platform
+import random
+import sqlite3
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import django
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections
+from django.db.utils import ConnectionHandler
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from .datasets import Dataset
+from .models import Item
+
+FLOWS = ("list", "retrieve", "create", "toggle", "share")
+
+
+@dataclass
+class Sample:
+    latency: float
+    queries: int
+    status_code: int
+
+
+class FlowRunner:
+    """
+    Issues the requests of the benchmark flows as one of the users of a
+    synthetic dataset, through the full middleware stack and URLconf.
+    """
+
+    def __init__(self, dataset: Dataset, seed: int) -> None:
+        self.dataset = dataset
+        self.rng = random.Random(seed)
+        self.client = Client()
+        # Looked up inside the timed requests, so built once up front.
+        self.owner_tokens = {
+            pk: dataset.tokens[index // dataset.spec.lists_per_user]
+            for index, pk in enumerate(dataset.shopping_list_ids)
+        }
+
+    def pick_owned_list(self) -> Tuple[int, int]:
+        """A random list and the index of its owner in the dataset."""
+        index = self.rng.randrange(len(self.dataset.shopping_list_ids))
+        return (
+            self.dataset.shopping_list_ids[index],
+            index // self.dataset.spec.lists_per_user,
+        )
+
+    def pick_list(self) -> Tuple[int, str]:
+        """A random list and the token of its owner."""
+        pk, owner = self.pick_owned_list()
+        return pk, self.dataset.tokens[owner]
+
+    def headers(self, token: str) -> Dict[str, str]:
+        return {"HTTP_AUTHORIZATION": f"Token {token}"}
+
+    def list(self, targets: Sequence[Tuple[int, int]]):
+        token = self.rng.choice(self.dataset.tokens)
+        return self.client.get(
+            "/shoppinglist/", {"page_size": 50}, **self.headers(token)
+        )
+
+    def retrieve(self, targets: Sequence[Tuple[int, int]]):
+        pk, token = self.pick_list()
+        return self.client.get(f"/shoppinglist/{pk}/", **self.headers(token))
+
+    def create(self, targets: Sequence[Tuple[int, int]]):
+        pk, token = self.pick_list()
+        return self.client.post(
+            f"/shoppinglist/{pk}/item/",
+            {"product": "Benchmark", "category": "other"},
+            content_type="application/json",
+            **self.headers(token),
+        )
+
+    def toggle(self, targets: Sequence[Tuple[int, int]]):
+        item_pk, shopping_list_pk = self.rng.choice(targets)
+        token = self.owner_tokens[shopping_list_pk]
+        return self.client.patch(
+            f"/shoppinglist/{shopping_list_pk}/item/{item_pk}/",
+            {"completed": self.rng.random() < 0.5},
+            content_type="application/json",
+            **self.headers(token),
+        )
+
+    def share(self, targets: Sequence[Tuple[int, int]]):
+        pk, owner = self.pick_owned_list()
+        others = len(self.dataset.emails) - 1
+        # Sharing with the owner is rejected, so skip over them.
+        other = (owner + 1 + self.rng.randrange(max(others, 1))) % len(
+            self.dataset.emails
+        )
+        return self.client.put(
+            f"/shoppinglist/{pk}/share/",
+            {"email": self.dataset.emails[other]},
+            content_type="application/json",
+            **self.headers(self.dataset.tokens[owner]),
+        )
+
+    def measure(self, flow: str, targets: Sequence[Tuple[int, int]]) -> Sample:
+        request: Callable = getattr(self, flow)
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = request(targets)
+            latency = time.perf_counter() - started
+        return Sample(latency, len(context), response.status_code)
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[
+        round(fraction * 100) - 1
+    ]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    latencies = [sample.latency * 1000 for sample in samples]
+    return {
+        "requests": len(samples),
+        "errors": sum(sample.status_code >= 400 for sample in samples),
+        "requests_per_second": round(len(samples) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "mean": round(statistics.fmean(latencies), 3),
+        },
+        "queries_per_request": round(
+            statistics.fmean(sample.queries for sample in samples), 2
+        ),
+    }
+
+
+def run_flow(
+    dataset: Dataset,
+    flow: str,
+    requests: int,
+    concurrency: int,
+    targets: Sequence[Tuple[int, int]],
+) -> Dict[str, Any]:
+    def worker(index: int) -> List[Sample]:
+        runner = FlowRunner(dataset, seed=dataset.spec.seed + index)
+        share = requests // concurrency + (index < requests % concurrency)
+        try:
+            return [runner.measure(flow, targets) for _ in range(share)]
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize([sample for samples in results for sample in samples], elapsed)
+
+
+def run_benchmark(
+    dataset: Dataset,
+    flows: Sequence[str] = FLOWS,
+    requests: int = 200,
+    concurrency: int = 4,
+    write_queue: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Drive every flow with ``concurrency`` threads and report latency
+    percentiles, throughput and queries per request as a JSON-ready dict.
+
+    Throttling is switched off by replacing the cache, so that the numbers
+    describe the API rather than the rate limit. ``write_queue`` overrides
+    ``WRITE_QUEUE["ENABLED"]``; queries run by the writer thread are not
+    counted per request.
+    """
+    if write_queue is None:
+        write_queue = settings.WRITE_QUEUE["ENABLED"]
+    rng = random.Random(dataset.spec.seed)
+    sample_lists = rng.sample(
+        dataset.shopping_list_ids, min(200, len(dataset.shopping_list_ids))
+    )
+    targets = list(
+        Item.objects.filter(shopping_list_id__in=sample_lists).values_list(
+            "pk", "shopping_list_id"
+        )[:2000]
+    )
+
+    spec = asdict(dataset.spec)
+    spec.pop("password")
+    report: Dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "sqlite": sqlite3.sqlite_version if connection.vendor == "sqlite" else None,
+        },
+        "dataset": {
+            **spec,
+            "shopping_lists": len(dataset.shopping_list_ids),
+            "items": dataset.items,
+            "shares": dataset.shares,
+        },
+        "requests_per_flow": requests,
+        "concurrency": concurrency,
+        "write_queue": write_queue,
+        "flows": {},
+    }
+    with override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+        ALLOWED_HOSTS=["testserver"],
+        WRITE_QUEUE={**settings.WRITE_QUEUE, "ENABLED": write_queue},
+    ):
+        for flow in flows:
+            report["flows"][flow] = run_flow(
+                dataset, flow, requests, concurrency, targets
+            )
+    return report
+
+
+def contention_worker(
+    handler: ConnectionHandler,
+    seed: int,
+    transactions: int,
+    lists: int,
+    items_per_list: int,
+    write: bool,
+) -> List[Sample]:
+    """
+    Toggle an item and bump its list version the way the item endpoints do,
+    reading first, or only count items of a list when not ``write``.
+    """
+    rng = random.Random(seed)
+    database = handler[DEFAULT_DB_ALIAS]
+    samples = []
+    try:
+        for _ in range(transactions):
+            list_id = rng.randrange(lists)
+            item_id = list_id * items_per_list + rng.randrange(items_per_list)
+            started = time.perf_counter()
+            try:
+                with database.cursor() as cursor:
+                    # atomic() only knows the project's connections, so the
+                    # transaction is driven the same way by hand.
+                    database._start_transaction_under_autocommit()
+                    try:
+                        cursor.execute(
+                            "SELECT COUNT(*) FROM bench_item WHERE list_id = %s",
+                            [list_id],
+                        )
+                        if write:
+                            cursor.execute(
+                                "UPDATE bench_item SET completed = NOT completed "
+                                "WHERE id = %s",
+                                [item_id],
+                            )
+                            cursor.execute(
+                                "UPDATE bench_list SET version = version + 1 "
+                                "WHERE id = %s",
+                                [list_id],
+                            )
+                    except OperationalError:
+                        database.rollback()
+                        raise
+                    database.commit()
+            except OperationalError:
+                status_code = 503
+            else:
+                status_code = 200
+            samples.append(
+                Sample(time.perf_counter() - started, 3 if write else 1, status_code)
+            )
+    finally:
+        database.close()
+    return samples
+
+
+def run_write_contention(
+    profiles: Dict[str, Dict[str, Any]],
+    directory: str,
+    writers: int = 8,
+    readers: int = 4,
+    transactions: int = 200,
+    lists: int = 20,
+    items_per_list: int = 50,
+) -> Dict[str, Any]:
+    """
+    Run concurrent writer and reader threads against a fresh SQLite file per
+    database profile and report throughput, latency and "database is locked"
+    failures, which are counted as errors.
+
+    ``profiles`` maps a name to the ``ENGINE`` and ``OPTIONS`` of a database
+    configuration, so that the stock backend and the tuned one can be
+    compared on the same workload.
+    """
+    report: Dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "writers": writers,
+        "readers": readers,
+        "transactions_per_thread": transactions,
+        "profiles": {},
+    }
+    for name, profile in profiles.items():
+        handler = ConnectionHandler(
+            {
+                DEFAULT_DB_ALIAS: {
+                    **profile,
+                    "NAME": f"{directory}/{name}.sqlite3",
+                    "CONN_MAX_AGE": None,
+                }
+            }
+        )
+        with handler[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE bench_list "
+                "(id INTEGER PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            cursor.execute(
+                "CREATE TABLE bench_item (id INTEGER PRIMARY KEY, "
+                "list_id INTEGER NOT NULL, completed BOOL NOT NULL)"
+            )
+            cursor.execute("CREATE INDEX bench_item_list ON bench_item (list_id)")
+            cursor.executemany(
+                "INSERT INTO bench_list VALUES (%s, 1)",
+                [(list_id,) for list_id in range(lists)],
+            )
+            cursor.executemany(
+                "INSERT INTO bench_item VALUES (%s, %s, 0)",
+                [
+                    (item_id, item_id // items_per_list)
+                    for item_id in range(lists * items_per_list)
+                ],
+            )
+        handler[DEFAULT_DB_ALIAS].close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=writers + readers) as executor:
+            futures = [
+                executor.submit(
+                    contention_worker,
+                    handler,
+                    index,
+                    transactions,
+                    lists,
+                    items_per_list,
+                    index < writers,
+                )
+                for index in range(writers + readers)
+            ]
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+
+        report["profiles"][name] = {
+            "engine": profile["ENGINE"],
+            "options": profile.get("OPTIONS", {}),
+            "writes": summarize(
+                [sample for samples in results[:writers] for sample in samples],
+                elapsed,
+            ),
+            "reads": summarize(
+                [sample for samples in results[writers:] for sample in samples],
+                elapsed,
+            ),
+        }
+    return report
@@ -36,3 +36,8 @@ class ItemUnit(models.TextChoices):
     GRAM = "g"
     LITER = "l"
     MILLILITER = "ml"
+
+
+class ShoppingListAccess(models.TextChoices):
+    OWNER = "owner"
+    SHARED = "shared"
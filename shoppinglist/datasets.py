@@ -0,0 +1,225 @@
+import itertools
+import random
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Sequence, TypeVar
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+from .constants import ItemCategory, ItemUnit
+from .models import Item, ShoppingList
+
+T = TypeVar("T")
+
+PRODUCTS = [
+    "Milk",
+    "Bread",
+    "Eggs",
+    "Apples",
+    "Cheese",
+    "Chicken",
+    "Rice",
+    "Coffee",
+    "Butter",
+    "Tomatoes",
+    "Pasta",
+    "Yogurt",
+]
+
+FIXED = "fixed"
+UNIFORM = "uniform"
+EXPONENTIAL = "exponential"
+DISTRIBUTIONS = (FIXED, UNIFORM, EXPONENTIAL)
+
+
+@dataclass
+class DatasetSpec:
+    """
+    Shape of a synthetic dataset: every user owns ``lists_per_user`` lists
+    of ``items_per_list`` items, each shared with ``share_degree`` others.
+
+    Item and share counts are means drawn from ``items_distribution`` and
+    ``share_distribution``; ``category_skew`` is the Zipf exponent of the
+    category popularity, 0 giving every category the same weight.
+    """
+
+    users: int = 10
+    lists_per_user: int = 100
+    items_per_list: int = 50
+    items_distribution: str = FIXED
+    share_degree: int = 3
+    share_distribution: str = FIXED
+    category_skew: float = 0.0
+    completed_ratio: float = 0.3
+    seed: int = 0
+    batch_size: int = 2000
+    password: str = "benchmark-password"
+
+
+@dataclass
+class Dataset:
+    spec: DatasetSpec
+    user_ids: List[int] = field(default_factory=list)
+    emails: List[str] = field(default_factory=list)
+    tokens: List[str] = field(default_factory=list)
+    shopping_list_ids: List[int] = field(default_factory=list)
+    items: int = 0
+    shares: int = 0
+
+
+def chunked(values: Iterable[T], size: int) -> Iterator[List[T]]:
+    chunk: List[T] = []
+    for value in values:
+        chunk.append(value)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def bulk_create(model, objects: Iterable, batch_size: int) -> List:
+    created = []
+    for chunk in chunked(objects, batch_size):
+        created.extend(model.objects.bulk_create(chunk))
+    return created
+
+
+def bulk_insert(model, objects: Iterable, batch_size: int) -> int:
+    """Like ``bulk_create`` but only counts the rows, keeping memory flat."""
+    inserted = 0
+    for chunk in chunked(objects, batch_size):
+        inserted += len(model.objects.bulk_create(chunk))
+    return inserted
+
+
+def sample_count(rng: random.Random, mean: int, distribution: str) -> int:
+    if distribution == FIXED or mean <= 0:
+        return mean
+    if distribution == UNIFORM:
+        return rng.randint(0, 2 * mean)
+    if distribution == EXPONENTIAL:
+        return int(rng.expovariate(1 / mean))
+    raise ValueError(f"Unknown distribution: {distribution}.")
+
+
+def zipf_weights(count: int, skew: float) -> List[float]:
+    """Cumulative weights of ``count`` ranks with a Zipf exponent of ``skew``."""
+    return list(itertools.accumulate(1 / rank**skew for rank in range(1, count + 1)))
+
+
+def pick_others(
+    rng: random.Random, ids: Sequence[int], owner: int, count: int
+) -> List[int]:
+    candidates = rng.sample(ids, min(len(ids), count + 1))
+    return [user_id for user_id in candidates if user_id != owner][:count]
+
+
+def generate_dataset(spec: DatasetSpec) -> Dataset:
+    """
+    Create users with tokens, their lists, items and sharing with chunked
+    bulk inserts. The same spec always produces the same data.
+
+    Lists are generated ``batch_size`` at a time together with their items
+    and shares, so only one batch of model instances is held in memory.
+    """
+    for distribution in (spec.items_distribution, spec.share_distribution):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {distribution}.")
+
+    rng = random.Random(spec.seed)
+    dataset = Dataset(spec=spec)
+    User = get_user_model()
+    Through = ShoppingList.shared_with.through
+    categories = list(ItemCategory.values)
+    category_weights = zipf_weights(len(categories), spec.category_skew)
+    units = [None, *ItemUnit.values]
+
+    with transaction.atomic():
+        # Hashing is the slow part of creating users; all of them share one
+        # password.
+        password = make_password(spec.password)
+        offset = User.objects.count()
+        users = bulk_create(
+            User,
+            (
+                User(email=f"bench{offset + number}@example.com", password=password)
+                for number in range(spec.users)
+            ),
+            spec.batch_size,
+        )
+        dataset.user_ids = [user.pk for user in users]
+        dataset.emails = [user.email for user in users]
+        tokens = bulk_create(
+            Token,
+            (Token(user=user, key=Token.generate_key()) for user in users),
+            spec.batch_size,
+        )
+        dataset.tokens = [token.key for token in tokens]
+
+        owners = (
+            (user_id, number)
+            for user_id in dataset.user_ids
+            for number in range(spec.lists_per_user)
+        )
+        for chunk in chunked(owners, spec.batch_size):
+            # Completion is drawn up front so that a list whose items are all
+            # completed is stored as completed too.
+            completions = [
+                [
+                    rng.random() < spec.completed_ratio
+                    for _ in range(
+                        sample_count(rng, spec.items_per_list, spec.items_distribution)
+                    )
+                ]
+                for _ in chunk
+            ]
+            shopping_lists = ShoppingList.objects.bulk_create(
+                ShoppingList(
+                    user_id=user_id,
+                    name=f"List {number}",
+                    completed=bool(completed) and all(completed),
+                )
+                for (user_id, number), completed in zip(chunk, completions)
+            )
+            dataset.shopping_list_ids.extend(
+                shopping_list.pk for shopping_list in shopping_lists
+            )
+
+            dataset.items += bulk_insert(
+                Item,
+                (
+                    Item(
+                        shopping_list_id=shopping_list.pk,
+                        product=rng.choice(PRODUCTS),
+                        category=rng.choices(categories, cum_weights=category_weights)[
+                            0
+                        ],
+                        unit=rng.choice(units),
+                        quantity=rng.randint(1, 5),
+                        completed=item_completed,
+                    )
+                    for shopping_list, completed in zip(shopping_lists, completions)
+                    for item_completed in completed
+                ),
+                spec.batch_size,
+            )
+
+            dataset.shares += bulk_insert(
+                Through,
+                (
+                    Through(shoppinglist_id=shopping_list.pk, customuser_id=user_id)
+                    for shopping_list in shopping_lists
+                    for user_id in pick_others(
+                        rng,
+                        dataset.user_ids,
+                        shopping_list.user_id,
+                        sample_count(rng, spec.share_degree, spec.share_distribution),
+                    )
+                ),
+                spec.batch_size,
+            )
+
+    return dataset
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+Event = Dict[str, Any]
+
+
+class Subscription:
+    """
+    Events of one channel queued for one listener on its event loop.
+
+    Publishers may run on any thread, so events are handed over with
+    ``call_soon_threadsafe``. A listener that falls ``queue_size`` events
+    behind is cut off; it reconnects and catches up through delta sync.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[Optional[Event]] = asyncio.Queue(queue_size)
+
+    def push(self, event: Optional[Event]) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The listener's loop has already been closed.
+            pass
+
+    def _put(self, event: Optional[Event]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """
+        Next event, or ``None`` once the subscription has been cut off.
+        Raises ``asyncio.TimeoutError`` when nothing arrives in ``timeout``.
+        """
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class InProcessBroker:
+    """
+    Publish/subscribe within the current process.
+
+    Only listeners connected to the same server process receive an event, so
+    deployments running several processes should point
+    ``SHOPPING_LIST_EVENTS["BROKER"]`` at a class with the same interface
+    backed by a message broker.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def publish(self, channel: str, event: Event) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.push(event)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[Subscription]:
+        subscription = Subscription(settings.SHOPPING_LIST_EVENTS["QUEUE_SIZE"])
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions[channel].discard(subscription)
+                if not self._subscriptions[channel]:
+                    del self._subscriptions[channel]
+
+
+@lru_cache(maxsize=None)
+def get_broker() -> InProcessBroker:
+    return import_string(settings.SHOPPING_LIST_EVENTS["BROKER"])()
+
+
+def shopping_list_channel(shopping_list_id: int) -> str:
+    return f"shoppinglist.{shopping_list_id}"
+
+
+def publish_event(
+    shopping_list_id: int, event_type: str, version: int, **data: Any
+) -> None:
+    """
+    Publish a change of a shopping list once the current transaction commits.
+
+    ``version`` is the list version after the change; listeners that notice
+    a gap catch up with ``GET /shoppinglist/<pk>/changes/``.
+    """
+    event = {"type": event_type, "list": shopping_list_id, "version": version, **data}
+    transaction.on_commit(
+        lambda: get_broker().publish(shopping_list_channel(shopping_list_id), event)
+    )
+
+
+def format_event(event: Event) -> str:
+    """Serialize an event in the Server-Sent Events wire format."""
+    return (
+        f"id: {event['version']}\n"
+        f"event: {event['type']}\n"
+        f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
+    )
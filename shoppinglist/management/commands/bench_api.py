@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from shoppinglist.benchmark import FLOWS, run_benchmark
+from shoppinglist.datasets import DatasetSpec, generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a throwaway database with a synthetic dataset, drive the API "
+        "flows with concurrent clients and print the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        defaults = DatasetSpec()
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument(
+            "--lists-per-user", type=int, default=defaults.lists_per_user
+        )
+        parser.add_argument(
+            "--items-per-list", type=int, default=defaults.items_per_list
+        )
+        parser.add_argument("--share-degree", type=int, default=defaults.share_degree)
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests per flow."
+        )
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--flows",
+            default=",".join(FLOWS),
+            help=f"Comma separated subset of: {', '.join(FLOWS)}.",
+        )
+        parser.add_argument(
+            "--write-queue",
+            action=argparse.BooleanOptionalAction,
+            default=None,
+            help="Run writes through the write queue; defaults to WRITE_QUEUE.",
+        )
+        parser.add_argument("--output", help="Write the report to this file.")
+
+    def handle(self, *args, **options):
+        flows = [flow for flow in options["flows"].split(",") if flow]
+        unknown = set(flows) - set(FLOWS)
+        if unknown:
+            raise CommandError(f"Unknown flows: {', '.join(sorted(unknown))}.")
+        if options["users"] < 1 or options["lists_per_user"] < 1:
+            raise CommandError("At least one user with one list is required.")
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        spec = DatasetSpec(
+            users=options["users"],
+            lists_per_user=options["lists_per_user"],
+            items_per_list=options["items_per_list"],
+            share_degree=options["share_degree"],
+            seed=options["seed"],
+        )
+
+        # An on-disk test database, so that the workers contend for it the way
+        # they would in production rather than through a shared memory cache.
+        directory = tempfile.mkdtemp(prefix="bench_api-")
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(
+                directory, "bench.sqlite3"
+            )
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            dataset = generate_dataset(spec)
+            report = run_benchmark(
+                dataset,
+                flows=flows,
+                requests=options["requests"],
+                concurrency=options["concurrency"],
+                write_queue=options["write_queue"],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(directory)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
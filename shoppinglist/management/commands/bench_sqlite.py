@@ -0,0 +1,62 @@
+import json
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from shoppinglist.benchmark import run_write_contention
+
+STOCK_PROFILE = {"ENGINE": "django.db.backends.sqlite3", "OPTIONS": {}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the stock SQLite backend with the configured one under "
+        "concurrent writers and readers and print the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument(
+            "--transactions",
+            type=int,
+            default=200,
+            help="Transactions per thread.",
+        )
+        parser.add_argument("--output", help="Write the report to this file.")
+
+    def handle(self, *args, **options):
+        configured = settings.DATABASES["default"]
+        if "sqlite3" not in configured["ENGINE"]:
+            raise CommandError("The default database is not SQLite.")
+        if options["writers"] < 1 or options["readers"] < 0:
+            raise CommandError("At least one writer is required.")
+        if options["transactions"] < 1:
+            raise CommandError("--transactions must be positive.")
+
+        directory = tempfile.mkdtemp(prefix="bench_sqlite-")
+        try:
+            report = run_write_contention(
+                {
+                    "stock": STOCK_PROFILE,
+                    "configured": {
+                        "ENGINE": configured["ENGINE"],
+                        "OPTIONS": configured.get("OPTIONS", {}),
+                    },
+                },
+                directory,
+                writers=options["writers"],
+                readers=options["readers"],
+                transactions=options["transactions"],
+            )
+        finally:
+            shutil.rmtree(directory)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
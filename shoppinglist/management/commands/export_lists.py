@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from shoppinglist.transfer import FORMATS, export_lists
+
+
+class Command(BaseCommand):
+    help = "Export every shopping list a user owns, with its items."
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user owning the lists.")
+        parser.add_argument("--type", choices=FORMATS, default=FORMATS[0])
+        parser.add_argument(
+            "--output", help="File to write to; defaults to standard output."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['email']} does not exist.")
+
+        chunks = export_lists(user, options["type"])
+        if options["output"] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            output.writelines(chunks)
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from shoppinglist.transfer import (
+    CHUNK_SIZE,
+    FORMATS,
+    ImportFailed,
+    import_lists,
+    read_records,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import shopping lists and items for a user from a CSV or JSON lines "
+        "file in the format of the export endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user owning the lists.")
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument("--type", choices=FORMATS, default=FORMATS[0])
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] <= 0:
+            raise CommandError("--chunk-size must be positive.")
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['email']} does not exist.")
+
+        with open(options["path"], "rb") as upload:
+            try:
+                result = import_lists(
+                    user,
+                    read_records(upload, options["type"]),
+                    chunk_size=options["chunk_size"],
+                )
+            except ImportFailed as error:
+                raise CommandError(f"Nothing imported. {error}")
+        self.stdout.write(f"Imported {result.lists} lists and {result.items} items.")
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from shoppinglist.sync import purge_sync_operations, purge_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete item tombstones and applied offline operations older than the "
+        "sync retention window."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Retention in days; defaults to SYNC_TOMBSTONE_RETENTION.",
+        )
+
+    def handle(self, *args, **options):
+        retention = None
+        if options["days"] is not None:
+            retention = timedelta(days=options["days"])
+        tombstones = purge_tombstones(retention)
+        operations = purge_sync_operations(retention)
+        self.stdout.write(
+            f"Purged {tombstones} tombstones and {operations} sync operations."
+        )
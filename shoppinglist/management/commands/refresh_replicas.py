@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from kitchencompanion.db.replicas import get_replicas, refresh_sqlite_snapshot
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database over its read replica snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep refreshing the snapshots instead of exiting after one pass.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30.0,
+            help="Seconds to sleep between refreshes.",
+        )
+
+    def handle(self, *args, **options):
+        replicas = get_replicas()
+        if not replicas:
+            raise CommandError("No read replicas are configured.")
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != "sqlite":
+            raise CommandError("Snapshots are only supported for SQLite.")
+
+        while True:
+            started = time.perf_counter()
+            for alias in replicas:
+                refresh_sqlite_snapshot(source, connections[alias])
+            self.stdout.write(
+                f"Refreshed {len(replicas)} replicas in "
+                f"{time.perf_counter() - started:.2f}s."
+            )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from shoppinglist.models import ShoppingList
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stored item counters of every shopping list from its "
+        "items, a batch of lists at a time, and fix the ones that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be positive.")
+
+        checked = repaired = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                ShoppingList.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            with transaction.atomic():
+                drifted = (
+                    ShoppingList.objects.filter(pk__in=batch)
+                    .with_counted_items()
+                    .exclude(
+                        items_count=F("counted_items"),
+                        completed_count=F("counted_completed"),
+                    )
+                    .values_list("pk", flat=True)
+                )
+                repaired += ShoppingList.objects.filter(
+                    pk__in=list(drifted)
+                ).recount_items()
+            checked += len(batch)
+
+        self.stdout.write(f"Checked {checked} shopping lists, repaired {repaired}.")
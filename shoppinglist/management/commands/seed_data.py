@@ -0,0 +1,88 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shoppinglist.datasets import DISTRIBUTIONS, DatasetSpec, generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with deterministic synthetic users, shopping lists, "
+        "items and shares for reproducing performance problems locally."
+    )
+
+    def add_arguments(self, parser):
+        defaults = DatasetSpec()
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument(
+            "--lists-per-user", type=int, default=defaults.lists_per_user
+        )
+        parser.add_argument(
+            "--items-per-list",
+            type=int,
+            default=defaults.items_per_list,
+            help="Mean number of items per list.",
+        )
+        parser.add_argument(
+            "--items-distribution",
+            choices=DISTRIBUTIONS,
+            default=defaults.items_distribution,
+        )
+        parser.add_argument(
+            "--share-degree",
+            type=int,
+            default=defaults.share_degree,
+            help="Mean number of users each list is shared with.",
+        )
+        parser.add_argument(
+            "--share-distribution",
+            choices=DISTRIBUTIONS,
+            default=defaults.share_distribution,
+        )
+        parser.add_argument(
+            "--category-skew",
+            type=float,
+            default=defaults.category_skew,
+            help="Zipf exponent of category popularity; 0 is uniform.",
+        )
+        parser.add_argument(
+            "--completed-ratio", type=float, default=defaults.completed_ratio
+        )
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+        parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+
+    def handle(self, *args, **options):
+        if min(options["users"], options["lists_per_user"]) < 0:
+            raise CommandError("--users and --lists-per-user cannot be negative.")
+        if min(options["items_per_list"], options["share_degree"]) < 0:
+            raise CommandError(
+                "--items-per-list and --share-degree cannot be negative."
+            )
+        if not 0 <= options["completed_ratio"] <= 1:
+            raise CommandError("--completed-ratio must be between 0 and 1.")
+        if options["category_skew"] < 0:
+            raise CommandError("--category-skew cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        spec = DatasetSpec(
+            users=options["users"],
+            lists_per_user=options["lists_per_user"],
+            items_per_list=options["items_per_list"],
+            items_distribution=options["items_distribution"],
+            share_degree=options["share_degree"],
+            share_distribution=options["share_distribution"],
+            category_skew=options["category_skew"],
+            completed_ratio=options["completed_ratio"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        started = time.perf_counter()
+        dataset = generate_dataset(spec)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Created {len(dataset.user_ids)} users, "
+            f"{len(dataset.shopping_list_ids)} shopping lists, "
+            f"{dataset.items} items and {dataset.shares} shares "
+            f"in {elapsed:.1f}s."
+        )
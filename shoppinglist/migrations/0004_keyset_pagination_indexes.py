@@ -0,0 +1,29 @@
+# Generated by Django 4.2.5 on 2026-10-18 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shoppinglist', '0003_alter_shoppinglist_shared_with'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='item',
+            options={'ordering': ['completed', 'created', 'id'], 'verbose_name': 'item', 'verbose_name_plural': 'items'},
+        ),
+        migrations.AlterModelOptions(
+            name='shoppinglist',
+            options={'ordering': ['created', 'id'], 'verbose_name': 'shopping list', 'verbose_name_plural': 'shopping lists'},
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['shopping_list', 'completed', 'created', 'id'], name='item_list_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppinglist',
+            index=models.Index(fields=['created', 'id'], name='shoppinglist_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shoppinglist', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='version',
+            field=models.PositiveBigIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.5 on 2026-10-18 12:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shoppinglist', '0005_shoppinglist_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_id', models.BigIntegerField()),
+                ('version', models.PositiveBigIntegerField()),
+                ('deleted', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'item tombstone',
+                'verbose_name_plural': 'item tombstones',
+            },
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='changed_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='sync_floor',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['shopping_list', 'changed_version'], name='item_list_changed_idx'),
+        ),
+        migrations.AddField(
+            model_name='itemtombstone',
+            name='shopping_list',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='shoppinglist.shoppinglist'),
+        ),
+        migrations.AddIndex(
+            model_name='itemtombstone',
+            index=models.Index(fields=['shopping_list', 'version'], name='tombstone_list_version_idx'),
+        ),
+    ]
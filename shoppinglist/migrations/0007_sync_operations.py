@@ -0,0 +1,61 @@
+# Generated by Django 4.2.5 on 2026-10-18 12:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shoppinglist", "0006_delta_sync"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="item",
+            name="field_clock",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name="SyncOperation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("op_id", models.UUIDField()),
+                ("client_id", models.CharField(blank=True, max_length=64, null=True)),
+                ("item_id", models.BigIntegerField(blank=True, null=True)),
+                ("applied", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "shopping_list",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sync_operations",
+                        to="shoppinglist.shoppinglist",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "sync operation",
+                "verbose_name_plural": "sync operations",
+                "indexes": [
+                    models.Index(
+                        fields=["shopping_list", "client_id"],
+                        name="sync_operation_client_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="syncoperation",
+            constraint=models.UniqueConstraint(
+                fields=("shopping_list", "op_id"), name="sync_operation_unique_op"
+            ),
+        ),
+    ]
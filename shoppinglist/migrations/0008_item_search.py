@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# Full-text index over Item.product and Item.note, kept in sync by triggers so
+# that every write path (bulk_create, queryset updates, cascades) is covered.
+# SQLite drops the triggers when a migration rebuilds shoppinglist_item, e.g.
+# to add a column with a default; such a migration has to create them again.
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE shoppinglist_item_fts USING fts5(
+        product,
+        note,
+        content='shoppinglist_item',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER shoppinglist_item_fts_insert AFTER INSERT ON shoppinglist_item
+    BEGIN
+        INSERT INTO shoppinglist_item_fts (rowid, product, note)
+        VALUES (new.id, new.product, new.note);
+    END
+    """,
+    """
+    CREATE TRIGGER shoppinglist_item_fts_delete AFTER DELETE ON shoppinglist_item
+    BEGIN
+        INSERT INTO shoppinglist_item_fts (shoppinglist_item_fts, rowid, product, note)
+        VALUES ('delete', old.id, old.product, old.note);
+    END
+    """,
+    """
+    CREATE TRIGGER shoppinglist_item_fts_update
+    AFTER UPDATE OF product, note ON shoppinglist_item
+    BEGIN
+        INSERT INTO shoppinglist_item_fts (shoppinglist_item_fts, rowid, product, note)
+        VALUES ('delete', old.id, old.product, old.note);
+        INSERT INTO shoppinglist_item_fts (rowid, product, note)
+        VALUES (new.id, new.product, new.note);
+    END
+    """,
+    "INSERT INTO shoppinglist_item_fts (shoppinglist_item_fts) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_INDEX = [
+    "DROP TRIGGER IF EXISTS shoppinglist_item_fts_insert",
+    "DROP TRIGGER IF EXISTS shoppinglist_item_fts_delete",
+    "DROP TRIGGER IF EXISTS shoppinglist_item_fts_update",
+    "DROP TABLE IF EXISTS shoppinglist_item_fts",
+]
+
+
+def run_on_sqlite(statements):
+    # Other databases fall back to a LIKE search, see shoppinglist/search.py.
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "sqlite":
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shoppinglist", "0007_sync_operations"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_SEARCH_INDEX), run_on_sqlite(DROP_SEARCH_INDEX)
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.5 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shoppinglist", "0008_item_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["shopping_list", "category", "completed", "created", "id"],
+                name="item_list_category_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["shopping_list", "created", "id"], name="item_list_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["shopping_list", "product", "id"], name="item_list_product_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.5 on 2026-10-18 13:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_items(apps, schema_editor):
+    ShoppingList = apps.get_model("shoppinglist", "ShoppingList")
+    Item = apps.get_model("shoppinglist", "Item")
+
+    def count(**filters):
+        counts = (
+            Item.objects.filter(shopping_list=OuterRef("pk"), **filters)
+            .order_by()
+            .values("shopping_list")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return Coalesce(Subquery(counts), Value(0))
+
+    ShoppingList.objects.using(schema_editor.connection.alias).update(
+        items_count=count(), completed_count=count(completed=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shoppinglist", "0009_item_facet_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shoppinglist",
+            name="completed_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="shoppinglist",
+            name="items_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_items, migrations.RunPython.noop),
+    ]
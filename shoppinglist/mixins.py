@@ -1,23 +1,195 @@
-from typing import Any, Dict, Optional
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
 
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import exceptions
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.response import Response
 
-from .models import ShoppingList
+from kitchencompanion.db.replicas import (
+    choose_replica,
+    is_stuck_to_primary,
+    read_from,
+    route_reads,
+    stick_to_primary,
+)
+
+from .models import Item, ShoppingList
 
 
 class ShoppingItemMixin:
     """
     Mixin to centralize the logic of retrieving shopping list from shopping_list_pk.
+
+    The list is fetched together with the caller's access check in a single
+    query and memoized for the rest of the request.
     """
 
     kwargs: Dict[str, Any]
+    request: Request
+    _shopping_list: Optional[ShoppingList] = None
 
-    def get_shopping_list(self) -> ShoppingList:
+    def get_shopping_list_pk(self) -> str:
         shopping_list_pk: Optional[str] = self.kwargs.get("shoppinglist_pk")
         if shopping_list_pk is None:
             raise exceptions.ValidationError("shopping_list_pk not provided in kwargs.")
+        return shopping_list_pk
+
+    def get_shopping_list(self) -> ShoppingList:
+        shopping_list_pk = self.get_shopping_list_pk()
+        if self._shopping_list is None:
+            try:
+                self._shopping_list = ShoppingList.objects.accessible_to(
+                    self.request.user
+                ).get(pk=shopping_list_pk)
+            except (ShoppingList.DoesNotExist, ValueError):
+                raise exceptions.NotFound("ShoppingList not found.")
+        return self._shopping_list
+
+    def get_accessible_items(self) -> QuerySet[Item]:
+        """
+        Items of the list in kwargs; the access check and the parent list are
+        part of the same query, so no separate list lookup is needed.
+        """
+        return Item.objects.accessible_to(self.request.user).filter(
+            shopping_list_id=self.get_shopping_list_pk()
+        )
+
+    def remember_shopping_list(self, item: Item) -> None:
+        shopping_list = item.shopping_list
+        shopping_list.is_shared_with_user = item.is_shared_with_user
+        self._shopping_list = shopping_list
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin parsing the ``?fields=`` and ``?expand=`` query parameters.
+
+    ``fields`` limits the serialized fields of read requests and ``expand``
+    opts in to the nested relations listed in ``expandable_fields``. Nested
+    relations are expanded by default on every action except ``list``.
+    """
+
+    request: Request
+    action: str
+    expandable_fields: Tuple[str, ...] = ()
+
+    def get_query_param_set(self, name: str) -> Optional[Set[str]]:
+        value: Optional[str] = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return {field.strip() for field in value.split(",") if field.strip()}
+
+    def get_requested_fields(self) -> Optional[Set[str]]:
+        if self.request.method not in SAFE_METHODS:
+            return None
+        return self.get_query_param_set("fields") or None
+
+    def get_expanded_fields(self) -> Set[str]:
+        expand = self.get_query_param_set("expand")
+        requested_fields = self.get_requested_fields()
+
+        if expand is None:
+            if requested_fields is not None or self.action == "list":
+                expand = set()
+            else:
+                expand = set(self.expandable_fields)
+
+        if requested_fields is not None:
+            expand |= requested_fields
+
+        return expand & set(self.expandable_fields)
+
+    def get_serializer(self, *args: Any, **kwargs: Any):
+        kwargs.setdefault("fields", self.get_requested_fields())
+        kwargs.setdefault("expand", self.get_expanded_fields())
+        return super().get_serializer(*args, **kwargs)  # type: ignore[misc]
+
+
+class ConditionalGetMixin:
+    """
+    Mixin adding ETag/Last-Modified validators and answering conditional
+    requests (If-None-Match / If-Modified-Since) with 304 Not Modified.
+
+    The ETag covers a version key, the caller and the query string, since the
+    representation depends on all three.
+    """
+
+    request: Request
+
+    def is_conditional_request(self) -> bool:
+        meta = self.request.META
+        return "HTTP_IF_NONE_MATCH" in meta or "HTTP_IF_MODIFIED_SINCE" in meta
+
+    def get_etag(self, version_key: str) -> str:
+        request = self.request
+        renderer = getattr(request, "accepted_renderer", None)
+        fingerprint = "|".join(
+            [
+                version_key,
+                str(request.user.pk),
+                getattr(renderer, "format", ""),
+                request.query_params.urlencode(),
+            ]
+        )
+        return f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+
+    def get_not_modified_response(
+        self, version_key: str, last_modified: Optional[datetime]
+    ) -> Optional[HttpResponseBase]:
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            self.request, etag=self.get_etag(version_key), last_modified=timestamp
+        )
+        if response is not None:
+            self.set_validators(response, version_key, last_modified)
+        return response
+
+    def set_validators(
+        self,
+        response: HttpResponseBase,
+        version_key: str,
+        last_modified: Optional[datetime],
+    ) -> HttpResponseBase:
+        if response.status_code in (200, 304):
+            response["ETag"] = self.get_etag(version_key)
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Mixin sending the reads of safe requests to a read replica once the
+    caller is authenticated.
+
+    Users are kept on the primary database for a while after a successful
+    write, so that they read their own writes.
+    """
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any):
+        with read_from(None):
+            return super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+
+    def initial(self, request: Request, *args: Any, **kwargs: Any) -> None:
+        super().initial(request, *args, **kwargs)  # type: ignore[misc]
+        if request.method in SAFE_METHODS and not is_stuck_to_primary(request.user.pk):
+            route_reads(choose_replica())
 
-        try:
-            return ShoppingList.objects.get(pk=shopping_list_pk)
-        except ShoppingList.DoesNotExist:
-            raise exceptions.NotFound("ShoppingList not found.")
+    def finalize_response(
+        self, request: Request, response: Response, *args: Any, **kwargs: Any
+    ) -> Response:
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            stick_to_primary(request.user.pk)
+        return super().finalize_response(  # type: ignore[misc]
+            request, response, *args, **kwargs
+        )
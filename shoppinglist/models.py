@@ -1,11 +1,188 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    Func,
+    JSONField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from kitchencompanion.settings import AUTH_USER_MODEL
 
 from .constants import ItemCategory, ItemUnit
 
+CATEGORY_COUNT_PREFIX = "category_count_"
+
+# What an item adds to the counters of its list: the list and whether the
+# item is completed.
+CountedItem = Tuple[int, bool]
+
+
+def category_count_annotation(category: ItemCategory) -> str:
+    return f"{CATEGORY_COUNT_PREFIX}{category.name.lower()}"
+
+
+class JSONSet(Func):
+    """
+    Set one top-level key of a JSON column in place, e.g. in an UPDATE.
+    """
+
+    function = "JSON_SET"
+    output_field = JSONField()
+
+    def __init__(self, expression: str, key: str, value: str) -> None:
+        super().__init__(F(expression), Value(f"$.{key}"), Value(value))
+
+
+def shared_with_user(user, shopping_list_ref: str = "pk") -> Exists:
+    """
+    EXISTS subquery telling whether the list referenced by the outer query's
+    ``shopping_list_ref`` column is shared with ``user``.
+    """
+    return Exists(
+        get_user_model().objects.filter(
+            pk=user.pk, shared_shopping_lists=OuterRef(shopping_list_ref)
+        )
+    )
+
+
+def count_items(**filters) -> Coalesce:
+    """Correlated COUNT of the outer list's items matching ``filters``."""
+    counts = (
+        Item.objects.filter(shopping_list=OuterRef("pk"), **filters)
+        .order_by()
+        .values("shopping_list")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def count_changes(
+    changes: Iterable[Tuple[Optional[CountedItem], Optional[CountedItem]]],
+) -> Dict[int, List[int]]:
+    """
+    ``[items, completed]`` deltas per list of items moving from one counted
+    state to another, ``None`` standing for a missing item.
+    """
+    deltas: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+    for before, after in changes:
+        if before == after:
+            continue
+        if before is not None:
+            deltas[before[0]][0] -= 1
+            deltas[before[0]][1] -= before[1]
+        if after is not None:
+            deltas[after[0]][0] += 1
+            deltas[after[0]][1] += after[1]
+    return deltas
+
+
+class ShoppingListQuerySet(models.QuerySet):
+    def accessible_to(self, user) -> "ShoppingListQuerySet":
+        """
+        Lists owned by or shared with ``user``.
+
+        Sharing is checked with an EXISTS subquery instead of a join so that a
+        list shared with several users is returned only once. Its result is
+        kept as the ``is_shared_with_user`` annotation, which lets permission
+        checks resolve the caller's access without another query.
+        """
+        return self.with_access(user).filter(Q(user=user) | Q(is_shared_with_user=True))
+
+    def with_access(self, user) -> "ShoppingListQuerySet":
+        return self.annotate(is_shared_with_user=shared_with_user(user))
+
+    def with_item_stats(self) -> "ShoppingListQuerySet":
+        """
+        Annotate per-category item counts and sharing info computed in the
+        same statement. The item totals are stored on the list itself.
+        """
+        shared_with_count = (
+            ShoppingList.shared_with.through.objects.filter(
+                shoppinglist_id=OuterRef("pk")
+            )
+            .values("shoppinglist_id")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        category_counts = {
+            category_count_annotation(category): Count(
+                "items", filter=Q(items__category=category)
+            )
+            for category in ItemCategory
+        }
+        return self.annotate(
+            shared_with_count=Coalesce(Subquery(shared_with_count), Value(0)),
+            **category_counts,
+        )
+
+    def add_to_item_counts(self, deltas: Dict[int, List[int]]) -> None:
+        """
+        Add ``[items, completed]`` deltas to the counters of the lists, keyed
+        by list id, with F() updates. Lists changing by the same amounts are
+        updated together, so a write touching one list costs one UPDATE.
+        """
+        lists_by_delta: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for shopping_list_id, (items, completed) in deltas.items():
+            if items or completed:
+                lists_by_delta[items, completed].append(shopping_list_id)
+        for (items, completed), shopping_list_ids in lists_by_delta.items():
+            self.filter(pk__in=shopping_list_ids).update(
+                items_count=F("items_count") + items,
+                completed_count=F("completed_count") + completed,
+            )
+
+    def with_counted_items(self) -> "ShoppingListQuerySet":
+        """Annotate the item counters as counted from the items table."""
+        return self.annotate(
+            counted_items=count_items(), counted_completed=count_items(completed=True)
+        )
+
+    def recount_items(self) -> int:
+        """Recompute the stored item counters from the items table."""
+        return self.update(
+            items_count=count_items(), completed_count=count_items(completed=True)
+        )
+
+    def touch(self, **fields) -> int:
+        """
+        Bump ``version`` and ``updated`` after a change to a list or its
+        items, which invalidates the ETag/Last-Modified of the list.
+        """
+        return self.update(version=F("version") + 1, updated=timezone.now(), **fields)
+
+    def refresh_completed(self) -> int:
+        """
+        Derive ``completed`` from the item counters in a single UPDATE: a
+        list is completed when it has items and all of them are completed.
+        The caller bumps the version before changing the items.
+        """
+        return self.update(
+            completed=Case(
+                When(
+                    items_count__gt=0,
+                    items_count=F("completed_count"),
+                    then=Value(True),
+                ),
+                default=Value(False),
+            )
+        )
+
 
 class ShoppingList(models.Model):
     """
@@ -18,8 +195,17 @@ class ShoppingList(models.Model):
     - created: Timestamp when the shopping list was created.
     - updated: Timestamp when the shopping list was last updated.
     - completed: Flag to mark if the shopping list is completed.
+    - version: Counter bumped on every change to the list or its items,
+      used for ETags and as the delta sync cursor.
+    - sync_floor: Highest version whose tombstones have been purged; older
+      sync cursors can no longer be served.
+    - items_count, completed_count: Number of items and of completed items,
+      kept up to date by every write to the items.
     """
 
+    COUNTER_FIELDS = ("items_count", "completed_count")
+    VERSION_FIELDS = ("version", "sync_floor")
+
     user = models.ForeignKey(
         AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True
     )
@@ -28,19 +214,198 @@ class ShoppingList(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     completed = models.BooleanField(default=False)
+    version = models.PositiveBigIntegerField(default=1)
+    sync_floor = models.PositiveBigIntegerField(default=0)
+    items_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
     shared_with = models.ManyToManyField(
         get_user_model(), related_name="shared_shopping_lists", blank=True
     )
 
+    objects = ShoppingListQuerySet.as_manager()
+
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs) -> None:
+        # The counters, the version and the sync floor only change through
+        # F() updates (``touch()``, the item writes, the tombstone purge);
+        # saving an instance loaded earlier must not write back stale ones.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.COUNTER_FIELDS
+                and field.name not in self.VERSION_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def bump_version(self) -> int:
+        """
+        Bump the version of the list and return the new one. Call it inside
+        the transaction of a write, before changing the items, so that the
+        list row stays locked until the changes carrying the version commit.
+        """
+        shopping_lists = ShoppingList.objects.filter(pk=self.pk)
+        shopping_lists.touch()
+        self.version, self.updated = shopping_lists.values_list(
+            "version", "updated"
+        ).get()
+        return self.version
+
     class Meta:
-        ordering = ["created"]
+        ordering = ["created", "id"]
+        indexes = [
+            models.Index(fields=["created", "id"], name="shoppinglist_created_id_idx"),
+        ]
         verbose_name = "shopping list"
         verbose_name_plural = "shopping lists"
 
 
+class ItemQuerySet(models.QuerySet):
+    def accessible_to(self, user) -> "ItemQuerySet":
+        """
+        Items of lists owned by or shared with ``user``, with the parent list
+        joined in so that access is checked in the same query.
+        """
+        return (
+            self.select_related("shopping_list")
+            .annotate(is_shared_with_user=shared_with_user(user, "shopping_list_id"))
+            .filter(Q(shopping_list__user=user) | Q(is_shared_with_user=True))
+        )
+
+    def count_by_list(self) -> Dict[int, List[int]]:
+        """``[items, completed]`` counts of the selected items per list."""
+        rows = (
+            self.order_by()
+            .values("shopping_list_id")
+            .annotate(
+                items=Count("pk"), completed=Count("pk", filter=Q(completed=True))
+            )
+        )
+        return {
+            row["shopping_list_id"]: [row["items"], row["completed"]] for row in rows
+        }
+
+    def counted_states(self) -> Dict[int, CountedItem]:
+        return {
+            pk: (shopping_list_id, completed)
+            for pk, shopping_list_id, completed in self.order_by().values_list(
+                "pk", "shopping_list_id", "completed"
+            )
+        }
+
+    # The overrides below keep the item counters of the lists in step with
+    # bulk writes, in the transaction of the write. Items deleted along with
+    # their list are not counted.
+
+    def bulk_create(self, objs: Iterable["Item"], *args, **kwargs) -> List["Item"]:
+        self._for_write = True
+        with transaction.atomic(using=self.db, savepoint=False):
+            items = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts"):
+                # Which rows were written is unknown, count them again.
+                ShoppingList.objects.using(self.db).filter(
+                    pk__in={item.shopping_list_id for item in items}
+                ).recount_items()
+            else:
+                ShoppingList.objects.using(self.db).add_to_item_counts(
+                    count_changes(
+                        (None, (item.shopping_list_id, item.completed))
+                        for item in items
+                    )
+                )
+        return items
+
+    def bulk_update(
+        self, objs: Iterable["Item"], fields: Iterable[str], *args, **kwargs
+    ) -> int:
+        objs, fields = list(objs), list(fields)
+        names = {self.model._meta.get_field(field).name for field in fields}
+        if names.isdisjoint(("shopping_list", "completed")):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+
+        self._for_write = True
+        with transaction.atomic(using=self.db, savepoint=False):
+            before = (
+                Item.objects.using(self.db)
+                .filter(pk__in=[item.pk for item in objs])
+                .counted_states()
+            )
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            changes = []
+            for item in objs:
+                previous = before.get(item.pk)
+                if previous is not None:
+                    shopping_list_id, completed = previous
+                    if "shopping_list" in names:
+                        shopping_list_id = item.shopping_list_id
+                    if "completed" in names:
+                        completed = item.completed
+                    changes.append((previous, (shopping_list_id, completed)))
+            ShoppingList.objects.using(self.db).add_to_item_counts(
+                count_changes(changes)
+            )
+        return rows
+
+    def update(self, **kwargs) -> int:
+        """
+        Counts are kept for ``completed`` set to a boolean and for items moved
+        to another list; expressions are left to ``bulk_update()``, which
+        passes them here and counts the change itself.
+        """
+        completed = kwargs.get("completed")
+        target = kwargs.get("shopping_list", kwargs.get("shopping_list_id"))
+        if hasattr(target, "resolve_expression"):
+            target = None
+        if not isinstance(completed, bool) and target is None:
+            return super().update(**kwargs)
+
+        self._for_write = True
+        with transaction.atomic(using=self.db, savepoint=False):
+            shopping_lists = ShoppingList.objects.using(self.db)
+            if target is None:
+                flipped = self.exclude(completed=completed).count_by_list()
+                rows = super().update(**kwargs)
+                sign = 1 if completed else -1
+                shopping_lists.add_to_item_counts(
+                    {pk: [0, sign * items] for pk, (items, _) in flipped.items()}
+                )
+            else:
+                # Moves are rare; count the lists involved again.
+                shopping_list_ids = set(self.count_by_list())
+                rows = super().update(**kwargs)
+                shopping_list_ids.add(getattr(target, "pk", target))
+                shopping_lists.filter(pk__in=shopping_list_ids).recount_items()
+        return rows
+
+    def delete(self) -> Tuple[int, Dict[str, int]]:
+        self._for_write = True
+        with transaction.atomic(using=self.db, savepoint=False):
+            removed = self.count_by_list()
+            deleted = super().delete()
+            ShoppingList.objects.using(self.db).add_to_item_counts(
+                {pk: [-items, -completed] for pk, (items, completed) in removed.items()}
+            )
+        return deleted
+
+    def set_completed(self, completed: bool, version: int) -> int:
+        """
+        Check the items off (or back on) in one UPDATE, stamping them with
+        the list ``version`` and the edit time of ``completed``.
+        """
+        now = timezone.now()
+        return self.update(
+            completed=completed,
+            updated=now,
+            changed_version=version,
+            field_clock=JSONSet("field_clock", "completed", now.isoformat()),
+        )
+
+
 class Item(models.Model):
     """
     Represents an item in a shopping list.
@@ -55,6 +420,10 @@ class Item(models.Model):
     - created: Timestamp when the item was added to the list.
     - updated: Timestamp when the item details were last updated.
     - completed: Flag to mark if the item has been purchased/completed.
+    - changed_version: Version of the shopping list at the item's last
+      change, used by delta sync.
+    - field_clock: Timestamp of the last edit of each field, used to resolve
+      conflicting offline edits field by field.
     """
 
     shopping_list = models.ForeignKey(
@@ -72,11 +441,148 @@ class Item(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     completed = models.BooleanField(default=False, db_index=True)
+    changed_version = models.PositiveBigIntegerField(default=0)
+    field_clock = models.JSONField(default=dict, blank=True)
+
+    objects = ItemQuerySet.as_manager()
 
     def __str__(self) -> str:
         return self.product
 
+    def save(self, *args, **kwargs) -> None:
+        update_fields = kwargs.get("update_fields")
+        saved = {"shopping_list", "completed"}
+        if update_fields is not None:
+            saved &= set(update_fields)
+        if not saved:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic(savepoint=False):
+            before: Optional[CountedItem] = None
+            if not self._state.adding:
+                before = Item.objects.filter(pk=self.pk).counted_states().get(self.pk)
+            super().save(*args, **kwargs)
+            after = (self.shopping_list_id, self.completed)
+            if before is not None:
+                after = (
+                    after[0] if "shopping_list" in saved else before[0],
+                    after[1] if "completed" in saved else before[1],
+                )
+            ShoppingList.objects.add_to_item_counts(count_changes([(before, after)]))
+
+    def delete(self, *args, **kwargs) -> Tuple[int, Dict[str, int]]:
+        with transaction.atomic(savepoint=False):
+            removed = Item.objects.filter(pk=self.pk).count_by_list()
+            deleted = super().delete(*args, **kwargs)
+            ShoppingList.objects.add_to_item_counts(
+                {pk: [-items, -completed] for pk, (items, completed) in removed.items()}
+            )
+        return deleted
+
+    def get_field_clock(self, field: str) -> datetime:
+        """When ``field`` was last edited; fields never edited date from creation."""
+        stamp = self.field_clock.get(field)
+        return datetime.fromisoformat(stamp) if stamp else self.created
+
+    def stamp_fields(self, fields: Iterable[str], when: datetime) -> None:
+        self.field_clock = {
+            **self.field_clock,
+            **{field: when.isoformat() for field in fields},
+        }
+
     class Meta:
-        ordering = ["completed"]
+        ordering = ["completed", "created", "id"]
+        indexes = [
+            models.Index(
+                fields=["shopping_list", "completed", "created", "id"],
+                name="item_list_completed_idx",
+            ),
+            models.Index(
+                fields=["shopping_list", "changed_version"],
+                name="item_list_changed_idx",
+            ),
+            models.Index(
+                fields=["shopping_list", "category", "completed", "created", "id"],
+                name="item_list_category_idx",
+            ),
+            models.Index(
+                fields=["shopping_list", "created", "id"],
+                name="item_list_created_idx",
+            ),
+            models.Index(
+                fields=["shopping_list", "product", "id"],
+                name="item_list_product_idx",
+            ),
+        ]
         verbose_name = "item"
         verbose_name_plural = "items"
+
+
+class ItemTombstone(models.Model):
+    """
+    Records the deletion of an item so that delta sync can report it.
+
+    Attributes:
+    - shopping_list: The shopping list the item belonged to.
+    - item_id: Primary key of the deleted item.
+    - version: Version of the shopping list at the deletion.
+    - deleted: Timestamp of the deletion, used for the retention window.
+    """
+
+    shopping_list = models.ForeignKey(
+        ShoppingList, on_delete=models.CASCADE, related_name="tombstones"
+    )
+    item_id = models.BigIntegerField()
+    version = models.PositiveBigIntegerField()
+    deleted = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self) -> str:
+        return f"Item {self.item_id} deleted at version {self.version}"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["shopping_list", "version"], name="tombstone_list_version_idx"
+            ),
+        ]
+        verbose_name = "item tombstone"
+        verbose_name_plural = "item tombstones"
+
+
+class SyncOperation(models.Model):
+    """
+    An operation of an offline operation log that has been applied, so that
+    replaying the log does not apply it twice.
+
+    Attributes:
+    - shopping_list: The shopping list the operation was applied to.
+    - op_id: Client generated id of the operation.
+    - client_id: Client generated id of the item created by the operation.
+    - item_id: Primary key of the item the operation targeted.
+    - applied: Timestamp when the operation was applied.
+    """
+
+    shopping_list = models.ForeignKey(
+        ShoppingList, on_delete=models.CASCADE, related_name="sync_operations"
+    )
+    op_id = models.UUIDField()
+    client_id = models.CharField(max_length=64, null=True, blank=True)
+    item_id = models.BigIntegerField(null=True, blank=True)
+    applied = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self) -> str:
+        return str(self.op_id)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["shopping_list", "op_id"], name="sync_operation_unique_op"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["shopping_list", "client_id"], name="sync_operation_client_idx"
+            ),
+        ]
+        verbose_name = "sync operation"
+        verbose_name_plural = "sync operations"
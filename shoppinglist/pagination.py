@@ -0,0 +1,206 @@
+import binascii
+import json
+from base64 import b64decode, b64encode
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import BooleanField, Expression, F, QuerySet, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class RowComparison(Expression):
+    """
+    Row value comparison, e.g. ``(completed, created, id) > (%s, %s, %s)``.
+
+    Unlike the equivalent chain of ORs this lets the database seek straight
+    to the cursor position in a composite index.
+    """
+
+    output_field = BooleanField()
+    conditional = True
+
+    def __init__(
+        self, lhs: Sequence[Expression], operator: str, rhs: Sequence[Expression]
+    ) -> None:
+        super().__init__()
+        self.lhs = list(lhs)
+        self.operator = operator
+        self.rhs = list(rhs)
+
+    def get_source_expressions(self) -> List[Expression]:
+        return [*self.lhs, *self.rhs]
+
+    def set_source_expressions(self, exprs: Sequence[Expression]) -> None:
+        self.lhs, self.rhs = list(exprs[: len(self.lhs)]), list(exprs[len(self.lhs) :])
+
+    def as_sql(self, compiler, connection) -> Tuple[str, List[Any]]:
+        sql_parts: List[List[str]] = [[], []]
+        params: List[Any] = []
+        for side, expressions in enumerate((self.lhs, self.rhs)):
+            for expression in expressions:
+                sql, expression_params = compiler.compile(expression)
+                sql_parts[side].append(sql)
+                params.extend(expression_params)
+        lhs_sql, rhs_sql = (", ".join(part) for part in sql_parts)
+        return f"({lhs_sql}) {self.operator} ({rhs_sql})", params
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a unique, ascending composite ordering.
+
+    Each page is fetched with a row value comparison against the last row of
+    the previous page, so a deep page costs the same as the first one as long
+    as ``ordering`` is backed by an index. Pagination is opt-in: requests
+    without ``page_size`` or ``cursor`` keep the plain list response.
+
+    Views may set ``ordering`` and ``descending`` on the paginator per
+    request; a cursor is only valid for the ordering it was issued for.
+    """
+
+    ordering: Tuple[str, ...] = ("id",)
+    descending = False
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> Optional[List[Any]]:
+        params = request.query_params
+        if (
+            self.cursor_query_param not in params
+            and self.page_size_query_param not in params
+        ):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request, queryset)
+
+        backwards = reverse != self.descending
+        ordering = [f"-{field}" if backwards else field for field in self.ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                RowComparison(
+                    [F(field) for field in self.ordering],
+                    "<" if backwards else ">",
+                    [
+                        Value(value, output_field=queryset.model._meta.get_field(field))
+                        for field, value in zip(self.ordering, position)
+                    ],
+                )
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, obj: Any, reverse: bool) -> str:
+        position = [
+            obj._meta.get_field(field).value_to_string(obj) for field in self.ordering
+        ]
+        payload = json.dumps(
+            {"p": position, "r": int(reverse), "o": self.ordering_key()}
+        )
+        encoded = b64encode(payload.encode("utf-8")).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def ordering_key(self) -> str:
+        return ("-" if self.descending else "") + ",".join(self.ordering)
+
+    def decode_cursor(
+        self, request: Request, queryset: QuerySet
+    ) -> Tuple[Optional[List[Any]], bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(b64decode(encoded.encode("ascii")).decode("utf-8"))
+            raw_position = payload["p"]
+            reverse = bool(payload["r"])
+            if payload.get("o", self.ordering_key()) != self.ordering_key():
+                raise ValueError
+            if len(raw_position) != len(self.ordering):
+                raise ValueError
+            position = [
+                queryset.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, raw_position)
+            ]
+        except (
+            binascii.Error,
+            DjangoValidationError,
+            KeyError,
+            TypeError,
+            UnicodeError,
+            ValueError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+
+class ShoppingListPagination(KeysetPagination):
+    ordering = ("created", "id")
+
+
+class ItemPagination(KeysetPagination):
+    ordering = ("completed", "created", "id")
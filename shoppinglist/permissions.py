@@ -1,12 +1,45 @@
+from typing import Dict, Optional
+
 from rest_framework.permissions import BasePermission
+from rest_framework.request import Request
 
+from .constants import ShoppingListAccess
+from .models import ShoppingList
 
-class IsOwnerOrSharedUser(BasePermission):
-    def has_object_permission(self, request, view, obj):
-        if obj.user == request.user:
-            return True
 
-        if request.user in obj.shared_with.all():
-            return True
+def get_shopping_list_access(
+    request: Request, shopping_list: ShoppingList
+) -> Optional[ShoppingListAccess]:
+    """
+    Resolve the caller's access to ``shopping_list`` once per request.
+
+    Ownership is read from ``user_id`` and sharing from the
+    ``is_shared_with_user`` annotation added by ``accessible_to``; only
+    unannotated instances cost a single EXISTS query. The result is cached on
+    the request, so the permission class, the view and the serializer share it.
+    """
+    cache: Dict[int, Optional[ShoppingListAccess]] = request.__dict__.setdefault(
+        "_shopping_list_access", {}
+    )
+    if shopping_list.pk in cache:
+        return cache[shopping_list.pk]
+
+    user = request.user
+    access: Optional[ShoppingListAccess] = None
+    if user.is_authenticated:
+        if shopping_list.user_id == user.pk:
+            access = ShoppingListAccess.OWNER
+        else:
+            is_shared = getattr(shopping_list, "is_shared_with_user", None)
+            if is_shared is None:
+                is_shared = shopping_list.shared_with.filter(pk=user.pk).exists()
+            if is_shared:
+                access = ShoppingListAccess.SHARED
 
-        return False
+    cache[shopping_list.pk] = access
+    return access
+
+
+class IsOwnerOrSharedUser(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return get_shopping_list_access(request, obj) is not None
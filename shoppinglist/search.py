@@ -0,0 +1,87 @@
+"""
+Full-text search over the items of every list a user can access.
+
+On SQLite the search runs against the ``shoppinglist_item_fts`` FTS5 index
+created in migration 0008, joined with the items and their lists in one
+query and ranked with BM25. Other databases fall back to a case-insensitive
+substring match without ranking.
+"""
+
+import re
+from typing import List, Optional
+
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+
+from .models import Item, ShoppingList
+
+SEARCH_TABLE = "shoppinglist_item_fts"
+TERM = re.compile(r"\w+")
+
+
+def match_expression(text: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query matching items that contain every
+    word, the last one possibly unfinished. Quoting each word keeps the
+    user's input from being parsed as query syntax.
+    """
+    terms = TERM.findall(text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_items(user, text: str, limit: int) -> List[Item]:
+    """
+    Items of the lists ``user`` owns or has been shared that match ``text``,
+    best matches first, each with ``shopping_list_name`` and ``rank``.
+    """
+    expression = match_expression(text)
+    if expression is None:
+        return []
+    if connection.vendor != "sqlite":
+        return fallback_search_items(user, text, limit)
+
+    item_table = Item._meta.db_table
+    list_table = ShoppingList._meta.db_table
+    shared_table = ShoppingList.shared_with.through._meta.db_table
+    return list(
+        Item.objects.raw(
+            f"""
+            SELECT item.*, list.name AS shopping_list_name,
+                   {SEARCH_TABLE}.rank AS rank
+            FROM {SEARCH_TABLE}
+            JOIN {item_table} AS item ON item.id = {SEARCH_TABLE}.rowid
+            JOIN {list_table} AS list ON list.id = item.shopping_list_id
+            WHERE {SEARCH_TABLE} MATCH %s
+              AND (
+                list.user_id = %s
+                OR EXISTS (
+                    SELECT 1 FROM {shared_table} AS shared
+                    WHERE shared.shoppinglist_id = list.id
+                      AND shared.customuser_id = %s
+                )
+              )
+            ORDER BY rank, item.id
+            LIMIT %s
+            """,
+            [expression, user.pk, user.pk, limit],
+        )
+    )
+
+
+def fallback_search_items(user, text: str, limit: int) -> List[Item]:
+    condition = Q()
+    for term in TERM.findall(text):
+        condition &= Q(product__icontains=term) | Q(note__icontains=term)
+    return list(
+        Item.objects.accessible_to(user)
+        .filter(condition)
+        .annotate(
+            shopping_list_name=F("shopping_list__name"),
+            rank=Value(0.0, output_field=FloatField()),
+        )
+        .order_by("pk")[:limit]
+    )
@@ -1,8 +1,11 @@
-from typing import Type
+from typing import Any, Dict, Iterable, Optional, Type
 
+from django.db.models import Count
 from rest_framework import serializers
 
-from .models import Item, ShoppingList
+from .constants import ItemCategory, ItemUnit
+from .models import Item, ShoppingList, category_count_annotation
+from .permissions import get_shopping_list_access
 
 
 class ItemSerializer(serializers.ModelSerializer):
@@ -11,16 +14,259 @@ class ItemSerializer(serializers.ModelSerializer):
         fields = ("id", "product", "quantity", "unit", "note", "category", "completed")
 
 
+class ShoppingListImportSerializer(serializers.ModelSerializer):
+    """Validates the list columns of an imported row."""
+
+    class Meta:
+        model: Type[ShoppingList] = ShoppingList
+        fields = ("name", "description", "completed")
+
+
+class TransferQuerySerializer(serializers.Serializer):
+    """File format of a list export or import."""
+
+    type = serializers.ChoiceField(choices=["csv", "jsonl"], default="csv")
+
+
+class TransferImportSerializer(TransferQuerySerializer):
+    file = serializers.FileField()
+
+
+class ShoppingListShareSerializer(serializers.Serializer):
+    """Lists to share and the emails of the users to share each of them with."""
+
+    MAX_LISTS = 100
+    MAX_EMAILS = 50
+
+    lists = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_LISTS,
+    )
+    emails = serializers.ListField(
+        child=serializers.EmailField(), allow_empty=False, max_length=MAX_EMAILS
+    )
+
+
+class ItemBatchOperationSerializer(serializers.Serializer):
+    """
+    Validates the envelope of a single batch operation; the item payload in
+    ``data`` is validated separately with ``ItemSerializer``.
+    """
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+    op = serializers.ChoiceField(choices=[CREATE, UPDATE, DELETE])
+    id = serializers.IntegerField(required=False, min_value=1)
+    data = serializers.DictField(required=False)
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        if attrs["op"] != self.CREATE and "id" not in attrs:
+            raise serializers.ValidationError({"id": "This field is required."})
+        if attrs["op"] != self.DELETE and "data" not in attrs:
+            raise serializers.ValidationError({"data": "This field is required."})
+        return attrs
+
+
+class ItemBatchSerializer(serializers.Serializer):
+    MAX_OPERATIONS = 500
+
+    operations = ItemBatchOperationSerializer(
+        many=True, allow_empty=False, max_length=MAX_OPERATIONS
+    )
+
+
+class ItemListQuerySerializer(serializers.Serializer):
+    """
+    Filters, sort key and facets of the item list. ``category`` and ``unit``
+    may be repeated to match any of the values; ``unit=none`` selects items
+    without a unit.
+    """
+
+    SORT_KEYS = ("category", "created", "product")
+    NO_UNIT = "none"
+
+    category = serializers.ListField(
+        child=serializers.ChoiceField(choices=ItemCategory.choices), required=False
+    )
+    unit = serializers.ListField(
+        child=serializers.ChoiceField(choices=[*ItemUnit.values, NO_UNIT]),
+        required=False,
+    )
+    completed = serializers.BooleanField(allow_null=True, default=None)
+    sort = serializers.ChoiceField(
+        choices=[*SORT_KEYS, *(f"-{key}" for key in SORT_KEYS)], required=False
+    )
+    facets = serializers.BooleanField(default=False)
+
+
+class ItemStateTransitionSerializer(serializers.Serializer):
+    """
+    Selects the items of a list to complete or uncomplete. Without filters
+    every item of the list is selected.
+    """
+
+    category = serializers.ChoiceField(choices=ItemCategory.choices, required=False)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=ItemBatchSerializer.MAX_OPERATIONS,
+    )
+
+
+class ItemSyncOperationSerializer(serializers.Serializer):
+    """
+    Validates one entry of an offline operation log. Items created offline
+    are referenced by their ``client_id`` until the client learns their id.
+    """
+
+    CREATE = "create"
+    UPDATE = "update"
+    TOGGLE = "toggle"
+    DELETE = "delete"
+
+    op_id = serializers.UUIDField()
+    op = serializers.ChoiceField(choices=[CREATE, UPDATE, TOGGLE, DELETE])
+    id = serializers.IntegerField(required=False, min_value=1)
+    client_id = serializers.CharField(required=False, max_length=64)
+    timestamp = serializers.DateTimeField()
+    data = serializers.DictField(required=False)
+    completed = serializers.BooleanField(required=False)
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        op = attrs["op"]
+        if op == self.CREATE and "client_id" not in attrs:
+            raise serializers.ValidationError({"client_id": "This field is required."})
+        if op != self.CREATE and "id" not in attrs and "client_id" not in attrs:
+            raise serializers.ValidationError({"id": "This field is required."})
+        if op in (self.CREATE, self.UPDATE) and "data" not in attrs:
+            raise serializers.ValidationError({"data": "This field is required."})
+        if op == self.TOGGLE and "completed" not in attrs:
+            raise serializers.ValidationError({"completed": "This field is required."})
+        return attrs
+
+
+class ItemSyncSerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, required=False)
+    operations = ItemSyncOperationSerializer(
+        many=True, max_length=ItemBatchSerializer.MAX_OPERATIONS
+    )
+
+
+class ShoppingListChangesQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of delta sync. Without ``since`` every item is returned.
+    """
+
+    since = serializers.IntegerField(min_value=0, required=False)
+
+
+class ItemSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200, trim_whitespace=True)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class ItemSearchResultSerializer(ItemSerializer):
+    shopping_list_name = serializers.CharField(read_only=True)
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(ItemSerializer.Meta):
+        fields = (
+            *ItemSerializer.Meta.fields,
+            "shopping_list",
+            "shopping_list_name",
+            "rank",
+        )
+        read_only_fields = fields
+
+
+class ProductSuggestionQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200, trim_whitespace=True)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class ProductSuggestionSerializer(serializers.Serializer):
+    product = serializers.CharField()
+    category = serializers.CharField()
+    unit = serializers.CharField(allow_null=True)
+    quantity = serializers.IntegerField(allow_null=True)
+    count = serializers.IntegerField()
+    last_used = serializers.DateTimeField()
+
+
 class ShoppingListSerializer(serializers.ModelSerializer):
     items = ItemSerializer(many=True, read_only=True)
-    items_count = serializers.SerializerMethodField()
+    completed_items_count = serializers.IntegerField(
+        source="completed_count", read_only=True
+    )
+    category_counts = serializers.SerializerMethodField()
+    shared_with_count = serializers.SerializerMethodField()
+    access = serializers.SerializerMethodField()
+
+    expandable_fields = ("items",)
 
     class Meta:
         model: Type[ShoppingList] = ShoppingList
-        fields = "__all__"
+        exclude = ("completed_count",)
+        read_only_fields = ("version", "sync_floor", "items_count")
+
+    def __init__(
+        self,
+        *args: Any,
+        fields: Optional[Iterable[str]] = None,
+        expand: Optional[Iterable[str]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        ``fields`` limits the serialized fields to the given names and
+        ``expand`` lists the expandable relations to embed. Without ``expand``
+        every relation is embedded.
+        """
+        super().__init__(*args, **kwargs)
+
+        if expand is not None:
+            for field_name in set(self.expandable_fields) - set(expand):
+                self.fields.pop(field_name, None)
+
+        if fields is not None:
+            allowed = {"id", *fields, *(expand or ())}
+            for field_name in set(self.fields) - allowed:
+                self.fields.pop(field_name)
+
+    # Item totals are stored on the list. The other counters are read from
+    # the ``with_item_stats`` annotations when present and only fall back to
+    # per-object queries for unannotated instances.
+
+    def get_category_counts(self, obj: ShoppingList) -> Dict[str, int]:
+        if hasattr(obj, category_count_annotation(ItemCategory.OTHER)):
+            counts = {
+                category.value: getattr(obj, category_count_annotation(category))
+                for category in ItemCategory
+            }
+            return {category: count for category, count in counts.items() if count}
+        try:
+            return dict(
+                obj.items.order_by()
+                .values("category")
+                .annotate(count=Count("pk"))
+                .values_list("category", "count")
+            )
+        except AttributeError:
+            return {}
+
+    def get_access(self, obj: ShoppingList) -> Optional[str]:
+        request = self.context.get("request")
+        if request is None or not isinstance(obj, ShoppingList):
+            return None
+        return get_shopping_list_access(request, obj)
 
-    def get_items_count(self, obj: ShoppingList) -> int:
+    def get_shared_with_count(self, obj: ShoppingList) -> int:
+        if hasattr(obj, "shared_with_count"):
+            return obj.shared_with_count
         try:
-            return obj.items.count()
+            return obj.shared_with.count()
         except AttributeError:
             return 0
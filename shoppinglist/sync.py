@@ -0,0 +1,290 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Subquery
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .autocomplete import ProductChanges
+from .models import Item, ItemTombstone, ShoppingList, SyncOperation
+from .serializers import ItemSerializer, ItemSyncOperationSerializer
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Cursor has expired, fetch the whole shopping list."
+    default_code = "cursor_expired"
+
+
+def check_cursor(shopping_list: ShoppingList, since: Optional[int]) -> None:
+    if since is None:
+        return
+    if since > shopping_list.version:
+        raise ValidationError({"since": ["Cursor is ahead of the shopping list."]})
+    if since < shopping_list.sync_floor:
+        raise CursorExpired()
+
+
+def collect_changes(
+    shopping_list: ShoppingList, since: Optional[int]
+) -> Dict[str, Any]:
+    """
+    Items created, updated or deleted after the ``since`` cursor, together
+    with the cursor to send next time. Without ``since`` every item is
+    returned.
+    """
+    check_cursor(shopping_list, since)
+    cursor = shopping_list.version
+
+    # Bounding by the cursor keeps the page consistent with it even if a
+    # write commits while the response is being built.
+    items = Item.objects.filter(
+        shopping_list=shopping_list, changed_version__lte=cursor
+    )
+    deleted: List[int] = []
+    if since is not None:
+        items = items.filter(changed_version__gt=since)
+        deleted = list(
+            ItemTombstone.objects.filter(
+                shopping_list=shopping_list, version__gt=since, version__lte=cursor
+            ).values_list("item_id", flat=True)
+        )
+
+    return {
+        "cursor": cursor,
+        "items": ItemSerializer(items, many=True).data,
+        "deleted": deleted,
+    }
+
+
+APPLIED = "applied"
+DUPLICATE = "duplicate"
+STALE = "stale"
+NOT_FOUND = "not_found"
+REJECTED = "rejected"
+
+ITEM_FIELDS = [field for field in ItemSerializer.Meta.fields if field != "id"]
+
+
+def wins(item: Item, field: str, value: Any, when: datetime) -> bool:
+    """
+    Last-writer-wins for one field. On a tie an edit goes through, except
+    that an item checked off by anyone stays completed.
+    """
+    clock = item.get_field_clock(field)
+    if when != clock:
+        return when > clock
+    return field != "completed" or bool(value)
+
+
+def apply_operations(
+    shopping_list: ShoppingList,
+    operations: List[Dict[str, Any]],
+    version: int,
+    changes: Optional[ProductChanges] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Apply an offline operation log to the items of ``shopping_list``.
+
+    Call it inside the transaction that bumped the list to ``version``.
+    Operations already applied by an earlier upload of the log are skipped,
+    and conflicting edits are resolved field by field with ``wins()``
+    against the time each field was last edited. Client timestamps in the
+    future are clamped to the server time. Deletes always win. Each
+    operation gets a result; an invalid one is rejected without failing
+    the rest of the log. Created and edited items are recorded in
+    ``changes``, if given, for the autocomplete indexes.
+    """
+    if changes is None:
+        changes = ProductChanges()
+    now = timezone.now()
+    op_ids = [operation["op_id"] for operation in operations]
+    applied = {
+        record.op_id: record
+        for record in SyncOperation.objects.filter(
+            shopping_list=shopping_list, op_id__in=op_ids
+        )
+    }
+    client_ids = {op["client_id"] for op in operations if "client_id" in op}
+    created_ids: Dict[str, int] = dict(
+        SyncOperation.objects.filter(
+            shopping_list=shopping_list, client_id__in=client_ids, item_id__isnull=False
+        ).values_list("client_id", "item_id")
+    )
+    items = Item.objects.filter(shopping_list=shopping_list).in_bulk(
+        {op["id"] for op in operations if "id" in op} | set(created_ids.values())
+    )
+
+    new_items: Dict[str, Item] = {}
+    updated: Dict[int, Item] = {}
+    update_fields: Set[str] = set()
+    deleted: List[int] = []
+    records: List[Tuple[SyncOperation, Optional[Item]]] = []
+    results: List[Dict[str, Any]] = []
+    seen: Set[Any] = set()
+
+    for operation in operations:
+        op, op_id = operation["op"], operation["op_id"]
+        if op_id in applied or op_id in seen:
+            record = applied.get(op_id)
+            results.append(
+                {"op_id": op_id, "status": DUPLICATE, "id": record and record.item_id}
+            )
+            continue
+        seen.add(op_id)
+        when = min(operation["timestamp"], now)
+        client_id = operation.get("client_id")
+        result: Dict[str, Any] = {"op_id": op_id}
+        results.append(result)
+
+        if op == ItemSyncOperationSerializer.CREATE:
+            serializer = ItemSerializer(data=operation["data"])
+            if client_id in created_ids or client_id in new_items:
+                result.update(
+                    status=REJECTED,
+                    errors={"client_id": ["Item was already created."]},
+                )
+            elif not serializer.is_valid():
+                result.update(status=REJECTED, errors=serializer.errors)
+            else:
+                item = Item(
+                    shopping_list=shopping_list,
+                    changed_version=version,
+                    **serializer.validated_data,
+                )
+                # Until saved the item has no creation time to fall back on.
+                item.stamp_fields(ITEM_FIELDS, when)
+                new_items[client_id] = item
+                changes.created(item)
+                result.update(status=APPLIED, client_id=client_id, item=item)
+                records.append(
+                    (
+                        SyncOperation(
+                            shopping_list=shopping_list,
+                            op_id=op_id,
+                            client_id=client_id,
+                        ),
+                        item,
+                    )
+                )
+                continue
+            records.append(
+                (SyncOperation(shopping_list=shopping_list, op_id=op_id), None)
+            )
+            continue
+
+        if "id" in operation:
+            item = items.get(operation["id"])
+        else:
+            item = new_items.get(client_id) or items.get(created_ids.get(client_id))
+        records.append((SyncOperation(shopping_list=shopping_list, op_id=op_id), item))
+        if item is None:
+            result["status"] = NOT_FOUND
+            continue
+        result["item"] = item
+
+        if op == ItemSyncOperationSerializer.DELETE:
+            changes.deleted(item)
+            if item.pk is None:
+                del new_items[client_id]
+            else:
+                del items[item.pk]
+                updated.pop(item.pk, None)
+                deleted.append(item.pk)
+            result["status"] = APPLIED
+            continue
+
+        if op == ItemSyncOperationSerializer.TOGGLE:
+            data = {"completed": operation["completed"]}
+        else:
+            data = operation["data"]
+        serializer = ItemSerializer(item, data=data, partial=True)
+        if not serializer.is_valid():
+            result.update(status=REJECTED, errors=serializer.errors)
+            continue
+
+        won = [
+            field
+            for field, value in serializer.validated_data.items()
+            if wins(item, field, value, when)
+        ]
+        changes.changing(item, won)
+        for field in won:
+            setattr(item, field, serializer.validated_data[field])
+        item.stamp_fields(won, when)
+        if won and item.pk is not None:
+            updated[item.pk] = item
+            update_fields.update(won)
+        result["status"] = APPLIED if won else STALE
+        ignored = [field for field in serializer.validated_data if field not in won]
+        if ignored:
+            result["ignored"] = ignored
+
+    Item.objects.bulk_create(new_items.values())
+    if updated:
+        for item in updated.values():
+            item.updated = now
+            item.changed_version = version
+        Item.objects.bulk_update(
+            updated.values(),
+            [*update_fields, "updated", "changed_version", "field_clock"],
+        )
+    if deleted:
+        ItemTombstone.objects.bulk_create(
+            ItemTombstone(shopping_list=shopping_list, item_id=item_id, version=version)
+            for item_id in deleted
+        )
+        Item.objects.filter(pk__in=deleted).delete()
+
+    for record, item in records:
+        record.item_id = item and item.pk
+    SyncOperation.objects.bulk_create(record for record, _ in records)
+
+    for result in results:
+        item = result.pop("item", None)
+        if item is not None:
+            result["id"] = item.pk
+    return results
+
+
+def purge_tombstones(retention: Optional[timedelta] = None) -> int:
+    """
+    Delete tombstones older than the retention window.
+
+    The ``sync_floor`` of every affected list is raised to the newest purged
+    version first, so that clients holding an older cursor are told to fetch
+    the whole list again instead of silently missing deletions.
+    """
+    if retention is None:
+        retention = settings.SYNC_TOMBSTONE_RETENTION
+    expired = ItemTombstone.objects.filter(deleted__lt=timezone.now() - retention)
+    purged_through = (
+        expired.filter(shopping_list=OuterRef("pk"))
+        .values("shopping_list")
+        .annotate(version=Max("version"))
+        .values("version")
+    )
+
+    with transaction.atomic():
+        ShoppingList.objects.filter(
+            Exists(expired.filter(shopping_list=OuterRef("pk")))
+        ).update(sync_floor=Greatest("sync_floor", Subquery(purged_through)))
+        deleted, _ = expired.delete()
+    return deleted
+
+
+def purge_sync_operations(retention: Optional[timedelta] = None) -> int:
+    """
+    Forget applied offline operations older than the retention window; an
+    operation log is not expected to be replayed after that long.
+    """
+    if retention is None:
+        retention = settings.SYNC_TOMBSTONE_RETENTION
+    deleted, _ = SyncOperation.objects.filter(
+        applied__lt=timezone.now() - retention
+    ).delete()
+    return deleted
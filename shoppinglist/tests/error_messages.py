@@ -16,10 +16,14 @@ class ERRORS:
     )
     MIN_QUANTITY_ERROR = "Ensure this value is greater than or equal to 1."
     FIELD_REQUIRED_ERROR = ["This field is required."]
+    FIELD_REQUIRED = ErrorDetail(string="This field is required.", code="invalid")
     NOT_FOUND_ERROR = {"detail": "Not found."}
     SH_LIST_NOT_FOUND_ERROR = {
         "detail": ErrorDetail(string="ShoppingList not found.", code="not_found")
     }
+    INVALID_CURSOR_ERROR = {
+        "detail": ErrorDetail(string="Invalid cursor.", code="not_found")
+    }
     NOT_BLANK_ERROR = ErrorDetail(string="This field may not be blank.", code="blank")
     UNAUTHORIZED = ErrorDetail(
         string="Authentication credentials were not provided.", code="not_authenticated"
@@ -0,0 +1,307 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from freezegun import freeze_time
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from conftest import create_item, create_shopping_list
+from shoppinglist import autocomplete
+from shoppinglist.autocomplete import ProductIndex, ProductUse
+from shoppinglist.constants import ItemCategory, ItemUnit
+from shoppinglist.models import ShoppingList
+from users.models import CustomUser
+
+from .urls import URLS
+
+NOW = timezone.now().timestamp()
+
+
+def reads_items(context: CaptureQueriesContext) -> bool:
+    return any(
+        "shoppinglist_item" in query["sql"] for query in context.captured_queries
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_indexes() -> None:
+    # Indexes are cached per user id, which the database reuses across tests.
+    cache.clear()
+
+
+class TestProductIndex:
+    def test_matches_name_and_word_prefixes(self) -> None:
+        index = ProductIndex()
+        index.add("Milk", ItemCategory.DAIRY, None, None, NOW)
+        index.add("Skim milk", ItemCategory.DAIRY, None, None, NOW)
+        index.add("Mint", ItemCategory.HERBS, None, None, NOW)
+        index.add("Eggs", ItemCategory.DAIRY, None, None, NOW)
+
+        products = {suggestion["product"] for suggestion in index.search("mi", 10)}
+
+        assert products == {"Milk", "Skim milk", "Mint"}
+        assert index.search(" SKIM  m", 10)[0]["product"] == "Skim milk"
+        assert index.search("", 10) == []
+
+    def test_ranks_by_frequency_decayed_by_recency(self) -> None:
+        index = ProductIndex()
+        for _ in range(3):
+            index.add("Mango", ItemCategory.FRUITS_VEGETABLES, None, None, NOW)
+        index.add("Melon", ItemCategory.FRUITS_VEGETABLES, None, None, NOW)
+        index.add("Mustard", ItemCategory.SPICES, None, None, NOW - 365 * 86400)
+        index.add("Mustard", ItemCategory.SPICES, None, None, NOW - 365 * 86400)
+
+        products = [suggestion["product"] for suggestion in index.search("m", 2)]
+
+        assert products == ["Mango", "Melon"]
+
+    def test_suggests_usual_category_unit_and_quantity(self) -> None:
+        index = ProductIndex()
+        index.add("milk", ItemCategory.DAIRY, ItemUnit.LITER, 2, NOW - 10)
+        index.add("milk", ItemCategory.DAIRY, ItemUnit.LITER, 2, NOW - 5)
+        index.add("Milk", ItemCategory.DRINKS, ItemUnit.PIECES, 1, NOW)
+
+        [suggestion] = index.search("milk", 10)
+
+        assert suggestion["product"] == "Milk"
+        assert suggestion["category"] == ItemCategory.DAIRY
+        assert suggestion["unit"] == ItemUnit.LITER
+        assert suggestion["quantity"] == 2
+        assert suggestion["count"] == 3
+
+    def test_removes_uses(self) -> None:
+        index = ProductIndex()
+        index.add("Milk", ItemCategory.DAIRY, ItemUnit.LITER, 2, NOW)
+        index.add("Milk", ItemCategory.DRINKS, ItemUnit.PIECES, 1, NOW)
+        index.add("Mint", ItemCategory.HERBS, None, None, NOW)
+
+        index.remove("milk", ItemCategory.DRINKS, ItemUnit.PIECES, 1)
+        index.remove("Mint", ItemCategory.HERBS, None, None)
+        index.remove("Mango", ItemCategory.FRUITS_VEGETABLES, None, None)
+
+        [suggestion] = index.search("m", 10)
+        assert suggestion["product"] == "Milk"
+        assert suggestion["category"] == ItemCategory.DAIRY
+        assert suggestion["unit"] == ItemUnit.LITER
+        assert suggestion["count"] == 1
+        assert index.terms == [("milk", "milk")]
+
+
+@pytest.mark.django_db
+class TestAutocompleteView:
+    def test_suggests_products_from_accessible_lists(
+        self,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+        shopping_list: ShoppingList,
+    ) -> None:
+        create_item(shopping_list, product="Milk", unit=ItemUnit.LITER, quantity=2)
+        create_item(shopping_list, product="Milk", unit=ItemUnit.LITER, quantity=2)
+        shared_list = create_shopping_list(user=external_user)
+        shared_list.shared_with.add(authenticated_user)
+        create_item(shared_list, product="Mint", category=ItemCategory.HERBS)
+        create_item(create_shopping_list(user=external_user), product="Mineral water")
+
+        response = authenticated_api_client.get(
+            URLS.SHOPPING_LIST_AUTOCOMPLETE_URL, {"q": "mi"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [result["product"] for result in response.data["results"]] == [
+            "Milk",
+            "Mint",
+        ]
+        assert response.data["results"][0] == {
+            "product": "Milk",
+            "category": ItemCategory.DAIRY,
+            "unit": ItemUnit.LITER,
+            "quantity": 2,
+            "count": 2,
+            "last_used": response.data["results"][0]["last_used"],
+        }
+
+    def test_created_items_update_the_cached_index(
+        self,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        create_item(shopping_list, product="Milk")
+        url = URLS.SHOPPING_LIST_AUTOCOMPLETE_URL
+        authenticated_api_client.get(url, {"q": "m"})
+
+        with freeze_time(timezone.now() + timedelta(minutes=1)):
+            with django_capture_on_commit_callbacks(execute=True):
+                authenticated_api_client.post(
+                    URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk),
+                    {"product": "Mustard", "category": ItemCategory.SPICES},
+                )
+            with CaptureQueriesContext(connections["default"]) as context:
+                response = authenticated_api_client.get(url, {"q": "m"})
+
+        assert [result["product"] for result in response.data["results"]] == [
+            "Mustard",
+            "Milk",
+        ]
+        assert not reads_items(context)
+
+    def test_renamed_items_update_the_cached_index(
+        self,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        item = create_item(shopping_list, product="Milk")
+        url = URLS.SHOPPING_LIST_AUTOCOMPLETE_URL
+        authenticated_api_client.get(url, {"q": "m"})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_api_client.patch(
+                URLS.ITEM_DETAIL_URL.format(
+                    shopping_list_pk=shopping_list.pk, item_pk=item.pk
+                ),
+                {"product": "Mustard"},
+            )
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = authenticated_api_client.get(url, {"q": "m"})
+
+        assert [result["product"] for result in response.data["results"]] == ["Mustard"]
+        assert not reads_items(context)
+
+    def test_created_items_update_the_indexes_of_collaborators(
+        self,
+        authenticated_api_client: APIClient,
+        external_user: CustomUser,
+        shopping_list: ShoppingList,
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        shopping_list.shared_with.add(external_user)
+        collaborator_client = APIClient()
+        collaborator_client.force_authenticate(user=external_user)
+        url = URLS.SHOPPING_LIST_AUTOCOMPLETE_URL
+        assert collaborator_client.get(url, {"q": "m"}).data["results"] == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_api_client.post(
+                URLS.ITEM_BATCH_URL.format(shopping_list_pk=shopping_list.pk),
+                {
+                    "operations": [
+                        {
+                            "op": "create",
+                            "data": {"product": "Milk", "category": "dairy"},
+                        }
+                    ]
+                },
+                format="json",
+            )
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = collaborator_client.get(url, {"q": "m"})
+
+        assert [result["product"] for result in response.data["results"]] == ["Milk"]
+        assert not reads_items(context)
+
+    def test_synced_items_update_the_cached_index(
+        self,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        url = URLS.SHOPPING_LIST_AUTOCOMPLETE_URL
+        assert authenticated_api_client.get(url, {"q": "m"}).data["results"] == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_api_client.post(
+                URLS.ITEM_SYNC_URL.format(shopping_list_pk=shopping_list.pk),
+                {
+                    "operations": [
+                        {
+                            "op_id": str(uuid.uuid4()),
+                            "op": "create",
+                            "client_id": "local-1",
+                            "timestamp": "2030-01-01T10:00:00Z",
+                            "data": {"product": "Milk", "category": "dairy"},
+                        }
+                    ]
+                },
+                format="json",
+            )
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = authenticated_api_client.get(url, {"q": "m"})
+
+        assert [result["product"] for result in response.data["results"]] == ["Milk"]
+        assert not reads_items(context)
+
+    def test_sharing_refreshes_the_index_of_the_new_user(
+        self,
+        authenticated_api_client: APIClient,
+        external_user: CustomUser,
+        shopping_list: ShoppingList,
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        create_item(shopping_list, product="Milk")
+        collaborator_client = APIClient()
+        collaborator_client.force_authenticate(user=external_user)
+        url = URLS.SHOPPING_LIST_AUTOCOMPLETE_URL
+        assert collaborator_client.get(url, {"q": "m"}).data["results"] == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_api_client.put(
+                URLS.SHOPPING_LIST_SHARE_URL.format(pk=shopping_list.pk),
+                {"email": external_user.email},
+            )
+        response = collaborator_client.get(url, {"q": "m"})
+
+        assert [result["product"] for result in response.data["results"]] == ["Milk"]
+
+    def test_index_built_across_a_write_is_not_cached(
+        self,
+        authenticated_user: CustomUser,
+        shopping_list: ShoppingList,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        build_index = autocomplete.build_index
+        milk = ProductUse("Milk", ItemCategory.DAIRY, None, None, NOW)
+
+        def build_index_during_write(user: CustomUser) -> ProductIndex:
+            index = build_index(user)
+            autocomplete.update_index(user.pk, [milk], [])
+            return index
+
+        monkeypatch.setattr(autocomplete, "build_index", build_index_during_write)
+
+        assert autocomplete.get_index(authenticated_user).search("m", 10) == []
+        assert cache.get(autocomplete.index_key(authenticated_user.pk)) is None
+
+    def test_locked_index_is_dropped_by_writes(
+        self, authenticated_user: CustomUser, shopping_list: ShoppingList
+    ) -> None:
+        autocomplete.get_index(authenticated_user)
+        cache.add(autocomplete.lock_key(authenticated_user.pk), "other writer")
+        milk = ProductUse("Milk", ItemCategory.DAIRY, None, None, NOW)
+
+        autocomplete.update_index(authenticated_user.pk, [milk], [])
+
+        assert cache.get(autocomplete.index_key(authenticated_user.pk)) is None
+
+    def test_validates_query(self, authenticated_api_client: APIClient) -> None:
+        response = authenticated_api_client.get(
+            URLS.SHOPPING_LIST_AUTOCOMPLETE_URL, {"limit": 0}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.data) == {"q", "limit"}
+
+    def test_requires_authentication(
+        self, not_authenticated_api_client: APIClient
+    ) -> None:
+        response = not_authenticated_api_client.get(
+            URLS.SHOPPING_LIST_AUTOCOMPLETE_URL, {"q": "m"}
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
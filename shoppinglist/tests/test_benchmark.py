@@ -0,0 +1,96 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+
+from shoppinglist.benchmark import FLOWS, run_benchmark
+from shoppinglist.constants import ItemCategory
+from shoppinglist.datasets import DatasetSpec, generate_dataset
+from shoppinglist.models import Item, ShoppingList
+from users.models import CustomUser
+
+SMALL_SPEC = DatasetSpec(users=3, lists_per_user=2, items_per_list=4, share_degree=1)
+
+
+class TestGenerateDataset:
+    @pytest.mark.django_db
+    def test_creates_requested_shape(self) -> None:
+        dataset = generate_dataset(SMALL_SPEC)
+
+        assert CustomUser.objects.count() == 3
+        assert ShoppingList.objects.count() == len(dataset.shopping_list_ids) == 6
+        assert Item.objects.count() == dataset.items == 24
+        assert ShoppingList.shared_with.through.objects.count() == dataset.shares == 6
+        assert not ShoppingList.objects.filter(shared_with=F("user")).exists()
+
+    @pytest.mark.django_db
+    def test_is_deterministic(self) -> None:
+        generate_dataset(SMALL_SPEC)
+        first = list(Item.objects.values_list("product", "category", "completed"))
+        Item.objects.all().delete()
+        generate_dataset(SMALL_SPEC)
+        second = list(Item.objects.values_list("product", "category", "completed"))
+
+        assert first == second
+
+    @pytest.mark.django_db
+    def test_skews_categories(self) -> None:
+        generate_dataset(
+            DatasetSpec(users=2, lists_per_user=5, items_per_list=40, category_skew=2)
+        )
+
+        counts = dict(Item.objects.values_list("category").annotate(count=Count("id")))
+        assert counts[ItemCategory.values[0]] > Item.objects.count() / 2
+
+    @pytest.mark.django_db
+    def test_marks_lists_with_only_completed_items_as_completed(self) -> None:
+        generate_dataset(
+            DatasetSpec(users=2, lists_per_user=3, items_per_list=2, completed_ratio=1)
+        )
+
+        assert not ShoppingList.objects.filter(completed=False).exists()
+
+
+class TestSeedDataCommand:
+    @pytest.mark.django_db
+    def test_creates_dataset_in_batches(self) -> None:
+        stdout = StringIO()
+
+        call_command(
+            "seed_data",
+            users=4,
+            lists_per_user=3,
+            items_per_list=5,
+            items_distribution="exponential",
+            share_distribution="uniform",
+            batch_size=2,
+            stdout=stdout,
+        )
+
+        assert ShoppingList.objects.count() == 12
+        assert f"{Item.objects.count()} items" in stdout.getvalue()
+
+    @pytest.mark.django_db
+    def test_rejects_invalid_ratio(self) -> None:
+        with pytest.raises(CommandError):
+            call_command("seed_data", completed_ratio=2)
+
+
+class TestRunBenchmark:
+    @pytest.mark.django_db(transaction=True)
+    def test_reports_every_flow(self) -> None:
+        dataset = generate_dataset(SMALL_SPEC)
+
+        # The in-memory test database locks whole tables between connections,
+        # so concurrent writers would trip over each other here.
+        report = run_benchmark(dataset, requests=4, concurrency=1)
+
+        assert report["dataset"]["items"] == 24
+        assert "password" not in report["dataset"]
+        assert list(report["flows"]) == list(FLOWS)
+        for flow in report["flows"].values():
+            assert flow["requests"] == 4
+            assert flow["errors"] == 0
+            assert flow["queries_per_request"] > 0
+            assert set(flow["latency_ms"]) == {"p50", "p95", "p99", "mean"}
@@ -0,0 +1,228 @@
+import asyncio
+import json
+from typing import AsyncIterator, Dict
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from conftest import create_shopping_list
+from shoppinglist.constants import ItemCategory
+from shoppinglist.events import InProcessBroker, get_broker, shopping_list_channel
+from shoppinglist.models import ShoppingList
+from users.models import CustomUser
+
+from .urls import URLS
+
+
+def parse_event(chunk: str) -> Dict:
+    data = next(line for line in chunk.splitlines() if line.startswith("data: "))
+    return json.loads(data.removeprefix("data: "))
+
+
+async def next_event(chunks: AsyncIterator) -> Dict:
+    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=5)
+    return parse_event(chunk if isinstance(chunk, str) else chunk.decode())
+
+
+class TestInProcessBroker:
+    def test_publish_reaches_subscribers_of_the_channel_only(self) -> None:
+        broker = InProcessBroker()
+
+        async def scenario():
+            async with broker.subscribe("a") as first, broker.subscribe("b") as other:
+                broker.publish("a", {"type": "item.created"})
+                assert await first.get(timeout=1) == {"type": "item.created"}
+                with pytest.raises(asyncio.TimeoutError):
+                    await other.get(timeout=0.01)
+            assert not broker._subscriptions
+
+        async_to_sync(scenario)()
+
+    def test_slow_subscriber_is_cut_off(self, settings) -> None:
+        settings.SHOPPING_LIST_EVENTS = {
+            **settings.SHOPPING_LIST_EVENTS,
+            "QUEUE_SIZE": 2,
+        }
+        broker = InProcessBroker()
+
+        async def scenario():
+            async with broker.subscribe("a") as subscription:
+                for version in range(3):
+                    broker.publish("a", {"version": version})
+                await asyncio.sleep(0)
+                assert await subscription.get(timeout=1) is None
+
+        async_to_sync(scenario)()
+
+
+# The ASGI handler runs each request's database work in a thread of its own,
+# so the data has to be committed for the stream to see it.
+@pytest.mark.django_db(transaction=True)
+class TestShoppingListEvents:
+    def get_headers(self, user: CustomUser) -> Dict[str, str]:
+        token, _ = Token.objects.get_or_create(user=user)
+        return {"Authorization": f"Token {token.key}"}
+
+    def test_stream_delivers_item_changes(
+        self,
+        authenticated_user: CustomUser,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        headers = self.get_headers(authenticated_user)
+
+        def add_item():
+            return authenticated_api_client.post(
+                URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk),
+                data={"product": "Milk", "category": ItemCategory.DAIRY},
+            )
+
+        async def scenario():
+            response = await AsyncClient().get(
+                URLS.SHOPPING_LIST_EVENTS_URL.format(pk=shopping_list.pk),
+                headers=headers,
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response["Content-Type"] == "text/event-stream"
+            chunks = aiter(response.streaming_content)
+
+            ready = await next_event(chunks)
+            assert ready == {"type": "ready", "list": shopping_list.pk, "version": 1}
+
+            created = await sync_to_async(add_item)()
+            event = await next_event(chunks)
+            assert event["type"] == "item.created"
+            assert event["version"] == 2
+            assert event["item"]["id"] == created.data["id"]
+            await chunks.aclose()
+
+        async_to_sync(scenario)()
+
+    def test_stream_ends_for_unshared_user(
+        self,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+    ) -> None:
+        shopping_list = create_shopping_list(user=external_user)
+        shopping_list.shared_with.add(authenticated_user)
+        headers = self.get_headers(authenticated_user)
+
+        async def scenario():
+            response = await AsyncClient().get(
+                URLS.SHOPPING_LIST_EVENTS_URL.format(pk=shopping_list.pk),
+                headers=headers,
+            )
+            chunks = aiter(response.streaming_content)
+            await next_event(chunks)
+
+            get_broker().publish(
+                shopping_list_channel(shopping_list.pk),
+                {
+                    "type": "list.unshared",
+                    "list": shopping_list.pk,
+                    "version": 2,
+                    "user": authenticated_user.pk,
+                },
+            )
+            assert (await next_event(chunks))["type"] == "list.unshared"
+            with pytest.raises(StopAsyncIteration):
+                await chunks.__anext__()
+
+        async_to_sync(scenario)()
+
+    def test_stream_ends_for_user_removed_by_update(
+        self,
+        authenticated_user: CustomUser,
+        authenticated_api_client: APIClient,
+        external_user: CustomUser,
+        shopping_list: ShoppingList,
+    ) -> None:
+        shopping_list.shared_with.add(external_user)
+        headers = self.get_headers(external_user)
+
+        def remove_shares():
+            return authenticated_api_client.patch(
+                URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk),
+                data={"shared_with": []},
+                format="json",
+            )
+
+        async def scenario():
+            response = await AsyncClient().get(
+                URLS.SHOPPING_LIST_EVENTS_URL.format(pk=shopping_list.pk),
+                headers=headers,
+            )
+            chunks = aiter(response.streaming_content)
+            await next_event(chunks)
+
+            response = await sync_to_async(remove_shares)()
+            assert response.status_code == status.HTTP_200_OK, response.content
+            assert (await next_event(chunks))["type"] == "list.updated"
+            assert await next_event(chunks) == {
+                "type": "list.unshared",
+                "list": shopping_list.pk,
+                "version": 2,
+                "user": external_user.pk,
+            }
+            with pytest.raises(StopAsyncIteration):
+                await chunks.__anext__()
+
+        async_to_sync(scenario)()
+
+    def test_stream_ends_when_list_is_deleted(
+        self,
+        authenticated_user: CustomUser,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        headers = self.get_headers(authenticated_user)
+
+        def delete_list():
+            return authenticated_api_client.delete(
+                URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk)
+            )
+
+        async def scenario():
+            response = await AsyncClient().get(
+                URLS.SHOPPING_LIST_EVENTS_URL.format(pk=shopping_list.pk),
+                headers=headers,
+            )
+            chunks = aiter(response.streaming_content)
+            await next_event(chunks)
+
+            response = await sync_to_async(delete_list)()
+            assert response.status_code == status.HTTP_204_NO_CONTENT
+            assert (await next_event(chunks))["type"] == "list.deleted"
+            with pytest.raises(StopAsyncIteration):
+                await chunks.__anext__()
+
+        async_to_sync(scenario)()
+
+    def test_stream_of_someone_elses_shopping_list_is_not_accessible(
+        self, authenticated_user: CustomUser, external_user: CustomUser
+    ) -> None:
+        shopping_list = create_shopping_list(user=external_user)
+        headers = self.get_headers(authenticated_user)
+
+        async def connect():
+            return await AsyncClient().get(
+                URLS.SHOPPING_LIST_EVENTS_URL.format(pk=shopping_list.pk),
+                headers=headers,
+            )
+
+        response = async_to_sync(connect)()
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_stream_requires_asgi(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        response = authenticated_api_client.get(
+            URLS.SHOPPING_LIST_EVENTS_URL.format(pk=shopping_list.pk)
+        )
+
+        assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
@@ -1,17 +1,33 @@
 import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
 from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
 
+from conftest import create_item, create_shopping_list
 from shoppinglist.mixins import ShoppingItemMixin
 from shoppinglist.models import ShoppingList
+from users.models import CustomUser
+
+
+def create_mixin_instance(user: CustomUser, **kwargs: int) -> ShoppingItemMixin:
+    django_request = APIRequestFactory().get("/")
+    force_authenticate(django_request, user=user)
+    mixin_instance = ShoppingItemMixin()
+    mixin_instance.request = Request(django_request)
+    mixin_instance.kwargs = kwargs
+    return mixin_instance
 
 
 class TestShoppingItemMixin:
     @pytest.mark.django_db
     def test_get_shopping_list_retrieves_correct_shopping_list(
-        self, shopping_list: ShoppingList
+        self, shopping_list: ShoppingList, authenticated_user: CustomUser
     ) -> None:
-        mixin_instance = ShoppingItemMixin()
-        mixin_instance.kwargs = {"shoppinglist_pk": shopping_list.pk}
+        mixin_instance = create_mixin_instance(
+            authenticated_user, shoppinglist_pk=shopping_list.pk
+        )
         retrieved_shopping_list = mixin_instance.get_shopping_list()
 
         assert retrieved_shopping_list == shopping_list
@@ -27,11 +43,59 @@ class TestShoppingItemMixin:
 
     @pytest.mark.django_db
     def test_get_shopping_list_raises_not_found_when_shopping_list_does_not_exist(
-        self,
+        self, authenticated_user: CustomUser
     ) -> None:
-        mixin_instance = ShoppingItemMixin()
         non_existent_shopping_list_pk = 1
-        mixin_instance.kwargs = {"shoppinglist_pk": non_existent_shopping_list_pk}
+        mixin_instance = create_mixin_instance(
+            authenticated_user, shoppinglist_pk=non_existent_shopping_list_pk
+        )
+
+        with pytest.raises(exceptions.NotFound):
+            mixin_instance.get_shopping_list()
+
+    @pytest.mark.django_db
+    def test_get_shopping_list_raises_not_found_without_access(
+        self, authenticated_user: CustomUser, external_user: CustomUser
+    ) -> None:
+        shopping_list = create_shopping_list(user=external_user)
+        mixin_instance = create_mixin_instance(
+            authenticated_user, shoppinglist_pk=shopping_list.pk
+        )
 
         with pytest.raises(exceptions.NotFound):
             mixin_instance.get_shopping_list()
+
+    @pytest.mark.django_db
+    def test_get_shopping_list_is_memoized(
+        self, authenticated_user: CustomUser, external_user: CustomUser
+    ) -> None:
+        shopping_list = create_shopping_list(user=external_user)
+        shopping_list.shared_with.add(authenticated_user)
+        mixin_instance = create_mixin_instance(
+            authenticated_user, shoppinglist_pk=shopping_list.pk
+        )
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            mixin_instance.get_shopping_list()
+            mixin_instance.get_shopping_list()
+
+        assert len(context) == 1
+
+    @pytest.mark.django_db
+    def test_get_accessible_items_checks_access(
+        self,
+        shopping_list: ShoppingList,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+    ) -> None:
+        item = create_item(shopping_list=shopping_list)
+
+        owner_mixin = create_mixin_instance(
+            authenticated_user, shoppinglist_pk=shopping_list.pk
+        )
+        external_mixin = create_mixin_instance(
+            external_user, shoppinglist_pk=shopping_list.pk
+        )
+
+        assert list(owner_mixin.get_accessible_items()) == [item]
+        assert not external_mixin.get_accessible_items().exists()
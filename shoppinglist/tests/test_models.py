@@ -1,5 +1,8 @@
+import io
+
 import pytest
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from freezegun import freeze_time
 
 from conftest import create_item, create_multiple_items, create_shopping_list
@@ -218,3 +221,115 @@ class TestItem:
             quantity=12,
         )
         assert str(item) == "Milk"
+
+
+def counters(shopping_list: ShoppingList) -> tuple:
+    shopping_list.refresh_from_db(fields=ShoppingList.COUNTER_FIELDS)
+    return shopping_list.items_count, shopping_list.completed_count
+
+
+@pytest.mark.django_db
+class TestItemCounters:
+    def test_save_and_delete(self, shopping_list):
+        item = create_item(shopping_list=shopping_list)
+        create_item(shopping_list=shopping_list, product="Bread", completed=True)
+        assert counters(shopping_list) == (2, 1)
+
+        item.completed = True
+        item.save()
+        item.save()
+        assert counters(shopping_list) == (2, 2)
+
+        item.delete()
+        assert counters(shopping_list) == (1, 1)
+
+    def test_stale_instances_do_not_overwrite_counters(self, shopping_list):
+        stale_item = Item.objects.get(pk=create_item(shopping_list=shopping_list).pk)
+        Item.objects.filter(pk=stale_item.pk).update(completed=True)
+
+        stale_item.completed = True
+        stale_item.save()
+        shopping_list.name = "Renamed"
+        shopping_list.save()
+
+        assert counters(shopping_list) == (1, 1)
+
+    def test_stale_instances_do_not_overwrite_versions(self, shopping_list):
+        stale_list = ShoppingList.objects.get(pk=shopping_list.pk)
+        ShoppingList.objects.filter(pk=shopping_list.pk).update(version=3, sync_floor=2)
+
+        stale_list.name = "Renamed"
+        stale_list.save()
+
+        shopping_list.refresh_from_db()
+        assert shopping_list.name == "Renamed"
+        assert (shopping_list.version, shopping_list.sync_floor) == (3, 2)
+
+    def test_save_without_counted_fields(self, shopping_list):
+        item = create_item(shopping_list=shopping_list)
+
+        item.completed = True
+        item.save(update_fields=["product"])
+
+        assert counters(shopping_list) == (1, 0)
+
+    def test_moving_an_item(self, shopping_list, authenticated_user):
+        other_list = create_shopping_list(user=authenticated_user)
+        item = create_item(shopping_list=shopping_list, completed=True)
+
+        item.shopping_list = other_list
+        item.save()
+        Item.objects.filter(pk=item.pk).update(shopping_list=shopping_list)
+
+        assert counters(shopping_list) == (1, 1)
+        assert counters(other_list) == (0, 0)
+
+    def test_bulk_writes(self, shopping_list, authenticated_user):
+        other_list = create_shopping_list(user=authenticated_user)
+        items = Item.objects.bulk_create(
+            [
+                Item(shopping_list=shopping_list, product="Milk", category="dairy"),
+                Item(shopping_list=shopping_list, product="Eggs", category="dairy"),
+                Item(shopping_list=other_list, product="Beef", category="meat"),
+            ]
+        )
+        assert (counters(shopping_list), counters(other_list)) == ((2, 0), (1, 0))
+
+        Item.objects.filter(product__in=["Milk", "Beef"]).update(completed=True)
+        assert (counters(shopping_list), counters(other_list)) == ((2, 1), (1, 1))
+
+        for item in items:
+            item.completed = item.product == "Eggs"
+        Item.objects.bulk_update(items, ["completed"])
+        assert (counters(shopping_list), counters(other_list)) == ((2, 1), (1, 0))
+
+        Item.objects.filter(completed=True).delete()
+        assert (counters(shopping_list), counters(other_list)) == ((1, 0), (1, 0))
+
+    def test_refresh_completed_reads_counters(self, shopping_list):
+        create_item(shopping_list=shopping_list, completed=True)
+        shopping_lists = ShoppingList.objects.filter(pk=shopping_list.pk)
+
+        shopping_lists.refresh_completed()
+        shopping_list.refresh_from_db()
+        assert shopping_list.completed
+
+        create_item(shopping_list=shopping_list, product="Bread")
+        shopping_lists.refresh_completed()
+        shopping_list.refresh_from_db()
+        assert not shopping_list.completed
+
+    def test_repair_command_fixes_drift(self, shopping_list, authenticated_user):
+        create_item(shopping_list=shopping_list, completed=True)
+        intact_list = create_shopping_list(user=authenticated_user)
+        create_item(shopping_list=intact_list)
+        ShoppingList.objects.filter(pk=shopping_list.pk).update(
+            items_count=7, completed_count=0
+        )
+        stdout = io.StringIO()
+
+        call_command("repair_item_counts", batch_size=1, stdout=stdout)
+
+        assert counters(shopping_list) == (1, 1)
+        assert counters(intact_list) == (1, 0)
+        assert stdout.getvalue().strip() == "Checked 2 shopping lists, repaired 1."
@@ -0,0 +1,401 @@
+import uuid
+from typing import Callable
+
+import pytest
+from rest_framework.test import APIClient
+
+from conftest import create_item, create_shopping_list
+from kitchencompanion.testing import QueryHarness
+from shoppinglist.constants import ItemCategory
+from shoppinglist.models import Item, ShoppingList
+from users.models import CustomUser
+
+from .urls import URLS
+
+# The item counters join through the foreign key index or the covering
+# item_list_category_idx, embedded items are read in display order through
+# item_list_completed_idx.
+ITEM_LOOKUP_INDEXES = (
+    "item_list_completed_idx",
+    "item_list_category_idx",
+    "shoppinglist_item_shopping_list_id",
+)
+
+
+def grow_lists(
+    owner: CustomUser, shared_with: CustomUser
+) -> Callable[[int], ShoppingList]:
+    """
+    Grow the owner's lists to ``size``, each one shared and with items, and
+    return a fresh list for the request to work on.
+    """
+
+    def grow(size: int) -> ShoppingList:
+        while ShoppingList.objects.filter(user=owner).count() < size:
+            shopping_list = create_shopping_list(user=owner)
+            shopping_list.shared_with.add(shared_with)
+            create_item(shopping_list=shopping_list)
+            create_item(
+                shopping_list=shopping_list, product="Beef", category=ItemCategory.MEAT
+            )
+        return create_shopping_list(user=owner, name="Target")
+
+    return grow
+
+
+def grow_items(shopping_list: ShoppingList) -> Callable[[int], Item]:
+    """
+    Grow the list to ``size`` items and return a fresh item for the request
+    to work on.
+    """
+
+    def grow(size: int) -> Item:
+        for number in range(shopping_list.items.count(), size):
+            create_item(shopping_list=shopping_list, product=f"Product {number}")
+        return create_item(shopping_list=shopping_list, product="Target")
+
+    return grow
+
+
+@pytest.mark.django_db
+class TestShoppingListViewSetQueries:
+    @pytest.mark.parametrize("params", [{}, {"expand": "items"}])
+    def test_list(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+        params: dict,
+    ) -> None:
+        queries = query_harness.assert_flat(
+            grow_lists(authenticated_user, external_user),
+            lambda _: authenticated_api_client.get(
+                f"{URLS.SHOPPING_LIST_URL}/", params
+            ),
+        )
+        query_harness.assert_uses_index(
+            queries, "shoppinglist_item", *ITEM_LOOKUP_INDEXES
+        )
+
+    def test_list_item_counters_do_not_read_items(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+    ) -> None:
+        queries = query_harness.assert_flat(
+            grow_lists(authenticated_user, external_user),
+            lambda _: authenticated_api_client.get(
+                f"{URLS.SHOPPING_LIST_URL}/",
+                {"fields": "name,items_count,completed_items_count"},
+            ),
+        )
+        assert not any("shoppinglist_item" in query["sql"] for query in queries)
+
+    def test_retrieve(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+    ) -> None:
+        queries = query_harness.assert_flat(
+            grow_lists(authenticated_user, external_user),
+            lambda shopping_list: authenticated_api_client.get(
+                URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk)
+            ),
+        )
+        query_harness.assert_uses_index(
+            queries, "shoppinglist_item", *ITEM_LOOKUP_INDEXES
+        )
+
+    def test_create(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+    ) -> None:
+        query_harness.assert_flat(
+            grow_lists(authenticated_user, external_user),
+            lambda _: authenticated_api_client.post(
+                f"{URLS.SHOPPING_LIST_URL}/", {"name": "New list"}
+            ),
+        )
+
+    def test_partial_update(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+    ) -> None:
+        query_harness.assert_flat(
+            grow_lists(authenticated_user, external_user),
+            lambda shopping_list: authenticated_api_client.patch(
+                URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk),
+                {"name": "Renamed"},
+            ),
+        )
+
+    def test_destroy(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+    ) -> None:
+        query_harness.assert_flat(
+            grow_lists(authenticated_user, external_user),
+            lambda shopping_list: authenticated_api_client.delete(
+                URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk)
+            ),
+        )
+
+    def test_share_and_unshare(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+        third_user: CustomUser,
+    ) -> None:
+        grow = grow_lists(authenticated_user, external_user)
+        query_harness.assert_flat(
+            grow,
+            lambda shopping_list: authenticated_api_client.put(
+                URLS.SHOPPING_LIST_SHARE_URL.format(pk=shopping_list.pk),
+                {"email": third_user.email},
+            ),
+        )
+
+        def grow_shared(size: int) -> ShoppingList:
+            shopping_list = grow(size)
+            shopping_list.shared_with.add(third_user)
+            return shopping_list
+
+        query_harness.assert_flat(
+            grow_shared,
+            lambda shopping_list: authenticated_api_client.patch(
+                URLS.SHOPPING_LIST_UNSHARE_URL.format(
+                    pk=shopping_list.pk, user_pk=third_user.pk
+                )
+            ),
+        )
+
+    def test_changes(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        queries = query_harness.assert_flat(
+            grow_items(shopping_list),
+            lambda _: authenticated_api_client.get(
+                URLS.SHOPPING_LIST_CHANGES_URL.format(pk=shopping_list.pk),
+                {"since": 1},
+            ),
+        )
+        query_harness.assert_uses_index(
+            queries, "shoppinglist_item", "item_list_changed_idx"
+        )
+        query_harness.assert_uses_index(
+            queries, "shoppinglist_itemtombstone", "tombstone_list_version_idx"
+        )
+
+
+@pytest.mark.django_db
+class TestItemViewSetQueries:
+    def test_list(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+
+        for params in ({}, {"page_size": 2}):
+            queries = query_harness.assert_flat(
+                grow_items(shopping_list),
+                lambda _: authenticated_api_client.get(url, params),
+            )
+            query_harness.assert_uses_index(
+                queries, "shoppinglist_item", "item_list_completed_idx"
+            )
+
+    @pytest.mark.parametrize(
+        "params, index",
+        [
+            ({"category": ItemCategory.DAIRY}, "item_list_category_idx"),
+            ({"sort": "category", "page_size": 2}, "item_list_category_idx"),
+            ({"sort": "-created", "page_size": 2}, "item_list_created_idx"),
+            ({"sort": "product", "page_size": 2}, "item_list_product_idx"),
+        ],
+    )
+    def test_list_filtered_and_sorted(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        params: dict,
+        index: str,
+    ) -> None:
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+
+        queries = query_harness.assert_flat(
+            grow_items(shopping_list),
+            lambda _: authenticated_api_client.get(url, params),
+        )
+        query_harness.assert_uses_index(queries, "shoppinglist_item", index)
+
+    def test_list_facets(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+
+        queries = query_harness.assert_flat(
+            grow_items(shopping_list),
+            lambda _: authenticated_api_client.get(url, {"facets": "true"}),
+        )
+        facet_queries = [query for query in queries if "GROUP BY" in query["sql"]]
+        assert len(facet_queries) == 1
+        query_harness.assert_uses_index(
+            facet_queries, "shoppinglist_item", "item_list_category_idx"
+        )
+
+    def test_retrieve(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        query_harness.assert_flat(
+            grow_items(shopping_list),
+            lambda item: authenticated_api_client.get(
+                URLS.ITEM_DETAIL_URL.format(
+                    shopping_list_pk=shopping_list.pk, item_pk=item.pk
+                )
+            ),
+        )
+
+    def test_create(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        query_harness.assert_flat(
+            grow_items(shopping_list),
+            lambda _: authenticated_api_client.post(
+                URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk),
+                {"product": "Milk", "category": ItemCategory.DAIRY},
+            ),
+        )
+
+    def test_partial_update(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        query_harness.assert_flat(
+            grow_items(shopping_list),
+            lambda item: authenticated_api_client.patch(
+                URLS.ITEM_DETAIL_URL.format(
+                    shopping_list_pk=shopping_list.pk, item_pk=item.pk
+                ),
+                {"quantity": 2},
+            ),
+        )
+
+    def test_destroy(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        query_harness.assert_flat(
+            grow_items(shopping_list),
+            lambda item: authenticated_api_client.delete(
+                URLS.ITEM_DETAIL_URL.format(
+                    shopping_list_pk=shopping_list.pk, item_pk=item.pk
+                )
+            ),
+        )
+
+    def test_batch(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        query_harness.assert_flat(
+            grow_items(shopping_list),
+            lambda item: authenticated_api_client.post(
+                URLS.ITEM_BATCH_URL.format(shopping_list_pk=shopping_list.pk),
+                {
+                    "operations": [
+                        {
+                            "op": "create",
+                            "data": {"product": "Eggs", "category": "other"},
+                        },
+                        {"op": "update", "id": item.pk, "data": {"quantity": 2}},
+                    ]
+                },
+                format="json",
+            ),
+        )
+
+    @pytest.mark.parametrize("url", [URLS.ITEM_COMPLETE_URL, URLS.ITEM_UNCOMPLETE_URL])
+    def test_complete_and_uncomplete(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        url: str,
+    ) -> None:
+        query_harness.assert_flat(
+            grow_items(shopping_list),
+            lambda _: authenticated_api_client.post(
+                url.format(shopping_list_pk=shopping_list.pk), {}, format="json"
+            ),
+        )
+
+    def test_sync(
+        self,
+        query_harness: QueryHarness,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        def sync(item: Item):
+            return authenticated_api_client.post(
+                URLS.ITEM_SYNC_URL.format(shopping_list_pk=shopping_list.pk),
+                {
+                    "since": shopping_list.version,
+                    "operations": [
+                        {
+                            "op_id": str(uuid.uuid4()),
+                            "op": "toggle",
+                            "id": item.pk,
+                            "timestamp": "2030-01-01T10:00:00Z",
+                            "completed": True,
+                        }
+                    ],
+                },
+                format="json",
+            )
+
+        def grow(size: int) -> Item:
+            item = grow_items(shopping_list)(size)
+            shopping_list.refresh_from_db(fields=["version"])
+            return item
+
+        queries = query_harness.assert_flat(grow, sync)
+        query_harness.assert_uses_index(
+            queries, "shoppinglist_item", "item_list_changed_idx"
+        )
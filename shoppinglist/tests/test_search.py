@@ -0,0 +1,118 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from conftest import create_item, create_shopping_list
+from shoppinglist.constants import ItemCategory
+from shoppinglist.models import Item, ShoppingList
+from shoppinglist.search import match_expression
+from users.models import CustomUser
+
+from .urls import URLS
+
+
+def search(client: APIClient, q: str, **params) -> list:
+    response = client.get(URLS.SHOPPING_LIST_SEARCH_URL, {"q": q, **params})
+    assert response.status_code == status.HTTP_200_OK, response.content
+    return response.data["results"]
+
+
+class TestMatchExpression:
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            ("olive", '"olive"*'),
+            ("olive oi", '"olive" "oi"*'),
+            ('oil" OR NEAR(', '"oil" "OR" "NEAR"*'),
+            ("  ", None),
+        ],
+    )
+    def test_quotes_terms(self, text: str, expected: str) -> None:
+        assert match_expression(text) == expected
+
+
+@pytest.mark.django_db
+class TestSearchView:
+    def test_finds_items_across_accessible_lists(
+        self,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+        shopping_list: ShoppingList,
+    ) -> None:
+        own = create_item(shopping_list, product="Olive oil")
+        shared_list = create_shopping_list(name="Shared", user=external_user)
+        shared_list.shared_with.add(authenticated_user)
+        shared = create_item(shared_list, product="Bread", note="with olives")
+        create_item(create_shopping_list(user=external_user), product="Olive oil")
+        create_item(shopping_list, product="Milk")
+
+        results = search(authenticated_api_client, "oliv")
+
+        assert {result["id"] for result in results} == {own.pk, shared.pk}
+        by_id = {result["id"]: result for result in results}
+        assert by_id[shared.pk]["shopping_list"] == shared_list.pk
+        assert by_id[shared.pk]["shopping_list_name"] == "Shared"
+
+    def test_ranks_better_matches_first(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        weak = create_item(shopping_list, product="Pasta", note="olive oil or butter")
+        strong = create_item(shopping_list, product="Olive oil")
+
+        results = search(authenticated_api_client, "olive oil")
+
+        assert [result["id"] for result in results] == [strong.pk, weak.pk]
+        assert results[0]["rank"] <= results[1]["rank"]
+
+    def test_index_follows_updates_and_deletes(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        item = create_item(shopping_list, product="Olive oil")
+        other = create_item(shopping_list, product="Olives")
+        Item.objects.filter(pk=item.pk).update(product="Sunflower oil")
+        other.delete()
+        Item.objects.bulk_create(
+            [Item(shopping_list=shopping_list, product="Olive bread")]
+        )
+
+        olive_results = search(authenticated_api_client, "olive")
+        sunflower_results = search(authenticated_api_client, "sunflower")
+
+        assert [result["product"] for result in olive_results] == ["Olive bread"]
+        assert [result["id"] for result in sunflower_results] == [item.pk]
+
+    def test_runs_one_query(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        for number in range(5):
+            create_item(
+                shopping_list, product=f"Olive {number}", category=ItemCategory.FATS
+            )
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            results = search(authenticated_api_client, "olive", limit=3)
+
+        assert len(results) == 3
+        search_queries = [
+            query for query in context.captured_queries if "MATCH" in query["sql"]
+        ]
+        assert len(search_queries) == 1
+        assert len(context) == len(search_queries) + 1  # token lookup
+
+    def test_validates_query(self, authenticated_api_client: APIClient) -> None:
+        response = authenticated_api_client.get(URLS.SHOPPING_LIST_SEARCH_URL)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "q" in response.data
+
+    def test_requires_authentication(
+        self, not_authenticated_api_client: APIClient
+    ) -> None:
+        response = not_authenticated_api_client.get(
+            URLS.SHOPPING_LIST_SEARCH_URL, {"q": "olive"}
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -21,11 +21,15 @@ class TestShoppingListSerializer:
             "name": "Test Shopping List",
             "description": "This is test shopping list",
             "completed": False,
-            "items_count": 0,
         }
         serializer = ShoppingListSerializer(data=data)
         assert serializer.is_valid()
-        assert serializer.data == data
+        assert serializer.data == {
+            **data,
+            "category_counts": {},
+            "shared_with_count": 0,
+            "access": None,
+        }
 
     @pytest.mark.parametrize(
         "invalid_data, expected_errors",
@@ -63,15 +67,56 @@ class TestShoppingListSerializer:
             category=ItemCategory.MEAT,
             completed=True,
         )
+        shopping_list.refresh_from_db()
 
         serializer = ShoppingListSerializer(shopping_list)
 
         assert len(serializer.data["items"]) == 2
         assert serializer.data["items_count"] == 2
+        assert serializer.data["completed_items_count"] == 1
 
         assert serializer.data["items"][0]["product"] == "Milk"
         assert serializer.data["items"][1]["product"] == "Beef"
 
+    @pytest.mark.django_db
+    def test_counters_read_from_item_stats_annotations(
+        self, shopping_list: ShoppingList, external_user: CustomUser
+    ) -> None:
+        create_item(shopping_list=shopping_list, completed=True)
+        create_item(shopping_list=shopping_list, product="Cheese")
+        create_item(
+            shopping_list=shopping_list, product="Beef", category=ItemCategory.MEAT
+        )
+        shopping_list.shared_with.add(external_user)
+
+        annotated = ShoppingList.objects.with_item_stats().get(pk=shopping_list.pk)
+        serializer = ShoppingListSerializer(annotated)
+
+        assert serializer.data["items_count"] == 3
+        assert serializer.data["completed_items_count"] == 1
+        assert serializer.data["shared_with_count"] == 1
+        assert serializer.data["category_counts"] == {
+            ItemCategory.DAIRY.value: 2,
+            ItemCategory.MEAT.value: 1,
+        }
+
+    @pytest.mark.django_db
+    def test_counters_fall_back_for_unannotated_instance(
+        self, shopping_list: ShoppingList
+    ) -> None:
+        create_item(shopping_list=shopping_list, completed=True)
+        create_item(
+            shopping_list=shopping_list, product="Beef", category=ItemCategory.MEAT
+        )
+
+        serializer = ShoppingListSerializer(shopping_list)
+
+        assert serializer.data["shared_with_count"] == 0
+        assert serializer.data["category_counts"] == {
+            ItemCategory.DAIRY.value: 1,
+            ItemCategory.MEAT.value: 1,
+        }
+
 
 class TestItemSerializer:
     def test_item_serializer_valid_data(self) -> None:
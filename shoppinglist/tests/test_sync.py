@@ -0,0 +1,66 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from freezegun import freeze_time
+
+from shoppinglist.models import ItemTombstone, ShoppingList, SyncOperation
+from shoppinglist.sync import purge_sync_operations, purge_tombstones
+
+
+@pytest.mark.django_db
+class TestPurgeTombstones:
+    def test_purges_expired_tombstones_and_raises_sync_floor(
+        self, shopping_list: ShoppingList
+    ) -> None:
+        with freeze_time("2023-01-01"):
+            ItemTombstone.objects.create(
+                shopping_list=shopping_list, item_id=1, version=3
+            )
+            ItemTombstone.objects.create(
+                shopping_list=shopping_list, item_id=2, version=4
+            )
+        with freeze_time("2023-02-15"):
+            recent = ItemTombstone.objects.create(
+                shopping_list=shopping_list, item_id=3, version=7
+            )
+
+        with freeze_time("2023-02-20"):
+            deleted = purge_tombstones(timedelta(days=30))
+
+        assert deleted == 2
+        assert list(ItemTombstone.objects.all()) == [recent]
+        shopping_list.refresh_from_db()
+        assert shopping_list.sync_floor == 4
+
+    def test_sync_floor_never_decreases(self, shopping_list: ShoppingList) -> None:
+        ShoppingList.objects.filter(pk=shopping_list.pk).update(sync_floor=10)
+        with freeze_time("2023-01-01"):
+            ItemTombstone.objects.create(
+                shopping_list=shopping_list, item_id=1, version=3
+            )
+
+        with freeze_time("2023-03-01"):
+            purge_tombstones(timedelta(days=30))
+
+        shopping_list.refresh_from_db()
+        assert shopping_list.sync_floor == 10
+
+
+@pytest.mark.django_db
+class TestPurgeSyncOperations:
+    def test_purges_expired_operations(self, shopping_list: ShoppingList) -> None:
+        with freeze_time("2023-01-01"):
+            SyncOperation.objects.create(
+                shopping_list=shopping_list, op_id=uuid.uuid4()
+            )
+        with freeze_time("2023-02-15"):
+            recent = SyncOperation.objects.create(
+                shopping_list=shopping_list, op_id=uuid.uuid4()
+            )
+
+        with freeze_time("2023-02-20"):
+            deleted = purge_sync_operations(timedelta(days=30))
+
+        assert deleted == 1
+        assert list(SyncOperation.objects.all()) == [recent]
@@ -0,0 +1,296 @@
+import io
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import AsyncClient
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from conftest import create_item, create_shopping_list
+from shoppinglist.constants import ItemCategory, ItemUnit
+from shoppinglist.models import Item, ShoppingList
+from shoppinglist import transfer
+from shoppinglist.transfer import (
+    import_lists,
+    import_upload,
+    read_records,
+    stream_async,
+)
+from users.models import CustomUser
+
+from .urls import URLS
+
+
+def export(client: APIClient, file_format: str) -> bytes:
+    response = client.get(URLS.SHOPPING_LIST_EXPORT_URL, {"type": file_format})
+    assert response.status_code == status.HTTP_200_OK, response.content
+    assert response.streaming
+    return b"".join(response.streaming_content)
+
+
+def upload(client: APIClient, content: bytes, file_format: str):
+    return client.post(
+        URLS.SHOPPING_LIST_IMPORT_URL,
+        {
+            "file": SimpleUploadedFile(f"lists.{file_format}", content),
+            "type": file_format,
+        },
+        format="multipart",
+    )
+
+
+def snapshot(user: CustomUser) -> list:
+    return [
+        (
+            shopping_list.name,
+            shopping_list.description,
+            shopping_list.completed,
+            list(
+                shopping_list.items.order_by("id").values_list(
+                    "product", "quantity", "unit", "category", "note", "completed"
+                )
+            ),
+        )
+        for shopping_list in ShoppingList.objects.filter(user=user).order_by("id")
+    ]
+
+
+@pytest.fixture
+def account(authenticated_user: CustomUser, external_user: CustomUser) -> list:
+    groceries = ShoppingList.objects.create(
+        user=authenticated_user, name="Groceries", description='Big, "weekly"'
+    )
+    create_item(groceries, "Milk", quantity=2, unit=ItemUnit.LITER)
+    create_item(
+        groceries, "Beef", ItemCategory.MEAT, note="Lean\nplease", completed=True
+    )
+    ShoppingList.objects.create(user=authenticated_user, name="Empty", completed=True)
+    create_item(create_shopping_list(user=external_user), "Not mine")
+    return snapshot(authenticated_user)
+
+
+@pytest.mark.django_db
+class TestExport:
+    def test_csv_has_a_row_per_item_and_empty_list(
+        self, authenticated_api_client: APIClient, account: list
+    ) -> None:
+        rows = export(authenticated_api_client, "csv").decode().splitlines()
+
+        assert rows[0] == (
+            "list,list_name,list_description,list_completed,"
+            "product,quantity,unit,category,note,completed"
+        )
+        assert len(rows) == 5
+        assert "Not mine" not in "".join(rows)
+
+    def test_jsonl_has_a_line_per_list(
+        self, authenticated_api_client: APIClient, account: list
+    ) -> None:
+        lines = export(authenticated_api_client, "jsonl").decode().splitlines()
+
+        assert [json.loads(line)["name"] for line in lines] == ["Groceries", "Empty"]
+        assert [item["product"] for item in json.loads(lines[0])["items"]] == [
+            "Milk",
+            "Beef",
+        ]
+
+    def test_requires_authentication(
+        self, not_authenticated_api_client: APIClient
+    ) -> None:
+        response = not_authenticated_api_client.get(URLS.SHOPPING_LIST_EXPORT_URL)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+# The ASGI handler runs the view in a thread of its own, so the data has to
+# be committed for it to see it.
+@pytest.mark.django_db(transaction=True)
+class TestAsyncExport:
+    def test_export_is_streamed_under_asgi(
+        self,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        account: list,
+    ) -> None:
+        expected = export(authenticated_api_client, "jsonl")
+        token, _ = Token.objects.get_or_create(user=authenticated_user)
+
+        async def scenario():
+            response = await AsyncClient().get(
+                URLS.SHOPPING_LIST_EXPORT_URL,
+                {"type": "jsonl"},
+                headers={"Authorization": f"Token {token.key}"},
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response.is_async
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        assert async_to_sync(scenario)() == expected
+
+    def test_stream_async_pulls_pieces_in_batches(self) -> None:
+        pulled = []
+
+        def pieces():
+            for number in range(5):
+                pulled.append(number)
+                yield f"{number}\n"
+
+        async def scenario():
+            chunks = aiter(stream_async(pieces(), batch_size=2))
+            first = await anext(chunks)
+            pulled_before_rest = list(pulled)
+            rest = [chunk async for chunk in chunks]
+            return first, pulled_before_rest, rest
+
+        first, pulled_before_rest, rest = async_to_sync(scenario)()
+
+        assert first == "0\n1\n"
+        assert pulled_before_rest == [0, 1]
+        assert rest == ["2\n3\n", "4\n"]
+
+
+@pytest.mark.django_db
+class TestImport:
+    @pytest.mark.parametrize("file_format", ["csv", "jsonl"])
+    def test_round_trip(
+        self,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        account: list,
+        file_format: str,
+    ) -> None:
+        content = export(authenticated_api_client, file_format)
+        ShoppingList.objects.filter(user=authenticated_user).delete()
+
+        response = upload(authenticated_api_client, content, file_format)
+
+        assert response.status_code == status.HTTP_201_CREATED, response.content
+        assert response.data == {"lists": 2, "items": 2}
+        assert snapshot(authenticated_user) == account
+
+    def test_writes_in_chunks(self, authenticated_user: CustomUser) -> None:
+        records = (
+            (
+                number,
+                str(number // 3),
+                {"name": "List"},
+                {"product": "Milk", "category": ItemCategory.DAIRY},
+            )
+            for number in range(10)
+        )
+
+        result = import_lists(authenticated_user, records, chunk_size=4)
+
+        assert (result.lists, result.items) == (4, 10)
+        assert Item.objects.filter(shopping_list__user=authenticated_user).count() == 10
+
+    def test_invalid_row_imports_nothing(
+        self, authenticated_api_client: APIClient, authenticated_user: CustomUser
+    ) -> None:
+        content = (
+            b"list,list_name,product,category\n"
+            b"1,Groceries,Milk,dairy\n"
+            b"1,Groceries,Stone,rocks\n"
+        )
+
+        response = upload(authenticated_api_client, content, "csv")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert response.data["line"] == 3
+        assert "category" in response.data["errors"]
+        assert not ShoppingList.objects.filter(user=authenticated_user).exists()
+
+    def test_upload_commits_every_chunk_on_its_own(
+        self, authenticated_user: CustomUser, monkeypatch
+    ) -> None:
+        chunks = []
+        write_chunk = transfer.write_chunk
+
+        def record_chunk(chunk):
+            chunks.append(chunk)
+            write_chunk(chunk)
+
+        monkeypatch.setattr(transfer, "write_chunk", record_chunk)
+        content = b"list,list_name,product,category\n" + b"".join(
+            b"%d,List,Milk,dairy\n" % (number // 3) for number in range(10)
+        )
+
+        result = import_upload(authenticated_user, io.BytesIO(content), "csv", 4)
+
+        assert (result.lists, result.items) == (4, 10)
+        assert len(chunks) == 4
+        assert Item.objects.filter(shopping_list__user=authenticated_user).count() == 10
+
+    def test_failed_upload_chunk_removes_written_lists(
+        self, authenticated_user: CustomUser, monkeypatch
+    ) -> None:
+        write_chunk = transfer.write_chunk
+        calls = []
+
+        def fail_second_chunk(chunk):
+            calls.append(chunk)
+            if len(calls) == 2:
+                raise RuntimeError("disk full")
+            write_chunk(chunk)
+
+        monkeypatch.setattr(transfer, "write_chunk", fail_second_chunk)
+        content = b"list,list_name,product,category\n" + b"".join(
+            b"%d,List,Milk,dairy\n" % number for number in range(5)
+        )
+
+        with pytest.raises(RuntimeError):
+            import_upload(authenticated_user, io.BytesIO(content), "csv", 2)
+
+        assert not ShoppingList.objects.filter(user=authenticated_user).exists()
+
+    def test_invalid_json_line(self, authenticated_api_client: APIClient) -> None:
+        response = upload(authenticated_api_client, b'{"name": "A"}\n[oops\n', "jsonl")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert response.data["line"] == 2
+
+    def test_command(
+        self, authenticated_user: CustomUser, account: list, tmp_path
+    ) -> None:
+        path = tmp_path / "lists.jsonl"
+        call_command(
+            "export_lists", authenticated_user.email, type="jsonl", output=str(path)
+        )
+        ShoppingList.objects.filter(user=authenticated_user).delete()
+        stdout = io.StringIO()
+
+        call_command(
+            "import_lists",
+            authenticated_user.email,
+            str(path),
+            type="jsonl",
+            stdout=stdout,
+        )
+
+        assert stdout.getvalue().strip() == "Imported 2 lists and 2 items."
+        assert snapshot(authenticated_user) == account
+
+    def test_command_reports_invalid_file(
+        self, authenticated_user: CustomUser, tmp_path
+    ) -> None:
+        path = tmp_path / "lists.csv"
+        path.write_text("list,list_name,product,category\n1,,Milk,dairy\n")
+
+        with pytest.raises(CommandError, match="Line 2"):
+            call_command("import_lists", authenticated_user.email, str(path))
+
+    def test_reads_rows_incrementally(self) -> None:
+        records = read_records(
+            io.BytesIO(b"list,list_name,product,category\n1,A,Milk,dairy\n"), "csv"
+        )
+
+        assert next(records) == (
+            2,
+            "1",
+            {"name": "A"},
+            {"product": "Milk", "category": "dairy"},
+        )
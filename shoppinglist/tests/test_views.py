@@ -1,14 +1,18 @@
+import time
+import uuid
 from typing import Dict, List
 
 import pytest
 from django.db import connections
 from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+from freezegun import freeze_time
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from conftest import create_item, create_multiple_items, create_shopping_list
 from shoppinglist.constants import ItemCategory, ItemUnit
-from shoppinglist.models import ShoppingList
+from shoppinglist.models import Item, ShoppingList
 from users.models import CustomUser
 
 from .error_messages import ERRORS
@@ -95,11 +99,216 @@ class TestShoppingListViewSet:
             response = authenticated_api_client.get(f"{URLS.SHOPPING_LIST_URL}/")
             assert response.status_code == status.HTTP_200_OK, response.content
 
-            EXPECTED_NUMBER_OF_QUERIES = 5
+            EXPECTED_NUMBER_OF_QUERIES = 4
             assert (
                 len(context) == EXPECTED_NUMBER_OF_QUERIES
             ), f"Expected {EXPECTED_NUMBER_OF_QUERIES} queries, but got {len(context)} queries"
 
+    def test_number_of_queries_does_not_grow_with_lists(
+        self,
+        authenticated_user: CustomUser,
+        authenticated_api_client: APIClient,
+        external_user: CustomUser,
+    ) -> None:
+        for number in range(10):
+            shopping_list = create_shopping_list(
+                name=f"Shopping List {number}", user=authenticated_user
+            )
+            shopping_list.shared_with.add(external_user)
+            create_multiple_items(
+                shopping_list,
+                [
+                    {"product": "Milk", "category": ItemCategory.DAIRY},
+                    {"product": "Beef", "category": ItemCategory.MEAT},
+                ],
+            )
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = authenticated_api_client.get(f"{URLS.SHOPPING_LIST_URL}/")
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert len(response.data) == 10
+        assert len(context) == 4, [query["sql"] for query in context]
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = authenticated_api_client.get(
+                f"{URLS.SHOPPING_LIST_URL}/", {"expand": "items"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert len(response.data[0]["items"]) == 2
+        assert len(context) == 5, [query["sql"] for query in context]
+
+    def test_shopping_lists_collection_does_not_embed_items_by_default(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        create_item(shopping_list=shopping_list)
+
+        response = authenticated_api_client.get(f"{URLS.SHOPPING_LIST_URL}/")
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert "items" not in response.data[0]
+        assert response.data[0]["items_count"] == 1
+
+    def test_shopping_list_sparse_fieldset(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        create_item(shopping_list=shopping_list)
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = authenticated_api_client.get(
+                f"{URLS.SHOPPING_LIST_URL}/", {"fields": "name,completed"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data == [
+            {"id": shopping_list.pk, "name": "Test List", "completed": False}
+        ]
+        list_query = context.captured_queries[-1]["sql"]
+        assert '"description"' not in list_query
+        assert '"shoppinglist_item"' not in list_query
+
+    def test_shopping_list_sparse_fieldset_with_expand(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        create_item(shopping_list=shopping_list)
+
+        response = authenticated_api_client.get(
+            f"{URLS.SHOPPING_LIST_URL}/", {"fields": "name", "expand": "items"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert set(response.data[0]) == {"id", "name", "items"}
+        assert response.data[0]["items"][0]["product"] == "Milk"
+
+    def test_retrieve_shopping_list_embeds_items_by_default(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        create_item(shopping_list=shopping_list)
+        url = URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk)
+
+        response = authenticated_api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["items"][0]["product"] == "Milk"
+
+    def test_list_counters_and_sharing_info(
+        self,
+        authenticated_user: CustomUser,
+        authenticated_api_client: APIClient,
+        external_user: CustomUser,
+        third_user: CustomUser,
+    ) -> None:
+        shopping_list = create_shopping_list(user=authenticated_user)
+        shopping_list.shared_with.add(external_user, third_user)
+        create_multiple_items(
+            shopping_list,
+            [
+                {"product": "Milk", "category": ItemCategory.DAIRY},
+                {"product": "Cheese", "category": ItemCategory.DAIRY},
+                {"product": "Beef", "category": ItemCategory.MEAT, "completed": True},
+            ],
+        )
+
+        response = authenticated_api_client.get(f"{URLS.SHOPPING_LIST_URL}/")
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert len(response.data) == 1
+        assert response.data[0]["items_count"] == 3
+        assert response.data[0]["completed_items_count"] == 1
+        assert response.data[0]["shared_with_count"] == 2
+        assert response.data[0]["category_counts"] == {
+            ItemCategory.DAIRY.value: 2,
+            ItemCategory.MEAT.value: 1,
+        }
+
+    def test_shopping_lists_are_not_paginated_by_default(
+        self, authenticated_user: CustomUser, authenticated_api_client: APIClient
+    ) -> None:
+        create_shopping_list(name="Shopping List 1", user=authenticated_user)
+
+        response = authenticated_api_client.get(f"{URLS.SHOPPING_LIST_URL}/")
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert isinstance(response.data, list)
+
+    def test_shopping_lists_cursor_pagination(
+        self, authenticated_user: CustomUser, authenticated_api_client: APIClient
+    ) -> None:
+        for number in range(5):
+            create_shopping_list(
+                name=f"Shopping List {number}", user=authenticated_user
+            )
+
+        response = authenticated_api_client.get(
+            f"{URLS.SHOPPING_LIST_URL}/", {"page_size": 2}
+        )
+        names = [shopping_list["name"] for shopping_list in response.data["results"]]
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["previous"] is None
+
+        while response.data["next"]:
+            response = authenticated_api_client.get(response.data["next"])
+            assert response.status_code == status.HTTP_200_OK, response.content
+            names += [
+                shopping_list["name"] for shopping_list in response.data["results"]
+            ]
+
+        assert names == [f"Shopping List {number}" for number in range(5)]
+
+        response = authenticated_api_client.get(response.data["previous"])
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert [
+            shopping_list["name"] for shopping_list in response.data["results"]
+        ] == ["Shopping List 2", "Shopping List 3"]
+
+    def test_shopping_lists_invalid_cursor(
+        self, authenticated_api_client: APIClient
+    ) -> None:
+        response = authenticated_api_client.get(
+            f"{URLS.SHOPPING_LIST_URL}/", {"cursor": "not-a-cursor"}
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.content
+        assert response.data == ERRORS.INVALID_CURSOR_ERROR
+
+    def test_shopping_lists_report_callers_access(
+        self,
+        authenticated_user: CustomUser,
+        authenticated_api_client: APIClient,
+        external_user: CustomUser,
+    ) -> None:
+        create_shopping_list(name="Own List", user=authenticated_user)
+        shared_list = create_shopping_list(name="Shared List", user=external_user)
+        shared_list.shared_with.add(authenticated_user)
+
+        response = authenticated_api_client.get(f"{URLS.SHOPPING_LIST_URL}/")
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert [
+            (shopping_list["name"], shopping_list["access"])
+            for shopping_list in response.data
+        ] == [("Own List", "owner"), ("Shared List", "shared")]
+
+    def test_retrieve_shared_list_resolves_access_in_list_query(
+        self,
+        authenticated_user: CustomUser,
+        authenticated_api_client: APIClient,
+        external_user: CustomUser,
+        third_user: CustomUser,
+    ) -> None:
+        shopping_list = create_shopping_list(user=external_user)
+        shopping_list.shared_with.add(third_user, authenticated_user)
+        url = URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk)
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = authenticated_api_client.get(url, {"fields": "name,access"})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["access"] == "shared"
+        assert len(context) == 2, [query["sql"] for query in context]
+
     def test_create_shopping_list(
         self, authenticated_user: CustomUser, authenticated_api_client: APIClient
     ) -> None:
@@ -413,6 +622,187 @@ class TestShoppingListViewSet:
         assert response.status_code == status.HTTP_404_NOT_FOUND, response.content
         assert response.data == ERRORS.NOT_FOUND_ERROR
 
+    def test_share_many_shopping_lists(
+        self,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+        third_user: CustomUser,
+        mailoutbox,
+    ) -> None:
+        shopping_lists = [
+            create_shopping_list(user=authenticated_user, name=f"List {number}")
+            for number in range(3)
+        ]
+        data = {
+            "lists": [shopping_list.pk for shopping_list in shopping_lists],
+            "emails": [external_user.email, third_user.email],
+        }
+        response = authenticated_api_client.post(
+            URLS.SHOPPING_LIST_SHARE_MANY_URL, data=data, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data == {
+            "detail": "Shopping lists shared successfully.",
+            "shared": 6,
+            "already_shared": 0,
+        }
+        for shopping_list in shopping_lists:
+            assert set(shopping_list.shared_with.all()) == {external_user, third_user}
+            shopping_list.refresh_from_db()
+            assert shopping_list.version == 2
+        assert sorted(message.to[0] for message in mailoutbox) == sorted(
+            [external_user.email, third_user.email]
+        )
+        assert mailoutbox[0].body == (
+            f"{authenticated_user.email} has shared 3 shopping lists with you."
+        )
+
+    def test_share_many_skips_existing_shares_and_owners(
+        self,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+        third_user: CustomUser,
+        mailoutbox,
+    ) -> None:
+        shared_list = create_shopping_list(user=authenticated_user)
+        shared_list.shared_with.add(external_user)
+        # A list the caller can share but the third user owns.
+        owned_list = create_shopping_list(user=third_user)
+        owned_list.shared_with.add(authenticated_user)
+
+        data = {
+            "lists": [shared_list.pk, owned_list.pk],
+            "emails": [external_user.email, third_user.email],
+        }
+        response = authenticated_api_client.post(
+            URLS.SHOPPING_LIST_SHARE_MANY_URL, data=data, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["shared"] == 2
+        assert response.data["already_shared"] == 1
+        assert set(shared_list.shared_with.all()) == {external_user, third_user}
+        assert set(owned_list.shared_with.all()) == {
+            authenticated_user,
+            external_user,
+        }
+        assert {message.to[0]: message.body for message in mailoutbox} == {
+            external_user.email: (
+                f"{authenticated_user.email} has shared a shopping list with you."
+            ),
+            third_user.email: (
+                f"{authenticated_user.email} has shared a shopping list with you."
+            ),
+        }
+
+        response = authenticated_api_client.post(
+            URLS.SHOPPING_LIST_SHARE_MANY_URL, data=data, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["shared"] == 0
+        assert len(mailoutbox) == 2
+
+    def test_share_many_query_count_does_not_grow(
+        self,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+        third_user: CustomUser,
+    ) -> None:
+        def share(lists: List[ShoppingList], emails: List[str]) -> int:
+            data = {"lists": [shopping_list.pk for shopping_list in lists]}
+            data["emails"] = emails
+            with CaptureQueriesContext(connections["default"]) as context:
+                response = authenticated_api_client.post(
+                    URLS.SHOPPING_LIST_SHARE_MANY_URL, data=data, format="json"
+                )
+            assert response.status_code == status.HTTP_200_OK, response.content
+            return len(context)
+
+        single = share(
+            [create_shopping_list(user=authenticated_user)], [third_user.email]
+        )
+        many = share(
+            [create_shopping_list(user=authenticated_user) for _ in range(10)],
+            [external_user.email, third_user.email],
+        )
+
+        assert many == single
+
+    def test_share_many_unknown_emails(
+        self,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        external_user: CustomUser,
+    ) -> None:
+        data = {
+            "lists": [shopping_list.pk],
+            "emails": [external_user.email, "nobody@example.com"],
+        }
+        response = authenticated_api_client.post(
+            URLS.SHOPPING_LIST_SHARE_MANY_URL, data=data, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert response.data == {
+            "detail": "User not found.",
+            "emails": ["nobody@example.com"],
+        }
+        assert not shopping_list.shared_with.exists()
+
+    def test_share_many_inaccessible_lists(
+        self,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        external_user: CustomUser,
+        third_user: CustomUser,
+    ) -> None:
+        other_list = create_shopping_list(user=external_user)
+        data = {
+            "lists": [shopping_list.pk, other_list.pk],
+            "emails": [third_user.email],
+        }
+        response = authenticated_api_client.post(
+            URLS.SHOPPING_LIST_SHARE_MANY_URL, data=data, format="json"
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.content
+        assert response.data == {
+            "detail": "Shopping list not found.",
+            "lists": [other_list.pk],
+        }
+        assert not shopping_list.shared_with.exists()
+
+    def test_share_many_with_yourself(
+        self,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        shopping_list: ShoppingList,
+    ) -> None:
+        data = {"lists": [shopping_list.pk], "emails": [authenticated_user.email]}
+        response = authenticated_api_client.post(
+            URLS.SHOPPING_LIST_SHARE_MANY_URL, data=data, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert response.data == {"detail": "You cannot share the list with yourself."}
+
+    def test_share_many_requires_lists_and_emails(
+        self, authenticated_api_client: APIClient
+    ) -> None:
+        response = authenticated_api_client.post(
+            URLS.SHOPPING_LIST_SHARE_MANY_URL,
+            data={"lists": [], "emails": []},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert set(response.data) == {"lists", "emails"}
+
     def test_unshare_shopping_list_from_user(
         self,
         authenticated_api_client: APIClient,
@@ -539,53 +929,232 @@ class TestShoppingListViewSet:
             pk=authenticated_user.pk
         ).exists()
 
+    def test_retrieve_unchanged_shopping_list_returns_not_modified(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        create_item(shopping_list=shopping_list)
+        url = URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk)
+        etag = authenticated_api_client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = authenticated_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
 
-@pytest.mark.django_db
-class TestItemViewSet:
-    def test_add_new_item_to_shopping_list(
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert not any('"shoppinglist_item"' in query["sql"] for query in context)
+
+    def test_shopping_lists_collection_etag_changes_after_item_write(
         self, authenticated_api_client: APIClient, shopping_list: ShoppingList
     ) -> None:
-        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
-        data: Dict[str, str | ItemCategory | ItemUnit | int] = {
-            "product": "Beef",
-            "category": ItemCategory.MEAT,
-            "quantity": 1,
-            "unit": ItemUnit.KILOGRAM,
-        }
-        print(url)
+        etag = authenticated_api_client.get(f"{URLS.SHOPPING_LIST_URL}/")["ETag"]
 
-        response = authenticated_api_client.post(url, data=data)
+        response = authenticated_api_client.get(
+            f"{URLS.SHOPPING_LIST_URL}/", HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
 
-        assert response.status_code == status.HTTP_201_CREATED, response.content
-        assert response.data["product"] == data["product"]
+        authenticated_api_client.post(
+            URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk),
+            data={"product": "Milk", "category": ItemCategory.DAIRY},
+        )
+        response = authenticated_api_client.get(
+            f"{URLS.SHOPPING_LIST_URL}/", HTTP_IF_NONE_MATCH=etag
+        )
 
-    @pytest.mark.parametrize(
-        "invalid_data, expected_response",
-        [
-            (
-                {
-                    "product": "",
-                    "quantity": -1,
-                    "unit": "invalid_unit",
-                    "category": 123,
-                    "completed": "true_string",
-                },
-                {
-                    "product": [ERRORS.NOT_BLANK_ERROR],
-                    "quantity": [ERRORS.MIN_QUANTITY_ERROR],
-                    "unit": [ERRORS.INVALID_CHOICE_ERROR_UNIT],
-                    "category": [ERRORS.INVALID_CHOICE_ERROR_CATEGORY],
-                    "completed": [ERRORS.INVALID_BOOLEAN_ERROR],
-                },
-            ),
-        ],
-    )
-    def test_add_item_with_invalid_data_to_shopping_list(
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response["ETag"] != etag
+        shopping_list.refresh_from_db()
+        assert shopping_list.version == 2
+
+    def test_shopping_lists_collection_etag_changes_when_lists_are_swapped(
         self,
         authenticated_api_client: APIClient,
-        shopping_list: ShoppingList,
-        invalid_data: Dict[str, str | int],
-        expected_response: Dict[str, List[str]],
+        authenticated_user: CustomUser,
+        external_user: CustomUser,
+    ) -> None:
+        visible_list = create_shopping_list(user=external_user, name="A")
+        hidden_list = create_shopping_list(user=external_user, name="B")
+        visible_list.shared_with.add(authenticated_user)
+        ShoppingList.objects.filter(pk=visible_list.pk).update(version=5)
+        ShoppingList.objects.filter(pk=hidden_list.pk).update(version=4)
+        etag = authenticated_api_client.get(f"{URLS.SHOPPING_LIST_URL}/")["ETag"]
+
+        # Same count and version sum, different lists.
+        visible_list.shared_with.remove(authenticated_user)
+        hidden_list.shared_with.add(authenticated_user)
+        ShoppingList.objects.filter(pk=hidden_list.pk).update(version=5)
+        response = authenticated_api_client.get(
+            f"{URLS.SHOPPING_LIST_URL}/", HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert [shopping_list["name"] for shopping_list in response.data] == ["B"]
+
+    def test_shopping_lists_collection_has_no_last_modified(
+        self,
+        authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        shopping_list: ShoppingList,
+    ) -> None:
+        other_list = create_shopping_list(user=authenticated_user)
+        url = f"{URLS.SHOPPING_LIST_URL}/"
+        response = authenticated_api_client.get(url)
+        assert "Last-Modified" not in response
+
+        other_list.delete()
+        response = authenticated_api_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert [item["id"] for item in response.data] == [shopping_list.pk]
+
+    def test_etag_depends_on_query_parameters(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        url = URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk)
+
+        full = authenticated_api_client.get(url)
+        sparse = authenticated_api_client.get(url, {"fields": "name"})
+
+        assert full["ETag"] != sparse["ETag"]
+        assert "Last-Modified" in full
+
+    def test_changes_without_cursor_returns_every_item(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        item = create_item(shopping_list=shopping_list)
+        url = URLS.SHOPPING_LIST_CHANGES_URL.format(pk=shopping_list.pk)
+
+        response = authenticated_api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["cursor"] == shopping_list.version
+        assert [entry["id"] for entry in response.data["items"]] == [item.pk]
+        assert response.data["deleted"] == []
+
+    def test_changes_since_cursor_returns_only_changes(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        untouched = create_item(shopping_list=shopping_list, product="Bread")
+        updated = create_item(shopping_list=shopping_list, product="Cheese")
+        deleted = create_item(shopping_list=shopping_list, product="Beef")
+        url = URLS.SHOPPING_LIST_CHANGES_URL.format(pk=shopping_list.pk)
+        cursor = authenticated_api_client.get(url).data["cursor"]
+
+        authenticated_api_client.patch(
+            URLS.ITEM_DETAIL_URL.format(
+                shopping_list_pk=shopping_list.pk, item_pk=updated.pk
+            ),
+            data={"quantity": 2},
+        )
+        authenticated_api_client.delete(
+            URLS.ITEM_DETAIL_URL.format(
+                shopping_list_pk=shopping_list.pk, item_pk=deleted.pk
+            )
+        )
+        authenticated_api_client.post(
+            URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk),
+            data={"product": "Milk", "category": ItemCategory.DAIRY},
+        )
+        response = authenticated_api_client.get(url, {"since": cursor})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["cursor"] == cursor + 3
+        products = [entry["product"] for entry in response.data["items"]]
+        assert sorted(products) == ["Cheese", "Milk"]
+        assert untouched.product not in products
+        assert response.data["deleted"] == [deleted.pk]
+
+        response = authenticated_api_client.get(url, {"since": response.data["cursor"]})
+        assert response.data["items"] == []
+        assert response.data["deleted"] == []
+
+    def test_changes_with_expired_cursor_returns_gone(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        ShoppingList.objects.filter(pk=shopping_list.pk).update(
+            version=10, sync_floor=5
+        )
+        url = URLS.SHOPPING_LIST_CHANGES_URL.format(pk=shopping_list.pk)
+
+        response = authenticated_api_client.get(url, {"since": 4})
+        assert response.status_code == status.HTTP_410_GONE, response.content
+
+        response = authenticated_api_client.get(url, {"since": 5})
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    @pytest.mark.parametrize("since", ["abc", "-1", "99"])
+    def test_changes_with_invalid_cursor(
+        self,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        since: str,
+    ) -> None:
+        url = URLS.SHOPPING_LIST_CHANGES_URL.format(pk=shopping_list.pk)
+
+        response = authenticated_api_client.get(url, {"since": since})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert "since" in response.data
+
+    def test_changes_of_someone_elses_shopping_list_are_not_accessible(
+        self, authenticated_api_client: APIClient, external_user: CustomUser
+    ) -> None:
+        shopping_list = create_shopping_list(user=external_user)
+        url = URLS.SHOPPING_LIST_CHANGES_URL.format(pk=shopping_list.pk)
+
+        response = authenticated_api_client.get(url)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.content
+
+
+@pytest.mark.django_db
+class TestItemViewSet:
+    def test_add_new_item_to_shopping_list(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+        data: Dict[str, str | ItemCategory | ItemUnit | int] = {
+            "product": "Beef",
+            "category": ItemCategory.MEAT,
+            "quantity": 1,
+            "unit": ItemUnit.KILOGRAM,
+        }
+        print(url)
+
+        response = authenticated_api_client.post(url, data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED, response.content
+        assert response.data["product"] == data["product"]
+
+    @pytest.mark.parametrize(
+        "invalid_data, expected_response",
+        [
+            (
+                {
+                    "product": "",
+                    "quantity": -1,
+                    "unit": "invalid_unit",
+                    "category": 123,
+                    "completed": "true_string",
+                },
+                {
+                    "product": [ERRORS.NOT_BLANK_ERROR],
+                    "quantity": [ERRORS.MIN_QUANTITY_ERROR],
+                    "unit": [ERRORS.INVALID_CHOICE_ERROR_UNIT],
+                    "category": [ERRORS.INVALID_CHOICE_ERROR_CATEGORY],
+                    "completed": [ERRORS.INVALID_BOOLEAN_ERROR],
+                },
+            ),
+        ],
+    )
+    def test_add_item_with_invalid_data_to_shopping_list(
+        self,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        invalid_data: Dict[str, str | int],
+        expected_response: Dict[str, List[str]],
     ) -> None:
         url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
         response = authenticated_api_client.post(url, data=invalid_data)
@@ -609,6 +1178,169 @@ class TestItemViewSet:
         assert response.status_code == status.HTTP_404_NOT_FOUND, response.content
         assert response.data == ERRORS.SH_LIST_NOT_FOUND_ERROR
 
+    def test_items_cursor_pagination_follows_completed_created_order(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        for number in range(6):
+            create_item(
+                shopping_list=shopping_list,
+                product=f"Product {number}",
+                completed=number % 2 == 0,
+            )
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+
+        response = authenticated_api_client.get(url, {"page_size": 4})
+        first_page = [item["product"] for item in response.data["results"]]
+        response = authenticated_api_client.get(response.data["next"])
+        second_page = [item["product"] for item in response.data["results"]]
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert first_page == ["Product 1", "Product 3", "Product 5", "Product 0"]
+        assert second_page == ["Product 2", "Product 4"]
+        assert response.data["next"] is None
+
+    def test_items_filtered_by_category_unit_and_completed(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        create_item(shopping_list, "Milk", ItemCategory.DAIRY, unit=ItemUnit.LITER)
+        create_item(shopping_list, "Cheese", ItemCategory.DAIRY, completed=True)
+        create_item(shopping_list, "Beef", ItemCategory.MEAT, unit=ItemUnit.KILOGRAM)
+        create_item(shopping_list, "Bread", ItemCategory.BREAD)
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+
+        def products(params: Dict[str, str | List[str]]) -> List[str]:
+            response = authenticated_api_client.get(url, params)
+            assert response.status_code == status.HTTP_200_OK, response.content
+            return [item["product"] for item in response.data]
+
+        assert products({"category": ItemCategory.DAIRY}) == ["Milk", "Cheese"]
+        assert products({"category": [ItemCategory.MEAT, ItemCategory.BREAD]}) == [
+            "Beef",
+            "Bread",
+        ]
+        assert products({"category": ItemCategory.DAIRY, "completed": "false"}) == [
+            "Milk"
+        ]
+        assert products({"unit": [ItemUnit.LITER, ItemUnit.KILOGRAM]}) == [
+            "Milk",
+            "Beef",
+        ]
+        assert products({"unit": "none"}) == ["Bread", "Cheese"]
+
+    def test_items_with_invalid_filters(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+
+        response = authenticated_api_client.get(
+            url, {"category": "unknown", "sort": "quantity"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert set(response.data) == {"category", "sort"}
+
+    @pytest.mark.parametrize(
+        "sort, expected",
+        [
+            ("product", ["Apples", "Bread", "Milk"]),
+            ("-product", ["Milk", "Bread", "Apples"]),
+            ("created", ["Milk", "Apples", "Bread"]),
+            ("-created", ["Bread", "Apples", "Milk"]),
+            ("category", ["Bread", "Milk", "Apples"]),
+        ],
+    )
+    def test_items_sorted(
+        self,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        sort: str,
+        expected: List[str],
+    ) -> None:
+        create_item(shopping_list, "Milk", ItemCategory.DAIRY)
+        create_item(shopping_list, "Apples", ItemCategory.FRUITS_VEGETABLES)
+        create_item(shopping_list, "Bread", ItemCategory.BREAD)
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+
+        response = authenticated_api_client.get(url, {"sort": sort})
+        paginated = authenticated_api_client.get(url, {"sort": sort, "page_size": 2})
+        next_page = authenticated_api_client.get(paginated.data["next"])
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert [item["product"] for item in response.data] == expected
+        assert [
+            item["product"]
+            for item in [*paginated.data["results"], *next_page.data["results"]]
+        ] == expected
+
+    def test_items_descending_cursor_pages_back(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        for number in range(5):
+            create_item(shopping_list, product=f"Product {number}")
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+
+        first = authenticated_api_client.get(url, {"sort": "-product", "page_size": 2})
+        second = authenticated_api_client.get(first.data["next"])
+        previous = authenticated_api_client.get(second.data["previous"])
+
+        assert [item["product"] for item in second.data["results"]] == [
+            "Product 2",
+            "Product 1",
+        ]
+        assert previous.data["results"] == first.data["results"]
+
+    def test_items_cursor_of_another_sort_is_rejected(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        create_multiple_items(
+            shopping_list, [{"product": f"Product {number}"} for number in range(3)]
+        )
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+        response = authenticated_api_client.get(
+            url, {"sort": "product", "page_size": 1}
+        )
+
+        response = authenticated_api_client.get(
+            response.data["next"].replace("sort=product", "sort=-product")
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.content
+
+    def test_items_facets_count_every_category(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        create_item(shopping_list, "Milk", ItemCategory.DAIRY, completed=True)
+        create_item(shopping_list, "Cheese", ItemCategory.DAIRY, unit=ItemUnit.GRAM)
+        create_item(shopping_list, "Beef", ItemCategory.MEAT, unit=ItemUnit.GRAM)
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+
+        response = authenticated_api_client.get(
+            url, {"category": ItemCategory.MEAT, "facets": "true"}
+        )
+        filtered = authenticated_api_client.get(
+            url, {"unit": ItemUnit.GRAM, "facets": "true", "page_size": 10}
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert [item["product"] for item in response.data["results"]] == ["Beef"]
+        facets = {
+            facet["value"]: facet for facet in response.data["facets"]["category"]
+        }
+        assert set(facets) == set(ItemCategory.values)
+        assert facets[ItemCategory.DAIRY] == {
+            "value": ItemCategory.DAIRY,
+            "count": 2,
+            "completed": 1,
+        }
+        assert facets[ItemCategory.MEAT]["count"] == 1
+        assert facets[ItemCategory.BREAD]["count"] == 0
+        assert filtered.data["next"] is None
+        assert {
+            facet["value"]: facet["count"]
+            for facet in filtered.data["facets"]["category"]
+            if facet["count"]
+        } == {ItemCategory.DAIRY: 1, ItemCategory.MEAT: 1}
+
     def test_retrieve_item_by_pk_from_shopping_list(
         self, authenticated_api_client: APIClient, shopping_list: ShoppingList
     ) -> None:
@@ -622,6 +1354,46 @@ class TestItemViewSet:
         assert response.status_code == status.HTTP_200_OK, response.content
         assert response.data["product"] == shopping_list_item.product
 
+    def test_retrieve_item_is_a_single_query(
+        self,
+        authenticated_user: CustomUser,
+        authenticated_api_client: APIClient,
+        external_user: CustomUser,
+    ) -> None:
+        shopping_list = create_shopping_list(user=external_user)
+        shopping_list.shared_with.add(authenticated_user)
+        shopping_list_item = create_item(shopping_list=shopping_list)
+        url = URLS.ITEM_DETAIL_URL.format(
+            shopping_list_pk=shopping_list.pk, item_pk=shopping_list_item.pk
+        )
+        authenticated_api_client.force_authenticate(user=authenticated_user)
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = authenticated_api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert len(context) == 1, [query["sql"] for query in context]
+
+    def test_items_of_someone_elses_shopping_list_are_not_accessible(
+        self, authenticated_api_client: APIClient, external_user: CustomUser
+    ) -> None:
+        shopping_list = create_shopping_list(user=external_user)
+        shopping_list_item = create_item(shopping_list=shopping_list)
+
+        list_response = authenticated_api_client.get(
+            URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+        )
+        detail_response = authenticated_api_client.get(
+            URLS.ITEM_DETAIL_URL.format(
+                shopping_list_pk=shopping_list.pk, item_pk=shopping_list_item.pk
+            )
+        )
+
+        assert list_response.status_code == status.HTTP_404_NOT_FOUND
+        assert list_response.data == ERRORS.SH_LIST_NOT_FOUND_ERROR
+        assert detail_response.status_code == status.HTTP_404_NOT_FOUND
+        assert detail_response.data == ERRORS.NOT_FOUND_ERROR
+
     def test_update_item_by_pk_from_shopping_list(
         self, authenticated_api_client: APIClient, shopping_list: ShoppingList
     ) -> None:
@@ -725,3 +1497,465 @@ class TestItemViewSet:
 
         assert response.status_code == status.HTTP_404_NOT_FOUND, response.content
         assert response.data == ERRORS.NOT_FOUND_ERROR
+
+    def test_batch_applies_mixed_operations(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        item_to_update = create_item(shopping_list=shopping_list)
+        item_to_delete = create_item(shopping_list=shopping_list, product="Bread")
+        url = URLS.ITEM_BATCH_URL.format(shopping_list_pk=shopping_list.pk)
+        data = {
+            "operations": [
+                {
+                    "op": "create",
+                    "data": {"product": "Eggs", "category": ItemCategory.DAIRY},
+                },
+                {
+                    "op": "update",
+                    "id": item_to_update.pk,
+                    "data": {"completed": True},
+                },
+                {"op": "delete", "id": item_to_delete.pk},
+            ]
+        }
+
+        response = authenticated_api_client.post(url, data=data, format="json")
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        results = response.data["results"]
+        assert [result["status"] for result in results] == [201, 200, 204]
+        assert results[0]["item"]["product"] == "Eggs"
+        assert results[1]["item"]["completed"] is True
+        assert results[2]["id"] == item_to_delete.pk
+        assert set(shopping_list.items.values_list("product", flat=True)) == {
+            "Milk",
+            "Eggs",
+        }
+        item_to_update.refresh_from_db()
+        assert item_to_update.completed
+
+    def test_batch_query_count_does_not_grow_with_operations(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        url = URLS.ITEM_BATCH_URL.format(shopping_list_pk=shopping_list.pk)
+        data = {
+            "operations": [
+                {
+                    "op": "create",
+                    "data": {"product": f"Product {number}", "category": "other"},
+                }
+                for number in range(50)
+            ]
+        }
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = authenticated_api_client.post(url, data=data, format="json")
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert shopping_list.items.count() == 50
+        assert len({result["item"]["id"] for result in response.data["results"]}) == 50
+        assert len(context) <= 9, [query["sql"] for query in context]
+
+    def test_batch_with_invalid_operation_applies_nothing(
+        self,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+        external_user: CustomUser,
+    ) -> None:
+        item = create_item(shopping_list=shopping_list)
+        other_item = create_item(shopping_list=shopping_list, product="Bread")
+        foreign_item = create_item(
+            shopping_list=create_shopping_list(user=external_user)
+        )
+        url = URLS.ITEM_BATCH_URL.format(shopping_list_pk=shopping_list.pk)
+        data = {
+            "operations": [
+                {"op": "create", "data": {"product": "Eggs", "category": "other"}},
+                {"op": "update", "id": other_item.pk, "data": {"quantity": -1}},
+                {"op": "delete", "id": foreign_item.pk},
+                {"op": "delete", "id": item.pk},
+                {"op": "delete", "id": item.pk},
+            ]
+        }
+
+        response = authenticated_api_client.post(url, data=data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert response.data["operations"] == [
+            {},
+            {"quantity": [ERRORS.MIN_QUANTITY_ERROR]},
+            {"id": ["Not found."]},
+            {},
+            {"id": ["Duplicate operation for this item."]},
+        ]
+        assert list(shopping_list.items.all()) == [item, other_item]
+        assert Item.objects.filter(pk=foreign_item.pk).exists()
+
+    def test_batch_requires_operation_id_and_data(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        url = URLS.ITEM_BATCH_URL.format(shopping_list_pk=shopping_list.pk)
+        data = {"operations": [{"op": "update", "data": {}}, {"op": "create"}]}
+
+        response = authenticated_api_client.post(url, data=data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert response.data["operations"][0] == {"id": [ERRORS.FIELD_REQUIRED]}
+        assert response.data["operations"][1] == {"data": [ERRORS.FIELD_REQUIRED]}
+
+    def test_complete_items_in_category(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        create_item(shopping_list=shopping_list)
+        create_item(shopping_list=shopping_list, product="Cheese")
+        beef = create_item(
+            shopping_list=shopping_list, product="Beef", category=ItemCategory.MEAT
+        )
+        url = URLS.ITEM_COMPLETE_URL.format(shopping_list_pk=shopping_list.pk)
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = authenticated_api_client.post(
+                url, data={"category": ItemCategory.DAIRY}, format="json"
+            )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data == {"updated": 2, "shopping_list_completed": False}
+        assert list(
+            shopping_list.items.filter(completed=False).values_list("pk", flat=True)
+        ) == [beef.pk]
+        update_queries = [
+            query for query in context if query["sql"].startswith("UPDATE")
+        ]
+        # Version bump, the items, the list's item counters and its completed
+        # flag.
+        assert len(update_queries) == 4, update_queries
+
+    def test_complete_item_ids_completes_shopping_list(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        milk = create_item(shopping_list=shopping_list)
+        beef = create_item(shopping_list=shopping_list, product="Beef", completed=True)
+        url = URLS.ITEM_COMPLETE_URL.format(shopping_list_pk=shopping_list.pk)
+
+        response = authenticated_api_client.post(
+            url, data={"ids": [milk.pk, beef.pk]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data == {"updated": 1, "shopping_list_completed": True}
+        shopping_list.refresh_from_db()
+        assert shopping_list.completed
+
+    def test_uncomplete_all_items(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        create_item(shopping_list=shopping_list, completed=True)
+        create_item(shopping_list=shopping_list, product="Beef", completed=True)
+        ShoppingList.objects.filter(pk=shopping_list.pk).update(completed=True)
+        url = URLS.ITEM_UNCOMPLETE_URL.format(shopping_list_pk=shopping_list.pk)
+
+        response = authenticated_api_client.post(url, format="json")
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data == {"updated": 2, "shopping_list_completed": False}
+        assert not shopping_list.items.filter(completed=True).exists()
+
+    def test_complete_items_with_invalid_category(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        url = URLS.ITEM_COMPLETE_URL.format(shopping_list_pk=shopping_list.pk)
+
+        response = authenticated_api_client.post(
+            url, data={"category": "invalid"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert "category" in response.data
+
+    def test_items_list_returns_not_modified_until_list_changes(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        item = create_item(shopping_list=shopping_list)
+        url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+        etag = authenticated_api_client.get(url)["ETag"]
+
+        response = authenticated_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        authenticated_api_client.post(
+            URLS.ITEM_COMPLETE_URL.format(shopping_list_pk=shopping_list.pk),
+            data={"ids": [item.pk]},
+            format="json",
+        )
+        response = authenticated_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data[0]["completed"] is True
+
+    def test_item_writes_keep_list_counters(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        bread = create_item(shopping_list=shopping_list, product="Bread")
+        batch_url = URLS.ITEM_BATCH_URL.format(shopping_list_pk=shopping_list.pk)
+        authenticated_api_client.post(
+            batch_url,
+            data={
+                "operations": [
+                    {"op": "create", "data": {"product": "Milk", "category": "dairy"}},
+                    {"op": "create", "data": {"product": "Eggs", "category": "dairy"}},
+                    {"op": "update", "id": bread.pk, "data": {"completed": True}},
+                ]
+            },
+            format="json",
+        )
+        authenticated_api_client.post(
+            URLS.ITEM_COMPLETE_URL.format(shopping_list_pk=shopping_list.pk),
+            data={"category": ItemCategory.DAIRY},
+            format="json",
+        )
+        authenticated_api_client.delete(
+            URLS.ITEM_DETAIL_URL.format(
+                shopping_list_pk=shopping_list.pk, item_pk=bread.pk
+            )
+        )
+
+        response = authenticated_api_client.get(
+            URLS.SHOPPING_LIST_DETAIL_URL.format(pk=shopping_list.pk)
+        )
+
+        assert response.data["items_count"] == 2
+        assert response.data["completed_items_count"] == 2
+        assert response.data["completed"] is True
+
+    def test_item_writes_keep_list_completed(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        milk = create_item(shopping_list=shopping_list, product="Milk")
+        items_url = URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk)
+        milk_url = URLS.ITEM_DETAIL_URL.format(
+            shopping_list_pk=shopping_list.pk, item_pk=milk.pk
+        )
+
+        def completed() -> bool:
+            shopping_list.refresh_from_db(fields=["completed"])
+            return shopping_list.completed
+
+        authenticated_api_client.patch(milk_url, {"completed": True}, format="json")
+        assert completed() is True
+
+        eggs = authenticated_api_client.post(
+            items_url, {"product": "Eggs", "category": "dairy"}
+        ).data
+        assert completed() is False
+
+        authenticated_api_client.delete(
+            URLS.ITEM_DETAIL_URL.format(
+                shopping_list_pk=shopping_list.pk, item_pk=eggs["id"]
+            )
+        )
+        assert completed() is True
+
+        authenticated_api_client.patch(milk_url, {"completed": False}, format="json")
+        assert completed() is False
+
+        authenticated_api_client.patch(milk_url, {"completed": True}, format="json")
+        authenticated_api_client.delete(milk_url)
+        assert completed() is False
+
+    def test_sync_applies_offline_operation_log(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        bread = create_item(shopping_list=shopping_list, product="Bread")
+        url = URLS.ITEM_SYNC_URL.format(shopping_list_pk=shopping_list.pk)
+        operations = [
+            {
+                "op_id": str(uuid.uuid4()),
+                "op": "create",
+                "client_id": "local-1",
+                "timestamp": "2030-01-01T10:00:00Z",
+                "data": {"product": "Milk", "category": ItemCategory.DAIRY},
+            },
+            {
+                "op_id": str(uuid.uuid4()),
+                "op": "update",
+                "client_id": "local-1",
+                "timestamp": "2030-01-01T10:01:00Z",
+                "data": {"quantity": 2},
+            },
+            {
+                "op_id": str(uuid.uuid4()),
+                "op": "toggle",
+                "id": bread.pk,
+                "timestamp": "2030-01-01T10:02:00Z",
+                "completed": True,
+            },
+        ]
+
+        response = authenticated_api_client.post(
+            url,
+            data={"since": shopping_list.version, "operations": operations},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        milk = Item.objects.get(product="Milk")
+        assert milk.quantity == 2
+        assert [result["status"] for result in response.data["results"]] == [
+            "applied",
+            "applied",
+            "applied",
+        ]
+        assert response.data["results"][0]["id"] == milk.pk
+        assert sorted(item["id"] for item in response.data["items"]) == sorted(
+            [bread.pk, milk.pk]
+        )
+        bread.refresh_from_db()
+        assert bread.completed is True
+
+        replay = authenticated_api_client.post(
+            url, data={"operations": operations}, format="json"
+        )
+
+        assert replay.status_code == status.HTTP_200_OK, replay.content
+        assert [result["status"] for result in replay.data["results"]] == [
+            "duplicate"
+        ] * 3
+        assert replay.data["results"][0]["id"] == milk.pk
+        assert shopping_list.items.count() == 2
+
+    def test_sync_resolves_conflicts_field_by_field(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        with freeze_time("2023-01-01 10:00:00"):
+            item = create_item(shopping_list=shopping_list)
+        with freeze_time("2023-01-01 12:00:00"):
+            authenticated_api_client.patch(
+                URLS.ITEM_DETAIL_URL.format(
+                    shopping_list_pk=shopping_list.pk, item_pk=item.pk
+                ),
+                data={"quantity": 3},
+            )
+
+        response = authenticated_api_client.post(
+            URLS.ITEM_SYNC_URL.format(shopping_list_pk=shopping_list.pk),
+            data={
+                "operations": [
+                    {
+                        "op_id": str(uuid.uuid4()),
+                        "op": "update",
+                        "id": item.pk,
+                        "timestamp": "2023-01-01T11:00:00Z",
+                        "data": {"quantity": 5, "note": "Lactose free"},
+                    }
+                ]
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["results"][0]["status"] == "applied"
+        assert response.data["results"][0]["ignored"] == ["quantity"]
+        item.refresh_from_db()
+        assert item.quantity == 3
+        assert item.note == "Lactose free"
+
+    def test_sync_offline_toggle_loses_to_later_bulk_uncomplete(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        with freeze_time("2023-01-01 10:00:00"):
+            item = create_item(shopping_list=shopping_list)
+        with freeze_time("2023-01-01 12:00:00"):
+            authenticated_api_client.post(
+                URLS.ITEM_COMPLETE_URL.format(shopping_list_pk=shopping_list.pk),
+                data={"ids": [item.pk]},
+                format="json",
+            )
+
+        response = authenticated_api_client.post(
+            URLS.ITEM_SYNC_URL.format(shopping_list_pk=shopping_list.pk),
+            data={
+                "operations": [
+                    {
+                        "op_id": str(uuid.uuid4()),
+                        "op": "toggle",
+                        "id": item.pk,
+                        "timestamp": "2023-01-01T11:00:00Z",
+                        "completed": False,
+                    }
+                ]
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["results"][0]["status"] == "stale"
+        item.refresh_from_db()
+        assert item.completed is True
+
+    def test_sync_reports_rejected_and_missing_operations(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        item = create_item(shopping_list=shopping_list)
+        url = URLS.ITEM_SYNC_URL.format(shopping_list_pk=shopping_list.pk)
+        timestamp = "2030-01-01T10:00:00Z"
+
+        response = authenticated_api_client.post(
+            url,
+            data={
+                "operations": [
+                    {
+                        "op_id": str(uuid.uuid4()),
+                        "op": "delete",
+                        "id": item.pk,
+                        "timestamp": timestamp,
+                    },
+                    {
+                        "op_id": str(uuid.uuid4()),
+                        "op": "update",
+                        "id": item.pk,
+                        "timestamp": timestamp,
+                        "data": {"product": "Cheese"},
+                    },
+                    {
+                        "op_id": str(uuid.uuid4()),
+                        "op": "create",
+                        "client_id": "local-1",
+                        "timestamp": timestamp,
+                        "data": {"quantity": -1},
+                    },
+                ]
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        results = response.data["results"]
+        assert [result["status"] for result in results] == [
+            "applied",
+            "not_found",
+            "rejected",
+        ]
+        assert "category" in results[2]["errors"]
+        assert response.data["items"] == []
+        assert not shopping_list.items.exists()
+
+    def test_sync_requires_operation_target(
+        self, authenticated_api_client: APIClient, shopping_list: ShoppingList
+    ) -> None:
+        response = authenticated_api_client.post(
+            URLS.ITEM_SYNC_URL.format(shopping_list_pk=shopping_list.pk),
+            data={
+                "operations": [
+                    {
+                        "op_id": str(uuid.uuid4()),
+                        "op": "toggle",
+                        "timestamp": "2030-01-01T10:00:00Z",
+                        "completed": True,
+                    }
+                ]
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert response.data["operations"][0] == {"id": [ERRORS.FIELD_REQUIRED]}
@@ -0,0 +1,121 @@
+import threading
+from typing import Iterator, List
+
+import pytest
+from django.db import transaction
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from conftest import create_item
+from shoppinglist.constants import ItemCategory
+from shoppinglist.models import Item, ShoppingList
+from shoppinglist.writer import WriteQueue, get_write_queue
+from users.models import CustomUser
+
+from .urls import URLS
+
+
+@pytest.fixture
+def write_queue(settings) -> Iterator[WriteQueue]:
+    settings.WRITE_QUEUE = {**settings.WRITE_QUEUE, "ENABLED": True}
+    get_write_queue.cache_clear()
+    yield get_write_queue()
+    get_write_queue.cache_clear()
+
+
+# The writer thread has a connection of its own, so it only sees data that
+# has been committed.
+@pytest.mark.django_db(transaction=True)
+class TestWriteQueue:
+    def test_commits_queued_jobs_together(self, authenticated_user: CustomUser) -> None:
+        queue = WriteQueue(max_batch=10, max_delay=0.5)
+        events: List[str] = []
+
+        def job(name: str) -> str:
+            ShoppingList.objects.create(user=authenticated_user, name=name)
+            transaction.on_commit(lambda: events.append(f"commit {name}"))
+            events.append(name)
+            return name
+
+        futures = [queue.submit(lambda name=name: job(name)) for name in "abc"]
+
+        assert [future.result(timeout=5) for future in futures] == ["a", "b", "c"]
+        assert events == ["a", "b", "c", "commit a", "commit b", "commit c"]
+
+    def test_failing_job_is_rolled_back_alone(
+        self, authenticated_user: CustomUser
+    ) -> None:
+        queue = WriteQueue(max_batch=10, max_delay=0.5)
+
+        def job(name: str) -> None:
+            ShoppingList.objects.create(user=authenticated_user, name=name)
+            if name == "broken":
+                raise ValueError(name)
+
+        futures = [
+            queue.submit(lambda name=name: job(name))
+            for name in ("first", "broken", "last")
+        ]
+
+        futures[0].result(timeout=5)
+        with pytest.raises(ValueError):
+            futures[1].result(timeout=5)
+        futures[2].result(timeout=5)
+        assert set(ShoppingList.objects.values_list("name", flat=True)) == {
+            "first",
+            "last",
+        }
+
+    def test_runs_jobs_on_writer_thread(self) -> None:
+        queue = WriteQueue(max_batch=1, max_delay=0)
+
+        thread = queue.run(threading.current_thread)
+
+        assert thread is not threading.current_thread()
+        assert queue.run(threading.current_thread) is thread
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSerializedWriteViews:
+    def test_item_writes_go_through_the_queue(
+        self,
+        write_queue: WriteQueue,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        item = create_item(shopping_list=shopping_list)
+        jobs = []
+        run = write_queue.run
+        write_queue.run = lambda func: jobs.append(func) or run(func)
+
+        create_response = authenticated_api_client.post(
+            URLS.ITEM_LIST_URL.format(shopping_list_pk=shopping_list.pk),
+            {"product": "Milk", "category": ItemCategory.DAIRY},
+        )
+        update_response = authenticated_api_client.patch(
+            URLS.ITEM_DETAIL_URL.format(
+                shopping_list_pk=shopping_list.pk, item_pk=item.pk
+            ),
+            {"completed": True},
+        )
+
+        assert create_response.status_code == status.HTTP_201_CREATED
+        assert update_response.status_code == status.HTTP_200_OK
+        assert len(jobs) == 2
+        assert Item.objects.filter(completed=True).count() == 1
+        shopping_list.refresh_from_db()
+        assert shopping_list.version == 3
+
+    def test_errors_raised_on_writer_thread_reach_the_client(
+        self,
+        write_queue: WriteQueue,
+        authenticated_api_client: APIClient,
+        shopping_list: ShoppingList,
+    ) -> None:
+        response = authenticated_api_client.post(
+            URLS.ITEM_BATCH_URL.format(shopping_list_pk=shopping_list.pk),
+            {"operations": [{"op": "update", "id": 0}]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
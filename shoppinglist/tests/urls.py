@@ -2,6 +2,17 @@ class URLS:
     SHOPPING_LIST_URL = "/shoppinglist"
     SHOPPING_LIST_DETAIL_URL = f"{SHOPPING_LIST_URL}/{{pk}}/"
     SHOPPING_LIST_SHARE_URL = f"{SHOPPING_LIST_URL}/{{pk}}/share/"
+    SHOPPING_LIST_SHARE_MANY_URL = f"{SHOPPING_LIST_URL}/share/"
     SHOPPING_LIST_UNSHARE_URL = f"{SHOPPING_LIST_URL}/{{pk}}/unshare/{{user_pk}}/"
+    SHOPPING_LIST_CHANGES_URL = f"{SHOPPING_LIST_URL}/{{pk}}/changes/"
+    SHOPPING_LIST_EVENTS_URL = f"{SHOPPING_LIST_URL}/{{pk}}/events/"
+    SHOPPING_LIST_AUTOCOMPLETE_URL = f"{SHOPPING_LIST_URL}/autocomplete/"
+    SHOPPING_LIST_SEARCH_URL = f"{SHOPPING_LIST_URL}/search/"
+    SHOPPING_LIST_EXPORT_URL = f"{SHOPPING_LIST_URL}/export/"
+    SHOPPING_LIST_IMPORT_URL = f"{SHOPPING_LIST_URL}/import/"
     ITEM_LIST_URL = f"{SHOPPING_LIST_URL}/{{shopping_list_pk}}/item/"
     ITEM_DETAIL_URL = f"{SHOPPING_LIST_URL}/{{shopping_list_pk}}/item/{{item_pk}}/"
+    ITEM_BATCH_URL = f"{SHOPPING_LIST_URL}/{{shopping_list_pk}}/item/batch/"
+    ITEM_SYNC_URL = f"{SHOPPING_LIST_URL}/{{shopping_list_pk}}/item/sync/"
+    ITEM_COMPLETE_URL = f"{SHOPPING_LIST_URL}/{{shopping_list_pk}}/item/complete/"
+    ITEM_UNCOMPLETE_URL = f"{SHOPPING_LIST_URL}/{{shopping_list_pk}}/item/uncomplete/"
@@ -0,0 +1,337 @@
+"""
+Export and import of all the shopping lists a user owns.
+
+Exports are generated row by row from two ``iterator()`` queries, lists and
+their items both ordered by list, so memory stays flat however big the
+account is. Two formats are supported:
+
+- ``csv``: one row per item, repeating the columns of its list; a list
+  without items has one row with empty item columns. Rows of the same list
+  share the value of the ``list`` column.
+- ``jsonl``: one JSON object per line and list, with its items under
+  ``items``.
+
+Under ASGI the export is wrapped in ``stream_async``, since Django buffers
+synchronous iterators there.
+
+Imports read uploads in the same formats one row at a time and write them
+with chunked ``bulk_create`` calls, so a file with an invalid row imports
+nothing. ``import_lists`` writes all chunks in a single transaction;
+``import_upload``, used by the API, validates the file first and commits
+every chunk on its own so that it does not hold up other writes.
+"""
+
+import csv
+import io
+import itertools
+import json
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import (
+    IO,
+    Any,
+    AsyncIterator,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from rest_framework import serializers
+
+from .autocomplete import forget_index
+from .models import Item, ShoppingList
+from .serializers import ItemSerializer, ShoppingListImportSerializer
+from .writer import serialized_write
+
+CSV = "csv"
+JSONL = "jsonl"
+FORMATS = (CSV, JSONL)
+CONTENT_TYPES = {CSV: "text/csv", JSONL: "application/x-ndjson"}
+
+CHUNK_SIZE = 2000
+ASYNC_BATCH_SIZE = 100
+
+LIST_FIELDS = ("name", "description", "completed")
+ITEM_FIELDS = ("product", "quantity", "unit", "category", "note", "completed")
+CSV_HEADER = ["list", *(f"list_{field}" for field in LIST_FIELDS), *ITEM_FIELDS]
+
+# A record is the line number, the list key, the list and the item, if any,
+# of one row.
+Record = Tuple[int, str, Dict[str, Any], Optional[Dict[str, Any]]]
+
+
+class ImportFailed(Exception):
+    """An imported row is invalid; nothing has been written."""
+
+    def __init__(self, line: int, errors: Any) -> None:
+        super().__init__(f"Line {line}: {errors}")
+        self.line = line
+        self.errors = errors
+
+
+@dataclass
+class ImportResult:
+    lists: int = 0
+    items: int = 0
+
+
+def iter_shopping_lists(
+    user, using: Optional[str] = None, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Tuple[ShoppingList, Iterator[Item]]]:
+    """
+    The lists ``user`` owns with an iterator over the items of each, which
+    has to be consumed before moving on to the next list.
+    """
+    shopping_lists = (
+        ShoppingList.objects.using(using)
+        .filter(user=user)
+        .only("id", *LIST_FIELDS)
+        .order_by("id")
+        .iterator(chunk_size=chunk_size)
+    )
+    items = (
+        Item.objects.using(using)
+        .filter(shopping_list__user=user)
+        .only("shopping_list_id", *ITEM_FIELDS)
+        .order_by("shopping_list_id", "id")
+        .iterator(chunk_size=chunk_size)
+    )
+    groups = itertools.groupby(items, key=attrgetter("shopping_list_id"))
+    group = next(groups, None)
+    for shopping_list in shopping_lists:
+        # Skip items of lists created after the list query started.
+        while group is not None and group[0] < shopping_list.pk:
+            group = next(groups, None)
+        if group is not None and group[0] == shopping_list.pk:
+            yield shopping_list, group[1]
+            group = next(groups, None)
+        else:
+            yield shopping_list, iter(())
+
+
+class Echo:
+    """File-like object handing back what is written, for ``csv.writer``."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_csv(
+    shopping_lists: Iterable[Tuple[ShoppingList, Iterator[Item]]],
+) -> Generator[str, None, None]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for shopping_list, items in shopping_lists:
+        list_row = [
+            shopping_list.pk,
+            *(getattr(shopping_list, field) for field in LIST_FIELDS),
+        ]
+        empty = True
+        for item in items:
+            empty = False
+            yield writer.writerow(
+                [*list_row, *(getattr(item, field) for field in ITEM_FIELDS)]
+            )
+        if empty:
+            yield writer.writerow(list_row + [""] * len(ITEM_FIELDS))
+
+
+def export_jsonl(
+    shopping_lists: Iterable[Tuple[ShoppingList, Iterator[Item]]],
+) -> Generator[str, None, None]:
+    for shopping_list, items in shopping_lists:
+        yield json.dumps(
+            {
+                **{field: getattr(shopping_list, field) for field in LIST_FIELDS},
+                "items": [
+                    {field: getattr(item, field) for field in ITEM_FIELDS}
+                    for item in items
+                ],
+            }
+        ) + "\n"
+
+
+def export_lists(
+    user, file_format: str, using: Optional[str] = None
+) -> Generator[str, None, None]:
+    """The lists ``user`` owns in ``file_format``, in pieces of text."""
+    shopping_lists = iter_shopping_lists(user, using=using)
+    if file_format == CSV:
+        return export_csv(shopping_lists)
+    return export_jsonl(shopping_lists)
+
+
+async def stream_async(
+    pieces: Generator[str, None, None], batch_size: int = ASYNC_BATCH_SIZE
+) -> AsyncIterator[str]:
+    """
+    Serve an export from an async iterator under ASGI, where Django would
+    otherwise read a synchronous one to the end before sending anything.
+
+    The export queries the database, so the pieces are pulled in the
+    thread that runs synchronous code, ``batch_size`` at a time to keep the
+    thread switches cheap.
+    """
+    take = sync_to_async(lambda: "".join(itertools.islice(pieces, batch_size)))
+    try:
+        while chunk := await take():
+            yield chunk
+    finally:
+        # Release the server-side cursors if the client went away early.
+        await sync_to_async(pieces.close)()
+
+
+def read_csv(text: IO[str]) -> Iterator[Record]:
+    reader = csv.DictReader(text)
+    for row in reader:
+        list_data = {field: row.get(f"list_{field}") for field in LIST_FIELDS}
+        item_data = {field: row.get(field) for field in ITEM_FIELDS}
+        # Empty cells are missing values, which null and default fields take.
+        item_data = {field: value for field, value in item_data.items() if value}
+        list_data = {field: value for field, value in list_data.items() if value}
+        yield reader.line_num, row.get("list") or "", list_data, item_data or None
+
+
+def read_jsonl(text: IO[str]) -> Iterator[Record]:
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            raise ImportFailed(number, "Invalid JSON.")
+        if not isinstance(data, dict):
+            raise ImportFailed(number, "Expected an object.")
+        items = data.pop("items", None) or []
+        key = str(number)
+        if not items:
+            yield number, key, data, None
+        for item_data in items:
+            yield number, key, data, item_data
+
+
+def read_records(upload: IO[bytes], file_format: str) -> Iterator[Record]:
+    """Parse an uploaded binary file one row at a time, leaving it open."""
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    try:
+        yield from read_csv(text) if file_format == CSV else read_jsonl(text)
+    finally:
+        # Closing the wrapper would close the upload too.
+        if not text.closed:
+            text.detach()
+
+
+def validate(serializer: serializers.Serializer, line: int) -> Dict[str, Any]:
+    if not serializer.is_valid():
+        raise ImportFailed(line, serializer.errors)
+    return serializer.validated_data
+
+
+Chunk = Tuple[List[ShoppingList], List[Item]]
+
+
+def build_chunks(
+    user, records: Iterable[Record], chunk_size: int = CHUNK_SIZE
+) -> Iterator[Chunk]:
+    """
+    The lists owned by ``user`` for every run of records sharing a list key
+    and their items, validated like the API does, ``chunk_size`` objects at
+    a time. The first invalid row raises ``ImportFailed``.
+    """
+    pending_lists: List[ShoppingList] = []
+    pending_items: List[Item] = []
+    key: Optional[str] = None
+    shopping_list: Optional[ShoppingList] = None
+    for line, record_key, list_data, item_data in records:
+        if shopping_list is None or record_key != key:
+            serializer = ShoppingListImportSerializer(data=list_data)
+            shopping_list = ShoppingList(user=user, **validate(serializer, line))
+            pending_lists.append(shopping_list)
+            key = record_key
+        if item_data is not None:
+            serializer = ItemSerializer(data=item_data)
+            pending_items.append(
+                Item(
+                    shopping_list=shopping_list,
+                    changed_version=shopping_list.version,
+                    **validate(serializer, line),
+                )
+            )
+        if len(pending_lists) + len(pending_items) >= chunk_size:
+            yield pending_lists, pending_items
+            pending_lists, pending_items = [], []
+    if pending_lists or pending_items:
+        yield pending_lists, pending_items
+
+
+@serialized_write
+def write_chunk(chunk: Chunk) -> None:
+    shopping_lists, items = chunk
+    with transaction.atomic():
+        ShoppingList.objects.bulk_create(shopping_lists)
+        Item.objects.bulk_create(items)
+
+
+@serialized_write
+def delete_lists(pks: List[int]) -> None:
+    ShoppingList.objects.filter(pk__in=pks).delete()
+
+
+def import_lists(
+    user, records: Iterable[Record], chunk_size: int = CHUNK_SIZE
+) -> ImportResult:
+    """
+    Create the lists and items of ``records`` for ``user``, written
+    ``chunk_size`` at a time in a single transaction; the first invalid row
+    raises ``ImportFailed`` and rolls back the whole import.
+    """
+    result = ImportResult()
+    with transaction.atomic():
+        for shopping_lists, items in build_chunks(user, records, chunk_size):
+            write_chunk((shopping_lists, items))
+            result.lists += len(shopping_lists)
+            result.items += len(items)
+        if result.items:
+            transaction.on_commit(lambda: forget_index(user.pk))
+    return result
+
+
+def import_upload(
+    user, upload: IO[bytes], file_format: str, chunk_size: int = CHUNK_SIZE
+) -> ImportResult:
+    """
+    Import an uploaded file for ``user`` without holding the database for
+    the whole import: every chunk is committed as a write of its own, so
+    other writes queue up behind one chunk at most.
+
+    The file is validated in a first pass that writes nothing, so an invalid
+    row still imports nothing. If writing a chunk fails, the lists written
+    so far are deleted again.
+    """
+    for _ in build_chunks(user, read_records(upload, file_format), chunk_size):
+        pass
+    upload.seek(0)
+
+    result = ImportResult()
+    created: List[int] = []
+    try:
+        for chunk in build_chunks(user, read_records(upload, file_format), chunk_size):
+            write_chunk(chunk)
+            shopping_lists, items = chunk
+            created.extend(shopping_list.pk for shopping_list in shopping_lists)
+            result.lists += len(shopping_lists)
+            result.items += len(items)
+    except Exception:
+        if created:
+            delete_lists(created)
+        raise
+    finally:
+        if result.items:
+            forget_index(user.pk)
+    return result
@@ -2,7 +2,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
 
-from .views import ItemViewSet, ShoppingListViewSet
+from .views import ItemViewSet, ShoppingListViewSet, shopping_list_events
 
 router = DefaultRouter()
 router.register(r"", ShoppingListViewSet, basename="shoppinglist")
@@ -13,6 +13,7 @@ shopping_list_router.register(r"item", ItemViewSet, basename="shoppinglist-item"
 app_name = "shoppinglist"
 
 urlpatterns = [
+    path("<int:pk>/events/", shopping_list_events, name="shoppinglist-events"),
     path("", include(router.urls)),
     path("", include(shopping_list_router.urls)),
 ]
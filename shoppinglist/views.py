@@ -1,33 +1,465 @@
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
 from decouple import config
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.db.models import Q, QuerySet
+from django.core.handlers.asgi import ASGIRequest
+from django.core.mail import send_mail, send_mass_mail
+from django.db import router, transaction
+from django.db.models import Count, Prefetch, Q, QuerySet
+from django.http import (
+    HttpRequest,
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.http.response import HttpResponseBase
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import ModelViewSet
 
-from .mixins import ShoppingItemMixin
-from .models import Item, ShoppingList
-from .permissions import IsOwnerOrSharedUser
-from .serializers import ItemSerializer, ShoppingListSerializer
+from .autocomplete import ProductChanges, forget_indexes, suggest
+from .constants import ItemCategory, ShoppingListAccess
+from .events import format_event, get_broker, publish_event, shopping_list_channel
+from .mixins import (
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+    ShoppingItemMixin,
+    SparseFieldsetMixin,
+)
+from .models import Item, ItemTombstone, ShoppingList
+from .pagination import ItemPagination, ShoppingListPagination
+from .permissions import IsOwnerOrSharedUser, get_shopping_list_access
+from .search import search_items
+from .serializers import (
+    ItemBatchOperationSerializer,
+    ItemBatchSerializer,
+    ItemListQuerySerializer,
+    ItemSearchQuerySerializer,
+    ItemSearchResultSerializer,
+    ItemSerializer,
+    ItemStateTransitionSerializer,
+    ItemSyncSerializer,
+    ProductSuggestionQuerySerializer,
+    ProductSuggestionSerializer,
+    ShoppingListChangesQuerySerializer,
+    ShoppingListSerializer,
+    ShoppingListShareSerializer,
+    TransferImportSerializer,
+    TransferQuerySerializer,
+)
+from .sync import apply_operations, check_cursor, collect_changes
+from .transfer import (
+    CONTENT_TYPES,
+    ImportFailed,
+    export_lists,
+    import_upload,
+    stream_async,
+)
+from .writer import serialized_write
 
 
-class ShoppingListViewSet(ModelViewSet):
+class ShoppingListViewSet(
+    ReplicaReadMixin, ConditionalGetMixin, SparseFieldsetMixin, ModelViewSet
+):
     permission_classes = [IsOwnerOrSharedUser]
     queryset = ShoppingList.objects.all()
     serializer_class = ShoppingListSerializer
+    pagination_class = ShoppingListPagination
+    expandable_fields = ShoppingListSerializer.expandable_fields
+
+    item_stats_fields = {"category_counts", "shared_with_count"}
+    # Serializer fields stored under another model field name.
+    field_sources = {"completed_items_count": "completed_count"}
 
     def get_queryset(self) -> QuerySet[ShoppingList]:
         user = self.request.user
-        if user.is_authenticated:
-            return ShoppingList.objects.prefetch_related("items").filter(
-                Q(user=user) | Q(shared_with=user)
+        if not user.is_authenticated:
+            return ShoppingList.objects.none()
+
+        queryset = ShoppingList.objects.accessible_to(user)
+        if self.action == "changes":
+            return queryset
+
+        requested_fields = self.get_requested_fields()
+
+        if requested_fields is None:
+            queryset = queryset.with_item_stats().prefetch_related("shared_with")
+        else:
+            model_fields = {
+                self.field_sources.get(name, name) for name in requested_fields
+            }
+            # "user" is always loaded for the permission check, the timestamps
+            # and version for pagination cursors and ETags.
+            queryset = queryset.only(
+                "id",
+                "user",
+                "created",
+                "updated",
+                "version",
+                *(
+                    field.name
+                    for field in ShoppingList._meta.concrete_fields
+                    if field.name in model_fields
+                ),
+            )
+            if requested_fields & self.item_stats_fields:
+                queryset = queryset.with_item_stats()
+            if "shared_with" in requested_fields:
+                queryset = queryset.prefetch_related("shared_with")
+
+        if "items" in self.get_expanded_fields():
+            item_fields = ItemSerializer.Meta.fields
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "items",
+                    queryset=Item.objects.only(
+                        "shopping_list", "created", *item_fields
+                    ),
+                )
+            )
+
+        return queryset
+
+    def list(self, request: Request, *args: str | int, **kwargs: str | int):
+        user = request.user
+        if not user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+
+        # Every change to a list bumps its version, so a digest of the visible
+        # lists with their versions stands in for the payload. Aggregates of
+        # the versions would collide when one list is swapped for another.
+        # The digest covers every visible list, also on paginated requests:
+        # reading (pk, version) of all of them is far cheaper than rendering
+        # a page. There is no Last-Modified, as no timestamp of the remaining
+        # lists moves when a list is deleted, unshared or left.
+        digest = hashlib.blake2b(digest_size=16)
+        for pk, version in (
+            ShoppingList.objects.accessible_to(user)
+            .order_by("pk")
+            .values_list("pk", "version")
+        ):
+            digest.update(f"{pk}:{version};".encode())
+        version_key = f"lists-{digest.hexdigest()}"
+        not_modified = self.get_not_modified_response(version_key, None)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        return self.set_validators(response, version_key, None)
+
+    def retrieve(self, request: Request, *args: str | int, **kwargs: str | int):
+        if request.user.is_authenticated and self.is_conditional_request():
+            # Answer an unchanged list from its version alone, without loading
+            # the list's items.
+            try:
+                state = (
+                    ShoppingList.objects.accessible_to(request.user)
+                    .filter(pk=kwargs["pk"])
+                    .values("version", "updated")
+                    .first()
+                )
+            except ValueError:
+                state = None
+            if state is not None:
+                not_modified = self.get_not_modified_response(
+                    f"list-{kwargs['pk']}-{state['version']}", state["updated"]
+                )
+                if not_modified is not None:
+                    return not_modified
+
+        instance: ShoppingList = self.get_object()
+        response = Response(self.get_serializer(instance).data)
+        return self.set_validators(
+            response, f"list-{instance.pk}-{instance.version}", instance.updated
+        )
+
+    @serialized_write
+    def perform_create(self, serializer: ShoppingListSerializer) -> None:
+        super().perform_create(serializer)
+
+    @serialized_write
+    def perform_update(self, serializer: ShoppingListSerializer) -> None:
+        changes_access = {"user", "shared_with"} & set(serializer.validated_data)
+        with transaction.atomic():
+            if changes_access:
+                had_access = self.get_users_with_access(serializer.instance)
+            shopping_list: ShoppingList = serializer.save()
+            version = shopping_list.bump_version()
+            publish_event(
+                shopping_list.pk,
+                "list.updated",
+                version,
+                name=shopping_list.name,
+                description=shopping_list.description,
             )
-        return ShoppingList.objects.none()
+            if changes_access:
+                has_access = self.get_users_with_access(shopping_list)
+                # Ends the event streams of the users who lost access.
+                for user_pk in sorted(had_access - has_access):
+                    publish_event(
+                        shopping_list.pk, "list.unshared", version, user=user_pk
+                    )
+                changed = had_access ^ has_access
+                transaction.on_commit(lambda: forget_indexes(changed))
+
+    @staticmethod
+    def get_users_with_access(shopping_list: ShoppingList) -> Set[int]:
+        users = set(shopping_list.shared_with.values_list("pk", flat=True))
+        if shopping_list.user_id is not None:
+            users.add(shopping_list.user_id)
+        return users
+
+    @serialized_write
+    def perform_destroy(self, instance: ShoppingList) -> None:
+        pk, version = instance.pk, instance.version
+        # The event is published once the delete commits.
+        with transaction.atomic():
+            instance.delete()
+            publish_event(pk, "list.deleted", version)
+
+    @action(detail=True, methods=["get"])
+    def changes(self, request: Request, pk: int | None = None) -> Response:
+        """
+        Delta sync: items created, updated or deleted after the ``since``
+        cursor, together with the cursor to send next time.
+
+        The cursor is the list's version, so the response grows with the
+        number of changes rather than with the size of the list. Cursors
+        older than the purged tombstones get 410 Gone and the client has to
+        download the whole list again.
+        """
+        query_serializer = ShoppingListChangesQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        since = query_serializer.validated_data.get("since")
+
+        shopping_list: ShoppingList = self.get_object()
+        return Response(collect_changes(shopping_list, since))
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def autocomplete(self, request: Request) -> Response:
+        """
+        Products the caller has put on their lists before that start with
+        ``q``, most frequently and recently used first, with the category,
+        unit and quantity they usually come with.
+        """
+        query_serializer = ProductSuggestionQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        suggestions = suggest(
+            request.user,
+            query_serializer.validated_data["q"],
+            query_serializer.validated_data["limit"],
+        )
+        return Response(
+            {"results": ProductSuggestionSerializer(suggestions, many=True).data}
+        )
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def search(self, request: Request) -> Response:
+        """
+        Items matching every word of ``q`` in their product or note, across
+        all lists the caller owns or has been shared, best matches first and
+        each with the id and name of its list.
+        """
+        query_serializer = ItemSearchQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        items = search_items(
+            request.user,
+            query_serializer.validated_data["q"],
+            query_serializer.validated_data["limit"],
+        )
+        return Response({"results": ItemSearchResultSerializer(items, many=True).data})
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """
+        Every list the caller owns with its items, as CSV or JSON lines
+        (``type=jsonl``). The file is streamed while it is read from the
+        database, so memory use does not grow with the account.
+        """
+        query_serializer = TransferQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        file_format = query_serializer.validated_data["type"]
+
+        content = export_lists(
+            request.user, file_format, using=router.db_for_read(ShoppingList)
+        )
+        if isinstance(request._request, ASGIRequest):
+            content = stream_async(content)
+        response = StreamingHttpResponse(
+            content, content_type=CONTENT_TYPES[file_format]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="shopping-lists.{file_format}"'
+        )
+        return response
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[IsAuthenticated],
+        parser_classes=[MultiPartParser],
+    )
+    def import_lists(self, request: Request) -> Response:
+        """
+        Create lists owned by the caller from an uploaded ``file`` in the
+        format of the export. The file is validated row by row first, so an
+        invalid row imports nothing, and then written in chunks that each go
+        through the write queue on their own instead of holding it for the
+        whole import.
+        """
+        serializer = TransferImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            result = import_upload(
+                request.user,
+                serializer.validated_data["file"],
+                serializer.validated_data["type"],
+            )
+        except ImportFailed as error:
+            return Response(
+                {"line": error.line, "errors": error.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {"lists": result.lists, "items": result.items},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="share",
+        permission_classes=[IsAuthenticated],
+    )
+    @serialized_write
+    def share_many(self, request: Request) -> Response:
+        """
+        Share every list in ``lists`` with every user in ``emails``.
+
+        Users are resolved with one ``IN`` query and the new shares are
+        inserted with a single bulk insert; pairs that are already shared, or
+        where the user owns the list, are skipped. Each newly added user gets
+        one email, and all of them are queued together.
+        """
+        serializer = ShoppingListShareSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        list_ids = list(dict.fromkeys(serializer.validated_data["lists"]))
+        emails = list(dict.fromkeys(serializer.validated_data["emails"]))
+
+        if request.user.email in emails:
+            return Response(
+                {"detail": "You cannot share the list with yourself."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        shopping_lists = list(
+            ShoppingList.objects.accessible_to(request.user)
+            .filter(pk__in=list_ids)
+            .only("id", "user_id")
+        )
+        found_ids = {shopping_list.pk for shopping_list in shopping_lists}
+        missing_ids = [pk for pk in list_ids if pk not in found_ids]
+        if missing_ids:
+            return Response(
+                {"detail": "Shopping list not found.", "lists": missing_ids},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        users = list(
+            get_user_model().objects.filter(email__in=emails).only("id", "email")
+        )
+        found_emails = {user.email for user in users}
+        missing_emails = [email for email in emails if email not in found_emails]
+        if missing_emails:
+            return Response(
+                {"detail": "User not found.", "emails": missing_emails},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        Through = ShoppingList.shared_with.through
+        existing = set(
+            Through.objects.filter(
+                shoppinglist_id__in=found_ids,
+                customuser_id__in=[user.pk for user in users],
+            ).values_list("shoppinglist_id", "customuser_id")
+        )
+        new_shares = [
+            (shopping_list, user)
+            for shopping_list in shopping_lists
+            for user in users
+            if user.pk != shopping_list.user_id
+            and (shopping_list.pk, user.pk) not in existing
+        ]
+
+        if new_shares:
+            shared_counts: Dict[str, int] = {}
+            for _, user in new_shares:
+                shared_counts[user.email] = shared_counts.get(user.email, 0) + 1
+            from_email = config("EMAIL_HOST_USER")
+            messages = [
+                (
+                    "Shopping List Shared With You",
+                    (
+                        f"{request.user.email} has shared a shopping list with you."
+                        if count == 1
+                        else f"{request.user.email} has shared {count} shopping lists "
+                        "with you."
+                    ),
+                    from_email,
+                    [email],
+                )
+                for email, count in shared_counts.items()
+            ]
+
+            # The emails are queued in the outbox within the same transaction.
+            with transaction.atomic():
+                # Conflicts are shares added concurrently since the read above.
+                Through.objects.bulk_create(
+                    [
+                        Through(shoppinglist_id=shopping_list.pk, customuser_id=user.pk)
+                        for shopping_list, user in new_shares
+                    ],
+                    ignore_conflicts=True,
+                )
+                changed = ShoppingList.objects.filter(
+                    pk__in={shopping_list.pk for shopping_list, _ in new_shares}
+                )
+                changed.touch()
+                versions = dict(changed.values_list("pk", "version"))
+                for shopping_list, user in new_shares:
+                    publish_event(
+                        shopping_list.pk,
+                        "list.shared",
+                        versions[shopping_list.pk],
+                        user=user.pk,
+                    )
+                send_mass_mail(messages, fail_silently=False)
+                transaction.on_commit(
+                    lambda: forget_indexes(user.pk for _, user in new_shares)
+                )
+
+        return Response(
+            {
+                "detail": "Shopping lists shared successfully.",
+                "shared": len(new_shares),
+                "already_shared": len(existing),
+            }
+        )
 
     @action(detail=True, methods=["put"])
+    @serialized_write
     def share(self, request, pk: int | None = None):
         shopping_list = self.get_object()
         user_to_share_with_email = request.data.get("email")
@@ -55,19 +487,25 @@ class ShoppingListViewSet(ModelViewSet):
                 status=status.HTTP_200_OK,
             )
 
-        shopping_list.shared_with.add(user_to_share_with)
-        shopping_list.save()
-
         subject = "Shopping List Shared With You"
         message = f"{request.user.email} has shared a shopping list with you."
         from_email = config("EMAIL_HOST_USER")
         to_email = [user_to_share_with_email]
 
-        send_mail(subject, message, from_email, to_email, fail_silently=False)
+        # The email is queued in the outbox within the same transaction.
+        with transaction.atomic():
+            shopping_list.shared_with.add(user_to_share_with)
+            version = shopping_list.bump_version()
+            publish_event(
+                shopping_list.pk, "list.shared", version, user=user_to_share_with.pk
+            )
+            transaction.on_commit(lambda: forget_indexes([user_to_share_with.pk]))
+            send_mail(subject, message, from_email, to_email, fail_silently=False)
 
         return Response({"detail": "Shopping list shared successfully."})
 
     @action(detail=True, methods=["patch"], url_path="unshare/(?P<user_pk>[^/.]+)")
+    @serialized_write
     def unshare(self, request: Request, pk: int | None = None, **kwargs: str | int):
         shopping_list = self.get_object()
         user_id_to_unshare = kwargs.get("user_pk")
@@ -84,23 +522,39 @@ class ShoppingListViewSet(ModelViewSet):
                 {"detail": "User not found."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        if user_to_unshare not in shopping_list.shared_with.all():
+        if not shopping_list.shared_with.filter(pk=user_to_unshare.pk).exists():
             return Response(
                 {"detail": "This list is not shared with the specified user."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        shopping_list.shared_with.remove(user_to_unshare)
+        with transaction.atomic():
+            shopping_list.shared_with.remove(user_to_unshare)
+            version = shopping_list.bump_version()
+            publish_event(
+                shopping_list.pk, "list.unshared", version, user=user_to_unshare.pk
+            )
+            transaction.on_commit(lambda: forget_indexes([user_to_unshare.pk]))
         return Response({"detail": "Successfully unshared the shopping list."})
 
+    @serialized_write
     def destroy(self, request: Request, *args: str | int, **kwargs: dict) -> Response:
         shopping_list: ShoppingList = self.get_object()
+        access = get_shopping_list_access(request, shopping_list)
 
-        if shopping_list.user == request.user:
-            return super().destroy(request, *args, **kwargs)
+        if access == ShoppingListAccess.OWNER:
+            self.perform_destroy(shopping_list)
+            return Response(status=status.HTTP_204_NO_CONTENT)
 
-        if request.user in shopping_list.shared_with.all():
-            shopping_list.shared_with.remove(request.user)
+        if access == ShoppingListAccess.SHARED:
+            with transaction.atomic():
+                shopping_list.shared_with.remove(request.user)
+                version = shopping_list.bump_version()
+                publish_event(
+                    shopping_list.pk, "list.unshared", version, user=request.user.pk
+                )
+                user_id = request.user.pk
+                transaction.on_commit(lambda: forget_indexes([user_id]))
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         return Response(
@@ -109,20 +563,191 @@ class ShoppingListViewSet(ModelViewSet):
         )
 
 
-class ItemViewSet(ShoppingItemMixin, ModelViewSet):
+class ItemViewSet(
+    ReplicaReadMixin, ConditionalGetMixin, ShoppingItemMixin, ModelViewSet
+):
     """
     API viewset for CRUD operations on a shopping list item.
     """
 
     queryset = Item.objects.all()
     serializer_class: type[ItemSerializer] = ItemSerializer
+    pagination_class = ItemPagination
+
+    # Keyset ordering of each sort key, all backed by an index on the list.
+    sort_orderings = {
+        None: ItemPagination.ordering,
+        "category": ("category", "completed", "created", "id"),
+        "created": ("created", "id"),
+        "product": ("product", "id"),
+    }
+    _list_query: Optional[Dict[str, Any]] = None
 
     def get_queryset(self) -> QuerySet[Item]:
-        return Item.objects.filter(shopping_list=self.get_shopping_list())
+        if self.action == "list":
+            ordering, descending = self.get_sort_ordering()
+            items = self.filter_items(
+                Item.objects.filter(shopping_list=self.get_shopping_list())
+            )
+            return items.order_by(
+                *(f"-{field}" if descending else field for field in ordering)
+            )
+        return self.get_accessible_items()
+
+    def get_list_query(self) -> Dict[str, Any]:
+        if self._list_query is None:
+            serializer = ItemListQuerySerializer(data=self.request.query_params)
+            serializer.is_valid(raise_exception=True)
+            self._list_query = serializer.validated_data
+        return self._list_query
+
+    def get_sort_ordering(self) -> Tuple[Tuple[str, ...], bool]:
+        sort = self.get_list_query().get("sort")
+        if sort is None:
+            return self.sort_orderings[None], False
+        return self.sort_orderings[sort.lstrip("-")], sort.startswith("-")
+
+    def filter_items(
+        self, items: QuerySet[Item], include_category: bool = True
+    ) -> QuerySet[Item]:
+        query = self.get_list_query()
+        if include_category and "category" in query:
+            items = items.filter(category__in=query["category"])
+        if "unit" in query:
+            units = set(query["unit"])
+            condition = Q(unit__in=units - {ItemListQuerySerializer.NO_UNIT})
+            if ItemListQuerySerializer.NO_UNIT in units:
+                condition |= Q(unit__isnull=True)
+            items = items.filter(condition)
+        if query["completed"] is not None:
+            items = items.filter(completed=query["completed"])
+        return items
+
+    def get_facets(self) -> Dict[str, Any]:
+        """
+        Item and completed counts of every category in one grouped query,
+        over the items matching all filters but the category one.
+        """
+        rows = (
+            self.filter_items(
+                Item.objects.filter(shopping_list=self.get_shopping_list()),
+                include_category=False,
+            )
+            .order_by()
+            .values("category")
+            .annotate(
+                count=Count("id"), completed=Count("id", filter=Q(completed=True))
+            )
+        )
+        counts = {row["category"]: row for row in rows}
+        return {
+            "category": [
+                {
+                    "value": category,
+                    "count": counts.get(category, {}).get("count", 0),
+                    "completed": counts.get(category, {}).get("completed", 0),
+                }
+                for category in ItemCategory.values
+            ]
+        }
+
+    def get_object(self) -> Item:
+        item: Item = super().get_object()
+        self.remember_shopping_list(item)
+        return item
+
+    def list(self, request: Request, *args: str | int, **kwargs: str | int):
+        """
+        Items of the list, optionally filtered by ``category``, ``unit`` and
+        ``completed`` and sorted by ``sort``. With ``facets=true`` the items
+        come under ``results`` next to per-category ``facets``.
+        """
+        query = self.get_list_query()
+        shopping_list = self.get_shopping_list()
+        version_key = f"items-{shopping_list.pk}-{shopping_list.version}"
+        not_modified = self.get_not_modified_response(
+            version_key, shopping_list.updated
+        )
+        if not_modified is not None:
+            return not_modified
+
+        paginator = self.paginator
+        paginator.ordering, paginator.descending = self.get_sort_ordering()
+        response = super().list(request, *args, **kwargs)
+        if query["facets"]:
+            data = (
+                response.data
+                if isinstance(response.data, dict)
+                else {"results": response.data}
+            )
+            response.data = {**data, "facets": self.get_facets()}
+        return self.set_validators(response, version_key, shopping_list.updated)
+
+    def retrieve(self, request: Request, *args: str | int, **kwargs: str | int):
+        item = self.get_object()
+        version_key = f"item-{item.pk}-{item.updated.isoformat()}"
+        not_modified = self.get_not_modified_response(version_key, item.updated)
+        if not_modified is not None:
+            return not_modified
 
+        response = Response(self.get_serializer(item).data)
+        return self.set_validators(response, version_key, item.updated)
+
+    def touch_shopping_list(self) -> int:
+        return self.get_shopping_list().bump_version()
+
+    def refresh_completed(self) -> None:
+        """Re-derive the list's ``completed`` flag after its items changed."""
+        ShoppingList.objects.filter(pk=self.get_shopping_list().pk).refresh_completed()
+
+    @serialized_write
     def perform_create(self, serializer: ItemSerializer):
         shopping_list: ShoppingList = self.get_shopping_list()
-        serializer.save(shopping_list=shopping_list)
+        with transaction.atomic():
+            version = self.touch_shopping_list()
+            item = serializer.save(shopping_list=shopping_list, changed_version=version)
+            self.refresh_completed()
+            publish_event(
+                shopping_list.pk, "item.created", version, item=serializer.data
+            )
+            changes = ProductChanges()
+            changes.created(item)
+            changes.apply_on_commit(shopping_list.pk)
+
+    @serialized_write
+    def perform_update(self, serializer: ItemSerializer):
+        serializer.instance.stamp_fields(serializer.validated_data, timezone.now())
+        changes = ProductChanges()
+        changes.changing(serializer.instance, serializer.validated_data)
+        with transaction.atomic():
+            version = self.touch_shopping_list()
+            serializer.save(changed_version=version)
+            self.refresh_completed()
+            publish_event(
+                self.get_shopping_list().pk,
+                "item.updated",
+                version,
+                item=serializer.data,
+            )
+            changes.apply_on_commit(self.get_shopping_list().pk)
+
+    @serialized_write
+    def perform_destroy(self, instance: Item):
+        with transaction.atomic():
+            version = self.touch_shopping_list()
+            ItemTombstone.objects.create(
+                shopping_list_id=instance.shopping_list_id,
+                item_id=instance.pk,
+                version=version,
+            )
+            publish_event(
+                instance.shopping_list_id,
+                "item.deleted",
+                version,
+                item={"id": instance.pk},
+            )
+            instance.delete()
+            self.refresh_completed()
 
     def destroy(self, request: Request, *args: str | int, **kwargs: dict):
         instance: Item = self.get_object()
@@ -130,3 +755,274 @@ class ItemViewSet(ShoppingItemMixin, ModelViewSet):
         return Response(
             {"detail": "Item deleted successfully."}, status=status.HTTP_204_NO_CONTENT
         )
+
+    @action(detail=False, methods=["post"])
+    @serialized_write
+    def batch(self, request: Request, **kwargs: str) -> Response:
+        """
+        Apply a mixed list of create/update/delete operations atomically.
+
+        Every operation is validated before anything is written; if any of
+        them fails, nothing is applied and the errors are returned in the
+        order of the operations. Writes go through one bulk_create, one
+        bulk_update and one DELETE.
+        """
+        batch_serializer = ItemBatchSerializer(data=request.data)
+        batch_serializer.is_valid(raise_exception=True)
+        operations = batch_serializer.validated_data["operations"]
+
+        shopping_list = self.get_shopping_list()
+        items = Item.objects.filter(shopping_list=shopping_list).in_bulk(
+            [operation["id"] for operation in operations if "id" in operation]
+        )
+
+        errors: list[dict] = []
+        targets: list[Item | int] = []
+        to_create: list[Item] = []
+        to_update: list[Item] = []
+        to_delete: list[int] = []
+        update_fields: set[str] = set()
+        seen_ids: set[int] = set()
+        now = timezone.now()
+        changes = ProductChanges()
+
+        for operation in operations:
+            op, item_id = operation["op"], operation.get("id")
+
+            if item_id is not None:
+                if item_id in seen_ids:
+                    errors.append({"id": ["Duplicate operation for this item."]})
+                    continue
+                seen_ids.add(item_id)
+                if item_id not in items:
+                    errors.append({"id": ["Not found."]})
+                    continue
+
+            if op == ItemBatchOperationSerializer.DELETE:
+                to_delete.append(item_id)
+                targets.append(item_id)
+                errors.append({})
+                continue
+
+            serializer = ItemSerializer(
+                items.get(item_id),
+                data=operation["data"],
+                partial=op == ItemBatchOperationSerializer.UPDATE,
+            )
+            if not serializer.is_valid():
+                errors.append(serializer.errors)
+                continue
+            errors.append({})
+
+            if op == ItemBatchOperationSerializer.CREATE:
+                item = Item(shopping_list=shopping_list, **serializer.validated_data)
+                to_create.append(item)
+                changes.created(item)
+            else:
+                item = items[item_id]
+                changes.changing(item, serializer.validated_data)
+                for field, value in serializer.validated_data.items():
+                    setattr(item, field, value)
+                item.stamp_fields(serializer.validated_data, now)
+                update_fields.update(serializer.validated_data)
+                to_update.append(item)
+            targets.append(item)
+
+        if any(errors):
+            return Response({"operations": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            version = self.touch_shopping_list()
+            for item in to_create:
+                item.changed_version = version
+            Item.objects.bulk_create(to_create)
+            if to_update:
+                # bulk_update() skips auto_now, so bump the timestamp by hand.
+                for item in to_update:
+                    item.updated = now
+                    item.changed_version = version
+                Item.objects.bulk_update(
+                    to_update,
+                    [*update_fields, "updated", "changed_version", "field_clock"],
+                )
+            if to_delete:
+                ItemTombstone.objects.bulk_create(
+                    ItemTombstone(
+                        shopping_list=shopping_list, item_id=item_id, version=version
+                    )
+                    for item_id in to_delete
+                )
+                Item.objects.filter(pk__in=to_delete).delete()
+            self.refresh_completed()
+            publish_event(shopping_list.pk, "list.changed", version)
+            changes.apply_on_commit(shopping_list.pk)
+
+        results = []
+        for operation, target in zip(operations, targets):
+            if isinstance(target, Item):
+                created = operation["op"] == ItemBatchOperationSerializer.CREATE
+                results.append(
+                    {
+                        "op": operation["op"],
+                        "status": (
+                            status.HTTP_201_CREATED if created else status.HTTP_200_OK
+                        ),
+                        "item": ItemSerializer(target).data,
+                    }
+                )
+            else:
+                results.append(
+                    {
+                        "op": operation["op"],
+                        "status": status.HTTP_204_NO_CONTENT,
+                        "id": target,
+                    }
+                )
+
+        return Response({"results": results})
+
+    @action(detail=False, methods=["post"])
+    @serialized_write
+    def sync(self, request: Request, **kwargs: str) -> Response:
+        """
+        Apply an offline operation log in one transaction and return the
+        result of every operation together with the changes since the
+        client's ``since`` cursor, which include the effect of the log.
+
+        Replaying a log is safe: operations are identified by their
+        ``op_id`` and applied once. See ``sync.apply_operations`` for how
+        conflicting edits are resolved.
+        """
+        serializer = ItemSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        since = serializer.validated_data.get("since")
+        operations = serializer.validated_data["operations"]
+
+        shopping_list = self.get_shopping_list()
+        check_cursor(shopping_list, since)
+        results = []
+        if operations:
+            with transaction.atomic():
+                version = self.touch_shopping_list()
+                changes = ProductChanges()
+                results = apply_operations(shopping_list, operations, version, changes)
+                self.refresh_completed()
+                publish_event(shopping_list.pk, "list.changed", version)
+                changes.apply_on_commit(shopping_list.pk)
+
+        return Response({"results": results, **collect_changes(shopping_list, since)})
+
+    @action(detail=False, methods=["post"])
+    def complete(self, request: Request, **kwargs: str) -> Response:
+        return self.set_completed(request, completed=True)
+
+    @action(detail=False, methods=["post"])
+    def uncomplete(self, request: Request, **kwargs: str) -> Response:
+        return self.set_completed(request, completed=False)
+
+    @serialized_write
+    def set_completed(self, request: Request, completed: bool) -> Response:
+        """
+        Flip the selected items with one UPDATE and re-derive the list's
+        ``completed`` flag in the same transaction.
+        """
+        serializer = ItemStateTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+
+        shopping_list = self.get_shopping_list()
+        items = Item.objects.filter(shopping_list=shopping_list).exclude(
+            completed=completed
+        )
+        if "category" in filters:
+            items = items.filter(category=filters["category"])
+        if "ids" in filters:
+            items = items.filter(pk__in=filters["ids"])
+
+        with transaction.atomic():
+            version = self.touch_shopping_list()
+            updated = items.set_completed(completed, version)
+            self.refresh_completed()
+            publish_event(shopping_list.pk, "list.changed", version)
+
+        shopping_list.refresh_from_db(fields=["completed"])
+        return Response(
+            {"updated": updated, "shopping_list_completed": shopping_list.completed}
+        )
+
+
+def get_event_stream_version(request: HttpRequest, pk: int) -> Optional[int]:
+    """
+    Authenticate the request like the API views do and return the version of
+    the list, or ``None`` when the caller has no access to it.
+    """
+    drf_request = Request(
+        request,
+        authenticators=[
+            authentication()
+            for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ],
+    )
+    try:
+        user = drf_request.user
+    except APIException:
+        return None
+    if not user.is_authenticated:
+        return None
+    request.user = user
+    return (
+        ShoppingList.objects.accessible_to(user)
+        .filter(pk=pk)
+        .values_list("version", flat=True)
+        .first()
+    )
+
+
+async def shopping_list_events(request: HttpRequest, pk: int) -> HttpResponseBase:
+    """
+    Server-Sent Events stream of the changes of one shopping list.
+
+    The stream opens with a ``ready`` event carrying the current version.
+    Every following event carries the version after the change, so a client
+    that reconnects or notices a gap catches up through delta sync. The
+    stream ends when the list is deleted or the caller loses access to it.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Event streams are only served by the ASGI application."},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    version = await sync_to_async(get_event_stream_version)(request, pk)
+    if version is None:
+        return JsonResponse({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    user_pk = request.user.pk
+    heartbeat = settings.SHOPPING_LIST_EVENTS["HEARTBEAT"]
+    channel = shopping_list_channel(pk)
+
+    async def stream() -> AsyncIterator[str]:
+        async with get_broker().subscribe(channel) as subscription:
+            yield format_event({"type": "ready", "list": pk, "version": version})
+            while True:
+                try:
+                    event = await subscription.get(timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    return
+                if event["type"] == "list.deleted" or (
+                    event["type"] == "list.unshared" and event["user"] == user_pk
+                ):
+                    yield format_event(event)
+                    return
+                if event["version"] > version:
+                    yield format_event(event)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
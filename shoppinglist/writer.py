@@ -0,0 +1,134 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import lru_cache, partial, wraps
+from typing import Any, Callable, List, Optional, TypeVar
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class WriteJob:
+    func: Callable[[], Any]
+    future: Future = field(default_factory=Future)
+
+
+class WriteQueue:
+    """
+    Funnel the writes of a process through one writer thread.
+
+    SQLite allows a single writer at a time, so request threads writing
+    concurrently only queue up on the database lock. Here they hand their
+    write to the writer thread and wait for its result instead. The writer
+    takes whatever has queued up, at most ``max_batch`` jobs, waiting up to
+    ``max_delay`` seconds for more, and runs them in one transaction: each
+    job in a savepoint of its own, so a failing job is rolled back alone,
+    and a single commit for all of them.
+
+    A job's result is only handed back once its batch has committed, and
+    ``transaction.on_commit`` callbacks registered by jobs run in the writer
+    thread after that commit.
+    """
+
+    def __init__(self, max_batch: int, max_delay: float) -> None:
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._jobs: "queue.SimpleQueue[WriteJob]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, func: Callable[[], Any]) -> Future:
+        job = WriteJob(func)
+        self._jobs.put(job)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="write-queue", daemon=True
+                )
+                self._thread.start()
+        return job.future
+
+    def run(self, func: Callable[[], Any]) -> Any:
+        """Run ``func`` on the writer thread and return its result."""
+        return self.submit(func).result()
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._next_batch()
+            try:
+                self._commit(jobs)
+            except Exception as exc:
+                logger.exception("Write queue batch failed.")
+                for job in jobs:
+                    if not job.future.done():
+                        job.future.set_exception(exc)
+
+    def _next_batch(self) -> List[WriteJob]:
+        jobs = [self._jobs.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(jobs) < self.max_batch:
+            try:
+                jobs.append(self._jobs.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+        return jobs
+
+    def _commit(self, jobs: List[WriteJob]) -> None:
+        close_old_connections()
+        outcomes = []
+        try:
+            with transaction.atomic():
+                for job in jobs:
+                    try:
+                        with transaction.atomic():
+                            outcomes.append((job, job.func(), None))
+                    except Exception as exc:
+                        outcomes.append((job, None, exc))
+        except Exception as exc:
+            for job in jobs:
+                job.future.set_exception(exc)
+            return
+
+        for job, result, exc in outcomes:
+            if exc is None:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(exc)
+
+
+@lru_cache(maxsize=None)
+def get_write_queue() -> WriteQueue:
+    return WriteQueue(
+        max_batch=settings.WRITE_QUEUE["MAX_BATCH"],
+        max_delay=settings.WRITE_QUEUE["MAX_DELAY"],
+    )
+
+
+def serialized_write(method: F) -> F:
+    """
+    Run the decorated view method on the writer thread when
+    ``WRITE_QUEUE["ENABLED"]`` is set.
+
+    Calls made inside a transaction run in place: they already hold the
+    connection of their caller, and jobs of the writer itself would wait
+    for their own batch.
+    """
+
+    @wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if (
+            not settings.WRITE_QUEUE["ENABLED"]
+            or transaction.get_connection().in_atomic_block
+        ):
+            return method(*args, **kwargs)
+        return get_write_queue().run(partial(method, *args, **kwargs))
+
+    return wrapper  # type: ignore[return-value]
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .tokens import TokenExpired, decode_token, deny_list
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates ``Authorization: Bearer <token>`` headers carrying tokens
+    from ``users.tokens.issue_token``.
+
+    The signature and expiry are checked in memory and the user is built from
+    the token claims with every other field deferred, so an authenticated
+    request normally does not touch the database. Fields outside the claims
+    are loaded lazily on first access.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed("Invalid token header.")
+
+        try:
+            token = decode_token(auth[1].decode())
+        except TokenExpired:
+            raise AuthenticationFailed("Token has expired.")
+        except (signing.BadSignature, UnicodeError):
+            raise AuthenticationFailed("Invalid token.")
+
+        if token in deny_list:
+            raise AuthenticationFailed("Token has been revoked.")
+
+        user = get_user_model().from_db(
+            DEFAULT_DB_ALIAS,
+            ["id", "email", "is_active"],
+            [token.user_id, token.email, True],
+        )
+        return user, token
+
+    def authenticate_header(self, request):
+        return self.keyword
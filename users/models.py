@@ -49,3 +49,21 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+
+class RevokedToken(models.Model):
+    """
+    Deny-list entry for stateless signed tokens.
+
+    Either a single token is revoked through its ``jti`` or every token of
+    ``user_id`` issued up to ``issued_before``. Rows are only needed until
+    ``expires_at``, after which the revoked tokens are expired anyway.
+    """
+
+    jti = models.CharField(max_length=32, unique=True, null=True, blank=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    issued_before = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti or f"user {self.user_id}"
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from .tokens import revoke_user_tokens
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def revoke_tokens_on_credentials_change(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """
+    Signed tokens are trusted without loading the user, so deactivating a
+    user or changing their password has to revoke the tokens issued so far.
+    """
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not {"is_active", "password"} & set(update_fields):
+        return
+    previous = (
+        sender._default_manager.filter(pk=instance.pk)
+        .values("is_active", "password")
+        .first()
+    )
+    if previous is None:
+        return
+    deactivated = previous["is_active"] and not instance.is_active
+    if deactivated or previous["password"] != instance.password:
+        revoke_user_tokens(instance.pk)
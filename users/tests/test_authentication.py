@@ -0,0 +1,204 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from freezegun import freeze_time
+from pytest_django.fixtures import SettingsWrapper
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from conftest import create_shopping_list
+from users.authentication import SignedTokenAuthentication
+from users.models import CustomUser, RevokedToken
+from users.tokens import deny_list, issue_token
+
+
+@pytest.fixture
+def signed_token_client(authenticated_user: CustomUser) -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {issue_token(authenticated_user)}")
+    return client
+
+
+@pytest.mark.django_db
+class TestSignedTokenAuthentication:
+    def test_signed_token_authenticates_without_queries(
+        self, signed_token_client: APIClient, authenticated_user: CustomUser
+    ) -> None:
+        shopping_list = create_shopping_list(user=authenticated_user)
+        deny_list.invalidate()
+        url = f"/shoppinglist/{shopping_list.pk}/"
+        signed_token_client.get(url, {"fields": "name"})
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = signed_token_client.get(url, {"fields": "name"})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["id"] == shopping_list.pk
+        assert len(context) == 1, [query["sql"] for query in context]
+
+    def test_deferred_user_fields_are_loaded_on_access(
+        self, authenticated_user: CustomUser
+    ) -> None:
+        authenticated_user.first_name = "Test"
+        authenticated_user.save()
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {issue_token(authenticated_user)}"
+        )
+
+        user, _ = SignedTokenAuthentication().authenticate(request)
+
+        assert user.get_deferred_fields() >= {"first_name", "password"}
+        assert user.first_name == "Test"
+        assert user.check_password("testpassword")
+
+    def test_tampered_token_is_rejected(self, authenticated_user: CustomUser) -> None:
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {issue_token(authenticated_user)}x"
+        )
+
+        response = client.get("/shoppinglist/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.data["detail"] == "Invalid token."
+
+    def test_expired_token_is_rejected(self, authenticated_user: CustomUser) -> None:
+        client = APIClient()
+        with freeze_time("2023-01-01 12:00:00"):
+            client.credentials(
+                HTTP_AUTHORIZATION=f"Bearer {issue_token(authenticated_user)}"
+            )
+
+        response = client.get("/shoppinglist/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.data["detail"] == "Token has expired."
+
+    def test_rotated_key_still_verifies(
+        self, settings: SettingsWrapper, authenticated_user: CustomUser
+    ) -> None:
+        settings.SIGNED_TOKEN = {**settings.SIGNED_TOKEN, "KEYS": ["old-key"]}
+        token = issue_token(authenticated_user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        settings.SIGNED_TOKEN = {
+            **settings.SIGNED_TOKEN,
+            "KEYS": ["new-key", "old-key"],
+        }
+        assert client.get("/shoppinglist/").status_code == status.HTTP_200_OK
+
+        settings.SIGNED_TOKEN = {**settings.SIGNED_TOKEN, "KEYS": ["new-key"]}
+        assert client.get("/shoppinglist/").status_code == 401
+
+    def test_logout_revokes_signed_token(self, signed_token_client: APIClient) -> None:
+        response = signed_token_client.post("/auth/token/logout/")
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT, response.content
+        assert RevokedToken.objects.count() == 1
+
+        response = signed_token_client.get("/shoppinglist/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.data["detail"] == "Token has been revoked."
+
+    def test_deleting_account_revokes_signed_tokens(
+        self,
+        signed_token_client: APIClient,
+        authenticated_user_password: str,
+    ) -> None:
+        response = signed_token_client.delete(
+            "/auth/users/me/", data={"current_password": authenticated_user_password}
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT, response.content
+
+        response = signed_token_client.get("/shoppinglist/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_deactivating_user_revokes_signed_tokens(
+        self, signed_token_client: APIClient, authenticated_user: CustomUser
+    ) -> None:
+        authenticated_user.is_active = False
+        authenticated_user.save()
+
+        response = signed_token_client.get("/shoppinglist/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.data["detail"] == "Token has been revoked."
+
+    def test_password_change_revokes_signed_tokens(
+        self, signed_token_client: APIClient, authenticated_user: CustomUser
+    ) -> None:
+        authenticated_user.set_password("new-password-123")
+        authenticated_user.save()
+
+        response = signed_token_client.get("/shoppinglist/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {issue_token(authenticated_user)}"
+        )
+        assert client.get("/shoppinglist/").status_code == status.HTTP_200_OK
+
+    def test_other_user_changes_keep_signed_tokens(
+        self, signed_token_client: APIClient, authenticated_user: CustomUser
+    ) -> None:
+        authenticated_user.first_name = "Test"
+        authenticated_user.save()
+        authenticated_user.save(update_fields=["last_login"])
+
+        assert not RevokedToken.objects.exists()
+        response = signed_token_client.get("/shoppinglist/")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_expired_revocations_are_not_loaded(
+        self, authenticated_user: CustomUser
+    ) -> None:
+        RevokedToken.objects.create(
+            user_id=authenticated_user.pk,
+            issued_before=timezone.now() + timedelta(days=1),
+            expires_at=timezone.now() - timedelta(minutes=1),
+        )
+        deny_list.invalidate()
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {issue_token(authenticated_user)}"
+        )
+
+        assert client.get("/shoppinglist/").status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestSignedTokenLogin:
+    def test_login_issues_signed_token_when_enabled(
+        self,
+        settings: SettingsWrapper,
+        not_authenticated_api_client: APIClient,
+        authenticated_user: CustomUser,
+        authenticated_user_password: str,
+    ) -> None:
+        settings.SIGNED_TOKEN = {**settings.SIGNED_TOKEN, "ISSUE_ON_LOGIN": True}
+
+        response = not_authenticated_api_client.post(
+            "/auth/token/login/",
+            {
+                "email": authenticated_user.email,
+                "password": authenticated_user_password,
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert not Token.objects.exists()
+        not_authenticated_api_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {response.data['auth_token']}"
+        )
+        assert (
+            not_authenticated_api_client.get("/shoppinglist/").status_code
+            == status.HTTP_200_OK
+        )
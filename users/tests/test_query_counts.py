@@ -0,0 +1,105 @@
+from typing import Callable
+
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from conftest import create_shopping_list
+from kitchencompanion.testing import QueryHarness
+from users.models import CustomUser
+
+
+@pytest.fixture(autouse=True)
+def fast_password_hasher(settings) -> None:
+    # Growing the dataset creates dozens of users.
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def grow_users(password: str) -> Callable[[int], CustomUser]:
+    """
+    Grow the number of registered users, each with a token and a list, to
+    ``size`` and return a fresh active user.
+    """
+
+    def grow(size: int) -> CustomUser:
+        for number in range(CustomUser.objects.count(), size):
+            user = CustomUser.objects.create_user(
+                email=f"user{number}@example.com", password=password
+            )
+            Token.objects.create(user=user)
+            create_shopping_list(user=user)
+        return CustomUser.objects.create_user(
+            email=f"target{CustomUser.objects.count()}@example.com",
+            password=password,
+        )
+
+    return grow
+
+
+def authenticate(user: CustomUser) -> APIClient:
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+@pytest.mark.django_db
+class TestAuthQueries:
+    password = "Gp7!xq2Lr"
+
+    def test_login(
+        self, query_harness: QueryHarness, not_authenticated_api_client: APIClient
+    ) -> None:
+        queries = query_harness.assert_flat(
+            grow_users(self.password),
+            lambda user: not_authenticated_api_client.post(
+                "/auth/token/login/", {"email": user.email, "password": self.password}
+            ),
+        )
+        query_harness.assert_uses_index(
+            queries, "users_customuser", "sqlite_autoindex_users_customuser"
+        )
+
+    def test_logout(self, query_harness: QueryHarness) -> None:
+        query_harness.assert_flat(
+            grow_users(self.password),
+            lambda user: authenticate(user).post("/auth/token/logout/"),
+        )
+
+    def test_register(
+        self, query_harness: QueryHarness, not_authenticated_api_client: APIClient
+    ) -> None:
+        query_harness.assert_flat(
+            grow_users(self.password),
+            lambda user: not_authenticated_api_client.post(
+                "/auth/users/",
+                {"email": f"new.{user.email}", "password": self.password},
+            ),
+        )
+
+    @pytest.mark.parametrize("url", ["/auth/users/me/", "/auth/users/"])
+    def test_read_users(self, query_harness: QueryHarness, url: str) -> None:
+        query_harness.assert_flat(
+            grow_users(self.password), lambda user: authenticate(user).get(url)
+        )
+
+    def test_update_me(self, query_harness: QueryHarness) -> None:
+        query_harness.assert_flat(
+            grow_users(self.password),
+            lambda user: authenticate(user).patch(
+                "/auth/users/me/", {"first_name": "Anna"}
+            ),
+        )
+
+    def test_set_password(self, query_harness: QueryHarness) -> None:
+        query_harness.assert_flat(
+            grow_users(self.password),
+            lambda user: authenticate(user).post(
+                "/auth/users/set_password/",
+                {
+                    "current_password": self.password,
+                    "new_password": "Zt9!wq4Mn",
+                    "re_new_password": "Zt9!wq4Mn",
+                },
+            ),
+        )
@@ -0,0 +1,140 @@
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, FrozenSet, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+from .models import RevokedToken
+
+SALT = "users.tokens.signed-token"
+
+
+class TokenExpired(signing.BadSignature):
+    pass
+
+
+@dataclass(frozen=True)
+class SignedToken:
+    user_id: int
+    email: str
+    jti: str
+    issued_at: datetime
+    expires_at: datetime
+
+
+def get_signer() -> signing.Signer:
+    """
+    The first configured key signs new tokens, the others are only accepted
+    for verification, which allows rotating keys without logging users out.
+    """
+    keys = settings.SIGNED_TOKEN["KEYS"]
+    return signing.Signer(key=keys[0], fallback_keys=keys[1:], salt=SALT)
+
+
+def issue_token(user) -> str:
+    # ``iat`` keeps sub-second precision so that a token issued right after
+    # ``revoke_user_tokens``, e.g. on login with a new password, stays valid.
+    now = time.time()
+    lifetime = int(settings.SIGNED_TOKEN["LIFETIME"].total_seconds())
+    return get_signer().sign_object(
+        {
+            "uid": user.pk,
+            "email": user.email,
+            "jti": secrets.token_hex(16),
+            "iat": now,
+            "exp": int(now) + lifetime,
+        }
+    )
+
+
+def decode_token(value: str) -> SignedToken:
+    claims = get_signer().unsign_object(value)
+    try:
+        token = SignedToken(
+            user_id=int(claims["uid"]),
+            email=str(claims["email"]),
+            jti=str(claims["jti"]),
+            issued_at=datetime.fromtimestamp(claims["iat"], dt_timezone.utc),
+            expires_at=datetime.fromtimestamp(claims["exp"], dt_timezone.utc),
+        )
+    except (KeyError, TypeError, ValueError):
+        raise signing.BadSignature("Malformed token claims.")
+    if token.expires_at <= timezone.now():
+        raise TokenExpired("Token has expired.")
+    return token
+
+
+class DenyList:
+    """
+    In-process copy of the unexpired ``RevokedToken`` rows.
+
+    It is reloaded at most every ``DENY_LIST_REFRESH`` seconds, so checking a
+    token normally costs no query. Revocations made in this process are
+    visible immediately; other processes see them after the next refresh.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jtis: FrozenSet[str] = frozenset()
+        self._users: Dict[int, datetime] = {}
+        self._loaded_at: Optional[float] = None
+
+    def __contains__(self, token: SignedToken) -> bool:
+        self._refresh_if_stale()
+        if token.jti in self._jtis:
+            return True
+        issued_before = self._users.get(token.user_id)
+        return issued_before is not None and token.issued_at <= issued_before
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def _refresh_if_stale(self) -> None:
+        refresh = settings.SIGNED_TOKEN["DENY_LIST_REFRESH"]
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < refresh:
+            return
+        with self._lock:
+            jtis, users = set(), {}
+            for jti, user_id, issued_before in RevokedToken.objects.filter(
+                expires_at__gt=timezone.now()
+            ).values_list("jti", "user_id", "issued_before"):
+                if jti:
+                    jtis.add(jti)
+                elif user_id is not None and issued_before is not None:
+                    users[user_id] = max(
+                        issued_before, users.get(user_id, issued_before)
+                    )
+            self._jtis, self._users = frozenset(jtis), users
+            self._loaded_at = time.monotonic()
+
+
+deny_list = DenyList()
+
+
+def revoke_token(token: SignedToken) -> None:
+    RevokedToken.objects.get_or_create(
+        jti=token.jti, defaults={"expires_at": token.expires_at}
+    )
+    purge_expired_revocations()
+    deny_list.invalidate()
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    """Revoke every signed token of ``user_id`` issued until now."""
+    now = timezone.now()
+    RevokedToken.objects.create(
+        user_id=user_id,
+        issued_before=now,
+        expires_at=now + settings.SIGNED_TOKEN["LIFETIME"],
+    )
+    deny_list.invalidate()
+
+
+def purge_expired_revocations() -> int:
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
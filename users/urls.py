@@ -1,9 +1,10 @@
 from django.urls import include, path
 
-from .views import LoginView
+from .views import LoginView, LogoutView
 
 urlpatterns = [
     path("auth/token/login/", LoginView.as_view(), name="login"),
+    path("auth/token/logout/", LogoutView.as_view(), name="logout"),
     path("auth/", include("djoser.urls")),
     path("auth/", include("djoser.urls.authtoken")),
 ]
@@ -1,13 +1,16 @@
 from axes.decorators import axes_dispatch
+from django.conf import settings as django_settings
 from django.contrib.auth import signals
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from djoser.conf import settings
+from djoser.views import TokenDestroyView
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .serializers import LoginSerializer
+from .tokens import SignedToken, issue_token, revoke_token
 
 
 @method_decorator(csrf_exempt, name="dispatch")
@@ -21,13 +24,17 @@ class LoginView(APIView):
         if serializer.is_valid():
             user = serializer.user
 
-            token, _ = settings.TOKEN_MODEL.objects.get_or_create(user=user)
+            if django_settings.SIGNED_TOKEN["ISSUE_ON_LOGIN"]:
+                auth_token = issue_token(user)
+            else:
+                token, _ = settings.TOKEN_MODEL.objects.get_or_create(user=user)
+                auth_token = token.key
 
             signals.user_logged_in.send(
                 sender=user.__class__, request=request, user=user
             )
 
-            return Response({"auth_token": token.key}, status=200)
+            return Response({"auth_token": auth_token}, status=200)
 
         signals.user_login_failed.send(
             sender=self.__class__,
@@ -38,3 +45,10 @@ class LoginView(APIView):
         )
 
         return Response(serializer.errors, status=403)
+
+
+class LogoutView(TokenDestroyView):
+    def post(self, request):
+        if isinstance(request.auth, SignedToken):
+            revoke_token(request.auth)
+        return super().post(request)